@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Phase 3-8: JSON Serialization Benchmark
+
+JSON 백엔드별 요청당 CPU 시간 비교 (orjson / msgspec / 표준 json)
+- 응답 직렬화: 대화 이력 조회(GET /conversations/{id}) 형태의 대용량 응답
+  (response_model 라우트 / dict 반환 라우트)
+- 응답 디코딩: vLLM /chat/completions 응답 본문 파싱
+
+사용법:
+    python src/serve/08_benchmark_serialization.py --messages 500 --iterations 200
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import httpx
+
+# 프로젝트 루트 임포트 (src.serve...)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.datastructures import Default
+
+from src.serve.core.serialization import BACKENDS, FastJSONResponse, get_codec, select_backend
+from src.serve.schemas.chat import ConversationResponse
+
+
+def make_conversation(num_messages: int, content_chars: int) -> SimpleNamespace:
+    """ORM 객체 형태의 대화 이력 (from_attributes 검증 경로 포함)"""
+    now = datetime.now()
+    content = ("MLflow 실험 추적과 모델 레지스트리를 설명해 주세요. " * content_chars)[:content_chars]
+    messages = [
+        SimpleNamespace(
+            id=i,
+            conversation_id=1,
+            role="user" if i % 2 == 0 else "assistant",
+            content=content,
+            model="qwen2.5-7b-instruct",
+            tokens_used=256,
+            latency_ms=1200,
+            ttft_ms=85,
+            created_at=now,
+        )
+        for i in range(num_messages)
+    ]
+    return SimpleNamespace(
+        id=1, title="벤치마크 대화", llm_config_id=None, session_id="bench",
+        created_at=now, updated_at=now, messages=messages,
+    )
+
+
+def make_completion_payload(content_chars: int, logprobs: int) -> bytes:
+    """vLLM /chat/completions 응답 본문"""
+    content = ("모델 서빙 파이프라인은 다음과 같습니다. " * content_chars)[:content_chars]
+    return json.dumps({
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "qwen2.5-7b-instruct",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "logprobs": {"content": [
+                {"token": "토큰", "logprob": -0.01 * i, "bytes": [237, 134, 160],
+                 "top_logprobs": [{"token": "토큰", "logprob": -0.01 * i}]}
+                for i in range(logprobs)
+            ]},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 1024, "completion_tokens": logprobs, "total_tokens": 1024 + logprobs},
+    }, ensure_ascii=False).encode("utf-8")
+
+
+# ============================================================
+# 응답 직렬화 (ASGI 호출 단위)
+# ============================================================
+
+def make_app(conversation: SimpleNamespace, response_class: Optional[type], default: bool = True) -> FastAPI:
+    """
+    대화 조회 라우트만 있는 앱
+
+    Args:
+        response_class: 기본 응답 클래스 (None이면 FastAPI 기본값)
+        default: main.py처럼 Default()로 감쌀지 여부 (False면 dump_json 경로 비활성화)
+    """
+    if response_class is None:
+        app = FastAPI()
+    else:
+        app = FastAPI(default_response_class=Default(response_class) if default else response_class)
+    history = ConversationResponse.model_validate(conversation).model_dump()
+
+    @app.get("/conversations/1", response_model=ConversationResponse)
+    async def get_conversation():
+        return conversation
+
+    @app.get("/conversations/1/raw")
+    async def get_conversation_raw():
+        return history
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> int:
+    """네트워크 없이 ASGI 앱 직접 호출 후 응답 본문 크기 반환"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8080),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def time_app(app: FastAPI, path: str, iterations: int) -> tuple[float, int]:
+    """요청당 CPU 시간 (ms), 응답 크기"""
+    for _ in range(10):
+        size = await call(app, path)
+    started = time.process_time()
+    for _ in range(iterations):
+        await call(app, path)
+    return (time.process_time() - started) / iterations * 1000, size
+
+
+def make_response_class(backend: str) -> type:
+    """백엔드를 고정한 FastJSONResponse"""
+    dumps, _ = get_codec(backend)
+
+    class BenchJSONResponse(FastJSONResponse):
+        def render(self, content) -> bytes:
+            return dumps(content)
+
+    return BenchJSONResponse
+
+
+# ============================================================
+# 응답 디코딩
+# ============================================================
+
+def time_decode(decode: Callable[[bytes], dict], payload: bytes, iterations: int) -> float:
+    """디코딩 1회당 CPU 시간 (ms)"""
+    decode(payload)
+    started = time.process_time()
+    for _ in range(iterations):
+        decode(payload)
+    return (time.process_time() - started) / iterations * 1000
+
+
+def httpx_json(payload: bytes) -> dict:
+    """기존 경로 (httpx.Response.json: 인코딩 감지 + str 디코딩 + json.loads)"""
+    return httpx.Response(200, content=payload, headers={"content-type": "application/json"}).json()
+
+
+def print_row(label: str, ms: float, baseline: float) -> None:
+    print(f"  {label:<28} {ms:8.3f} ms   {baseline / ms:5.2f}x   ({baseline - ms:+.3f} ms/req saved)")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="JSON serialization benchmark")
+    parser.add_argument("--messages", type=int, default=500, help="대화 이력 메시지 수")
+    parser.add_argument("--content-chars", type=int, default=400, help="메시지당 본문 길이")
+    parser.add_argument("--logprobs", type=int, default=512, help="vLLM 응답 logprobs 토큰 수")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    backends = [backend for backend in BACKENDS if select_backend(backend) == backend]
+    print("\n" + "=" * 60)
+    print("  JSON Serialization Benchmark")
+    print("=" * 60)
+    print(f"Available backends: {', '.join(backends)}")
+
+    conversation = make_conversation(args.messages, args.content_chars)
+    apps = {backend: make_app(conversation, make_response_class(backend)) for backend in backends}
+    for path, label in (("/conversations/1", "response_model"), ("/conversations/1/raw", "dict")):
+        baseline, size = asyncio.run(time_app(make_app(conversation, None), path, args.iterations))
+        print(f"\n[Response] GET {path} ({label}, {args.messages} messages, {size / 1024:.0f} KiB)")
+        print_row("JSONResponse (fastapi)", baseline, baseline)
+        for backend, app in apps.items():
+            ms, _ = asyncio.run(time_app(app, path, args.iterations))
+            print_row(f"FastJSONResponse ({backend})", ms, baseline)
+        if label == "response_model":
+            ms, _ = asyncio.run(time_app(
+                make_app(conversation, make_response_class(backends[0]), default=False), path, args.iterations,
+            ))
+            print_row(f"  without Default() ({backends[0]})", ms, baseline)
+
+    payload = make_completion_payload(args.content_chars * 8, args.logprobs)
+    print(f"\n[Decode] vLLM /chat/completions ({len(payload) / 1024:.0f} KiB, {args.logprobs} logprobs)")
+    baseline = time_decode(httpx_json, payload, args.iterations)
+    print_row("httpx response.json()", baseline, baseline)
+    for backend in backends:
+        _, loads = get_codec(backend)
+        print_row(f"loads ({backend})", time_decode(loads, payload, args.iterations), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Phase 3-9: Middleware Overhead Benchmark
+
+요청 로깅 + Prometheus 미들웨어 스택의 요청당 오버헤드 측정
+- JSON 라우트: 경로 파라미터가 있는 작은 응답 (요청당 CPU 시간)
+- 스트리밍 라우트: 청크 N개 StreamingResponse (처리량 = 청크/초)
+- 미들웨어 없는 앱을 기준으로 비교
+
+사용법:
+    python src/serve/09_benchmark_middleware.py --iterations 2000 --chunks 500
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import structlog
+
+# 프로젝트 루트 임포트 (src.serve...)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from src.serve.core.logging import RequestLoggingMiddleware
+from src.serve.core.metrics import PrometheusMiddleware
+
+
+def make_app(middleware: bool, chunks: int) -> FastAPI:
+    """main.py와 같은 순서로 미들웨어를 추가한 앱"""
+    app = FastAPI()
+
+    @app.get("/v1/conversations/{conversation_id}")
+    async def get_conversation(conversation_id: int):
+        return {"id": conversation_id, "title": "벤치마크"}
+
+    @app.get("/v1/stream")
+    async def stream():
+        async def generate():
+            for i in range(chunks):
+                yield b'data: {"choices":[{"delta":{"content":"token"}}]}\n\n'
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    if middleware:
+        app.add_middleware(RequestLoggingMiddleware)
+        app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> int:
+    """네트워크 없이 ASGI 앱 직접 호출 후 받은 body 메시지 수 반환"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8080),
+        "state": {},
+    }
+    messages = 0
+
+    async def receive():
+        await asyncio.sleep(3600)  # 요청 본문 없음, 연결 유지
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal messages
+        if message["type"] == "http.response.body":
+            messages += 1
+
+    await app(scope, receive, send)
+    return messages
+
+
+async def time_app(app: FastAPI, path: str, iterations: int) -> float:
+    """요청당 CPU 시간 (ms)"""
+    for _ in range(20):
+        await call(app, path)
+    started = time.process_time()
+    for _ in range(iterations):
+        await call(app, path)
+    return (time.process_time() - started) / iterations * 1000
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="Middleware overhead benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="JSON 라우트 요청 수")
+    parser.add_argument("--stream-iterations", type=int, default=100, help="스트리밍 라우트 요청 수")
+    parser.add_argument("--chunks", type=int, default=500, help="스트리밍 응답 청크 수")
+    args = parser.parse_args()
+
+    # 로그 렌더링 비용은 포함하고 출력(I/O)은 제외
+    structlog.configure(
+        processors=[structlog.processors.TimeStamper(fmt="iso"), structlog.processors.JSONRenderer()],
+        logger_factory=structlog.ReturnLoggerFactory(),
+    )
+
+    print("\n" + "=" * 60)
+    print("  Middleware Overhead Benchmark")
+    print("=" * 60)
+
+    bare = make_app(False, args.chunks)
+    stacked = make_app(True, args.chunks)
+
+    base = asyncio.run(time_app(bare, "/v1/conversations/42", args.iterations))
+    with_mw = asyncio.run(time_app(stacked, "/v1/conversations/42", args.iterations))
+    print(f"\n[JSON] GET /v1/conversations/{{id}} ({args.iterations} requests)")
+    print(f"  no middleware          {base:8.3f} ms/req")
+    print(f"  logging + prometheus   {with_mw:8.3f} ms/req   (+{with_mw - base:.3f} ms overhead)")
+
+    base = asyncio.run(time_app(bare, "/v1/stream", args.stream_iterations))
+    with_mw = asyncio.run(time_app(stacked, "/v1/stream", args.stream_iterations))
+    print(f"\n[Stream] GET /v1/stream ({args.chunks} chunks x {args.stream_iterations} requests)")
+    print(f"  no middleware          {args.chunks / base * 1000:10.0f} chunks/s   ({base:.3f} ms/req)")
+    print(
+        f"  logging + prometheus   {args.chunks / with_mw * 1000:10.0f} chunks/s   "
+        f"({with_mw:.3f} ms/req, +{with_mw - base:.3f} ms overhead)"
+    )
+
+
+if __name__ == "__main__":
+    main()
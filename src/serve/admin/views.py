@@ -2,11 +2,14 @@
 Admin Views - SQLAdmin 모델 뷰 및 커스텀 대시보드
 """
 
-from datetime import datetime, timedelta
+import asyncio
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable
 
 import psutil
-from sqlalchemy import or_, func, cast, Date
+from sqlalchemy import or_, func, select
 from sqladmin import ModelView, BaseView, expose
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
@@ -16,15 +19,27 @@ from wtforms.validators import Optional
 from src.serve.models.chat import LLMConfig, Conversation, ChatMessage, FewshotMessage
 from src.serve.models.llm import LLMModel
 from src.serve.models.user import User, UserRole
-from src.serve.database import sync_engine
+from src.serve.database import engine, async_session_maker
 from src.serve.core.config import settings
+from src.serve.core.preset_cache import preset_cache
 from src.serve.core.security import hash_password
+from src.serve.core.stats_rollup import rollup_query, summarize_rollup
 
 
 # ============================================================
 # ModelView Classes
 # ============================================================
 
+class PresetCacheInvalidationMixin:
+    """프리셋 관련 모델 변경 시 API 프리셋 캐시 무효화"""
+
+    async def after_model_change(self, data: dict, model, is_created: bool, request: Request) -> None:
+        preset_cache.invalidate()
+
+    async def after_model_delete(self, model, request: Request) -> None:
+        preset_cache.invalidate()
+
+
 class UserAdmin(ModelView, model=User):
     name = "사용자"
     name_plural = "사용자 목록"
@@ -99,7 +114,7 @@ class UserAdmin(ModelView, model=User):
         return await super().update_model(request, pk, data)
 
 
-class LLMModelAdmin(ModelView, model=LLMModel):
+class LLMModelAdmin(PresetCacheInvalidationMixin, ModelView, model=LLMModel):
     name = "LLM 모델"
     name_plural = "LLM 모델 목록"
     icon = "fa-solid fa-cube"
@@ -128,7 +143,7 @@ class LLMModelAdmin(ModelView, model=LLMModel):
     }
 
 
-class LLMConfigAdmin(ModelView, model=LLMConfig):
+class LLMConfigAdmin(PresetCacheInvalidationMixin, ModelView, model=LLMConfig):
     name = "LLM 설정"
     name_plural = "LLM 설정 목록"
     icon = "fa-solid fa-sliders"
@@ -141,7 +156,7 @@ class ConversationAdmin(ModelView, model=Conversation):
     name = "대화"
     name_plural = "대화 목록"
     icon = "fa-solid fa-comments"
-    column_list = [Conversation.id, Conversation.title, Conversation.session_id, Conversation.created_at, Conversation.updated_at]
+    column_list = [Conversation.id, Conversation.title, Conversation.session_id, Conversation.created_at, Conversation.updated_at, Conversation.archived_at]
     column_searchable_list = [Conversation.title, Conversation.session_id]
     column_default_sort = ("updated_at", True)
     can_delete = True
@@ -205,7 +220,7 @@ class ChatMessageAdmin(ModelView, model=ChatMessage):
         )
 
 
-class FewshotMessageAdmin(ModelView, model=FewshotMessage):
+class FewshotMessageAdmin(PresetCacheInvalidationMixin, ModelView, model=FewshotMessage):
     name = "Few-shot 메시지"
     name_plural = "Few-shot 메시지 목록"
     icon = "fa-solid fa-list-ol"
@@ -251,6 +266,61 @@ class FewshotMessageAdmin(ModelView, model=FewshotMessage):
 # BaseView Classes (Custom Dashboards)
 # ============================================================
 
+class DashboardCache:
+    """
+    대시보드 결과 TTL 캐시
+
+    같은 키를 동시에 요청하면 한 번만 계산하고 나머지는 그 결과를 기다립니다.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl if ttl is not None else settings.admin_dashboard_cache_ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            value = await compute()
+            # 만료 항목 정리 (날짜 범위별 키가 쌓이지 않도록)
+            now = time.monotonic()
+            for stale in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                self._entries.pop(stale, None)
+            self._entries[key] = (now + self.ttl, value)
+            return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+dashboard_cache = DashboardCache()
+
+# cpu_percent(interval=None)는 직전 호출 이후 사용률을 반환하므로 기준점을 미리 잡아 둠
+psutil.cpu_percent(interval=None)
+
+
+def _collect_system_status() -> dict:
+    """psutil 시스템 정보 수집 (블로킹 호출, 스레드 풀에서 실행)"""
+    process = psutil.Process()
+    return {
+        "memory": psutil.virtual_memory(),
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "cpu_count": psutil.cpu_count(),
+        "disk": psutil.disk_usage('/'),
+        "process_info": {
+            "pid": process.pid,
+            "memory_mb": process.memory_info().rss / (1024 * 1024),
+            "num_threads": process.num_threads(),
+        },
+    }
+
+
 class SystemStatusView(BaseView):
     """시스템 상태 모니터링 대시보드"""
     name = "시스템 상태"
@@ -258,49 +328,47 @@ class SystemStatusView(BaseView):
 
     @expose("/system-status", methods=["GET"])
     async def system_status_page(self, request: Request):
-        # 메모리 정보
-        memory = psutil.virtual_memory()
-
-        # CPU 정보
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        cpu_count = psutil.cpu_count()
-
-        # 디스크 정보
-        disk = psutil.disk_usage('/')
-
-        # 프로세스 정보
-        process = psutil.Process()
-        process_info = {
-            "pid": process.pid,
-            "memory_mb": process.memory_info().rss / (1024 * 1024),
-            "num_threads": process.num_threads(),
-        }
+        # 메모리/CPU/디스크/프로세스 정보 (이벤트 루프를 막지 않도록 스레드에서 수집)
+        status = await dashboard_cache.get_or_compute(
+            "system_status", lambda: asyncio.to_thread(_collect_system_status)
+        )
 
-        # DB 연결 풀 정보
-        pool = sync_engine.pool
+        # DB 연결 풀 정보 (API 요청이 사용하는 비동기 엔진, 캐시하지 않음)
+        pool = engine.pool
         db_pool = {
             "Pool Class": pool.__class__.__name__,
-            "Pool Size": getattr(pool, 'size', 'N/A'),
-            "Checked In": pool.checkedin(),
-            "Checked Out": pool.checkedout(),
-            "Overflow": pool.overflow(),
+            "Pool Size": pool.size() if hasattr(pool, 'size') else 'N/A',
+            "Checked In": pool.checkedin() if hasattr(pool, 'checkedin') else 'N/A',
+            "Checked Out": pool.checkedout() if hasattr(pool, 'checkedout') else 'N/A',
+            "Overflow": pool.overflow() if hasattr(pool, 'overflow') else 'N/A',
             "Invalid": pool.invalidatedcount() if hasattr(pool, 'invalidatedcount') else 'N/A',
         }
 
         return await self.templates.TemplateResponse(
             request,
             "system_status.html",
-            context={
-                "memory": memory,
-                "cpu_percent": cpu_percent,
-                "cpu_count": cpu_count,
-                "disk": disk,
-                "db_pool": db_pool,
-                "process_info": process_info,
-            },
+            context={**status, "db_pool": db_pool},
         )
 
 
+async def _load_message_statistics(start_date: date, end_date: date) -> dict:
+    """롤업 버킷 + 기간 중 활동한 대화 수 조회 (비동기 엔진), 요약은 스레드에서 계산"""
+    async with async_session_maker() as session:
+        buckets = (await session.execute(rollup_query(start_date, end_date))).scalars().all()
+
+        # 기간 중 활동한 대화 수 (ix_conversations_updated_at 범위 스캔)
+        total_conversations = (await session.execute(
+            select(func.count(Conversation.id)).where(
+                Conversation.updated_at >= datetime.combine(start_date, datetime.min.time()),
+                Conversation.created_at <= datetime.combine(end_date, datetime.max.time()),
+            )
+        )).scalar() or 0
+
+    # 스케치 병합은 버킷 수에 비례하는 CPU 작업
+    summary = await asyncio.to_thread(summarize_rollup, buckets)
+    return {"summary": summary, "total_conversations": total_conversations}
+
+
 class MessageStatisticsView(BaseView):
     """메시지 통계 대시보드"""
     name = "메시지 통계"
@@ -308,8 +376,6 @@ class MessageStatisticsView(BaseView):
 
     @expose("/message-statistics", methods=["GET", "POST"])
     async def message_statistics_page(self, request: Request):
-        from sqlalchemy.orm import Session
-
         # 날짜 범위 기본값 (최근 30일)
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=30)
@@ -322,89 +388,14 @@ class MessageStatisticsView(BaseView):
             if form.get("end_date"):
                 end_date = datetime.strptime(form["end_date"], "%Y-%m-%d").date()
 
-        # 쿼리 실행
-        with Session(sync_engine) as session:
-            # 기본 필터
-            date_filter = ChatMessage.created_at.between(
-                datetime.combine(start_date, datetime.min.time()),
-                datetime.combine(end_date, datetime.max.time())
-            )
-
-            # 총 메시지 수
-            total_messages = session.query(func.count(ChatMessage.id)).filter(date_filter).scalar() or 0
-
-            # 총 대화 수
-            total_conversations = session.query(func.count(func.distinct(ChatMessage.conversation_id))).filter(date_filter).scalar() or 0
-
-            # 전체 평균 통계
-            avg_latency_ms = session.query(func.avg(ChatMessage.latency_ms)).filter(
-                date_filter,
-                ChatMessage.latency_ms.isnot(None)
-            ).scalar() or 0
-
-            avg_tokens = session.query(func.avg(ChatMessage.tokens_used)).filter(
-                date_filter,
-                ChatMessage.tokens_used.isnot(None)
-            ).scalar() or 0
-
-            # 평균 TTFT 계산 (first_token_at - created_at 밀리초)
-            # SQLite에서 datetime 차이 계산
-            avg_ttft_ms = session.query(
-                func.avg(
-                    (func.julianday(ChatMessage.first_token_at) - func.julianday(ChatMessage.created_at)) * 86400000
-                )
-            ).filter(
-                date_filter,
-                ChatMessage.first_token_at.isnot(None)
-            ).scalar() or 0
-
-            # 역할별 통계 (TTFT 포함)
-            role_stats_query = session.query(
-                ChatMessage.role,
-                func.count(ChatMessage.id).label('count'),
-                func.avg(ChatMessage.latency_ms).label('avg_latency'),
-                func.avg(ChatMessage.tokens_used).label('avg_tokens'),
-                func.sum(ChatMessage.tokens_used).label('total_tokens'),
-                func.avg(
-                    (func.julianday(ChatMessage.first_token_at) - func.julianday(ChatMessage.created_at)) * 86400000
-                ).label('avg_ttft')
-            ).filter(date_filter).group_by(ChatMessage.role).all()
-
-            role_stats = [
-                {
-                    "role": r.role,
-                    "count": r.count,
-                    "avg_latency": r.avg_latency,
-                    "avg_tokens": r.avg_tokens,
-                    "total_tokens": r.total_tokens,
-                    "avg_ttft": r.avg_ttft,
-                }
-                for r in role_stats_query
-            ]
-
-            # 일별 통계 (TTFT 포함)
-            daily_stats_query = session.query(
-                cast(ChatMessage.created_at, Date).label('date'),
-                func.count(ChatMessage.id).label('count'),
-                func.avg(ChatMessage.latency_ms).label('avg_latency'),
-                func.avg(ChatMessage.tokens_used).label('avg_tokens'),
-                func.avg(
-                    (func.julianday(ChatMessage.first_token_at) - func.julianday(ChatMessage.created_at)) * 86400000
-                ).label('avg_ttft')
-            ).filter(date_filter).group_by(
-                cast(ChatMessage.created_at, Date)
-            ).order_by(cast(ChatMessage.created_at, Date).desc()).limit(14).all()
-
-            daily_stats = [
-                {
-                    "date": d.date,
-                    "count": d.count,
-                    "avg_latency": d.avg_latency,
-                    "avg_tokens": d.avg_tokens,
-                    "avg_ttft": d.avg_ttft,
-                }
-                for d in daily_stats_query
-            ]
+        # 쿼리 실행 (원본 메시지 대신 시간별 롤업 버킷 합산, 짧은 TTL 캐시)
+        stats = await dashboard_cache.get_or_compute(
+            ("message_statistics", start_date, end_date),
+            lambda: _load_message_statistics(start_date, end_date),
+        )
+        summary = stats["summary"]
+        total_conversations = stats["total_conversations"]
+        overall = summary["overall"]
 
         # CSRF 토큰
         csrf_token = request.session.get("csrf_token", "")
@@ -415,13 +406,16 @@ class MessageStatisticsView(BaseView):
             context={
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
-                "total_messages": total_messages,
+                "total_messages": overall["count"],
                 "total_conversations": total_conversations,
-                "avg_latency_ms": avg_latency_ms,
-                "avg_tokens": avg_tokens,
-                "avg_ttft_ms": avg_ttft_ms,
-                "role_stats": role_stats,
-                "daily_stats": daily_stats,
+                "avg_latency_ms": overall["avg_latency"],
+                "avg_tokens": overall["avg_tokens"],
+                "avg_ttft_ms": overall["avg_ttft"],
+                "latency": overall["latency"],
+                "ttft": overall["ttft"],
+                "model_stats": summary["model_stats"],
+                "role_stats": summary["role_stats"],
+                "daily_stats": summary["daily_stats"],
                 "csrf_token": csrf_token,
             },
         )
@@ -4,8 +4,10 @@ Core Module
 설정, LLM 클라이언트, 메트릭, 로깅
 """
 
+from src.serve.core.admission import AdmissionController, AdmissionRejected
 from src.serve.core.config import settings
 from src.serve.core.llm import LLMClient
+from src.serve.core.llm_router import LLMRouter
 from src.serve.core.metrics import (
     PrometheusMiddleware,
     get_metrics,
@@ -19,12 +21,16 @@ from src.serve.core.logging import (
     request_id_var,
 )
 from src.serve.core.security import hash_password, verify_password
+from src.serve.core.tracing import TracingMiddleware, current_trace, span
 
 __all__ = [
     # Config
     "settings",
     # LLM
     "LLMClient",
+    "LLMRouter",
+    "AdmissionController",
+    "AdmissionRejected",
     # Metrics
     "PrometheusMiddleware",
     "get_metrics",
@@ -35,6 +41,10 @@ __all__ = [
     "get_logger",
     "RequestLoggingMiddleware",
     "request_id_var",
+    # Tracing
+    "TracingMiddleware",
+    "current_trace",
+    "span",
     # Security
     "hash_password",
     "verify_password",
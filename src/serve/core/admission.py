@@ -0,0 +1,267 @@
+"""
+Admission Control
+
+vLLM 앞단 동시 요청 상한 및 우선순위/공정성 대기열
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Protocol
+
+from src.serve.core.config import settings
+from src.serve.core.metrics import (
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED_TOTAL,
+    ADMISSION_WAIT_SECONDS,
+)
+
+
+class AdmissionRejected(Exception):
+    """대기열 초과/데드라인 초과로 요청 거절 (429/503 + Retry-After)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class SlotPool(Protocol):
+    """백엔드 단위 슬롯 배정 (LLMRouter)"""
+
+    def reserve(self, model: Optional[str]) -> Optional[Any]:
+        """model 요청에 슬롯이 남은 백엔드를 배정 (없으면 None)"""
+
+    def unreserve(self, backend: Any) -> None:
+        """배정한 슬롯 반납"""
+
+    def capacity_for(self, model: Optional[str]) -> int:
+        """model 요청이 쓸 수 있는 슬롯 수 (0: 무제한)"""
+
+
+@dataclass(order=True)
+class _Waiter:
+    """대기 중인 요청 (priority → virtual time → 도착 순으로 정렬)"""
+    priority: int
+    virtual_time: float
+    seq: int
+    future: asyncio.Future = field(compare=False)
+    model: Optional[str] = field(default=None, compare=False)
+
+
+class AdmissionTicket:
+    """
+    획득한 upstream 슬롯 (release는 여러 번 호출해도 한 번만 반영)
+
+    backend는 슬롯이 배정된 백엔드로, LLMRouter 호출에 넘기면 그 백엔드로 먼저 보냅니다.
+    """
+
+    def __init__(self, controller: Optional["AdmissionController"], backend: Optional[Any] = None):
+        self._controller = controller
+        self.backend = backend
+        self._acquired_at = time.monotonic()
+
+    def release(self) -> None:
+        if self._controller is not None:
+            controller, self._controller = self._controller, None
+            controller._release(time.monotonic() - self._acquired_at, self.backend)
+
+
+class AdmissionController:
+    """
+    어드미션 컨트롤러
+
+    진행 중 upstream 요청 수를 capacity 이하로 유지하고, 초과분은 대기열에 넣습니다.
+    같은 우선순위 안에서는 클라이언트 키별 가상 시간(WFQ)으로 순서를 정해
+    한 클라이언트가 대기열을 독점하지 못하게 합니다.
+    예상 대기 시간(우선순위상 앞에 있는 대기 요청 수 기준)이 데드라인을 넘으면 대기열에 넣지 않고 즉시 거절합니다.
+
+    slots(LLMRouter)가 있으면 슬롯을 요청 모델을 처리할 백엔드 단위로 배정합니다. 요청이 갈 백엔드가
+    상한이면 다른 백엔드에 여유가 있어도 대기하므로, 특정 모델로 몰린 요청도 백엔드별 상한을 넘지 않습니다.
+    이때 대기 요청은 우선순위 순으로 훑으면서 슬롯을 받을 수 있는 요청부터 배정합니다
+    (상한인 백엔드를 기다리는 요청이 다른 백엔드로 갈 요청을 막지 않음).
+    slots가 없으면 전체 진행 중 요청 수를 capacity와 비교합니다. capacity가 무제한일 때 발급한 슬롯도
+    in_flight에 포함하므로, 용량이 제한되는 순간 이미 진행 중인 요청까지 상한에 반영됩니다.
+    """
+
+    def __init__(
+        self,
+        capacity: Callable[[], int],
+        max_queue: Optional[int] = None,
+        deadline: Optional[float] = None,
+        slots: Optional[SlotPool] = None,
+    ):
+        self._capacity = capacity
+        self._slots = slots
+        self.max_queue = max_queue if max_queue is not None else settings.admission_max_queue
+        self.deadline = deadline if deadline is not None else settings.admission_queue_timeout
+        self.in_flight = 0
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._virtual_clock = 0.0
+        self._last_virtual: dict[str, float] = {}
+        self._service_time = 1.0  # upstream 처리 시간 EWMA (초)
+
+    @property
+    def capacity(self) -> int:
+        """동시 upstream 요청 상한 (0 이하: 무제한)"""
+        return self._capacity()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def estimated_wait(self, position: int, model: Optional[str] = None) -> float:
+        """앞에 position개의 요청이 대기 중인 요청의 예상 대기 시간 (초)"""
+        capacity = self._slots.capacity_for(model) if self._slots is not None else self.capacity
+        return math.ceil((position + 1) / max(capacity, 1)) * self._service_time
+
+    def _try_reserve(self, model: Optional[str]) -> tuple[bool, Optional[Any]]:
+        """슬롯 확보 시도 → (성공 여부, 배정된 백엔드)"""
+        if self._slots is not None:
+            backend = self._slots.reserve(model)
+            return backend is not None, backend
+        capacity = self.capacity
+        # 무제한이어도 슬롯 수는 센다 (이후 용량이 제한되면 이미 진행 중인 요청까지 포함해 비교)
+        return capacity <= 0 or self.in_flight < capacity, None
+
+    async def acquire(
+        self,
+        client_key: str = "anonymous",
+        priority: Optional[int] = None,
+        deadline: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> AdmissionTicket:
+        """upstream 슬롯 획득 (model: 요청 모델 - 슬롯을 배정할 백엔드 후보, 필요 시 대기, 불가능하면 AdmissionRejected)"""
+        if self._queue:
+            self._dispatch()  # 먼저 온 요청이 받을 수 있는 슬롯은 먼저 배정
+        if not self._queue or self._slots is not None:
+            # 배정 후에도 남은 슬롯은 대기 요청이 쓸 수 없는 슬롯 (다른 백엔드 대기) → 바로 통과
+            reserved, backend = self._try_reserve(model)
+            if reserved:
+                self.in_flight += 1
+                ADMISSION_WAIT_SECONDS.observe(0.0)
+                return AdmissionTicket(self, backend)
+
+        deadline = deadline if deadline is not None else self.deadline
+        priority = priority if priority is not None else settings.admission_default_priority
+        virtual_time = max(self._virtual_clock, self._last_virtual.get(client_key, 0.0)) + 1.0
+        # 이 요청보다 먼저 배정될 대기 요청 수 (뒤로 밀릴 낮은 우선순위 요청은 제외)
+        position = self._position(priority, virtual_time, model)
+
+        if len(self._queue) >= self.max_queue:
+            self._reject("queue_full")
+            raise AdmissionRejected(503, "Upstream queue is full", self._retry_after(position, model))
+
+        estimate = self.estimated_wait(position, model)
+        if estimate > deadline:
+            self._reject("deadline")
+            raise AdmissionRejected(429, "Upstream is saturated", self._retry_after(position, model))
+
+        self._last_virtual[client_key] = virtual_time
+
+        waiter = _Waiter(
+            priority, virtual_time, next(self._seq), asyncio.get_running_loop().create_future(), model,
+        )
+        heapq.heappush(self._queue, waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(self._queue))
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=deadline)
+        except asyncio.TimeoutError:
+            self._remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                return AdmissionTicket(self, waiter.future.result())  # 타임아웃 직전에 슬롯이 배정된 경우
+            waiter.future.cancel()
+            self._reject("timeout")
+            raise AdmissionRejected(
+                503,
+                "Timed out waiting for upstream capacity",
+                self._retry_after(self._position(priority, virtual_time, model), model),
+            )
+        except asyncio.CancelledError:
+            self._remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(0.0, waiter.future.result())  # 배정된 슬롯 반납
+            else:
+                waiter.future.cancel()
+            raise
+        finally:
+            ADMISSION_QUEUE_DEPTH.set(len(self._queue))
+
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - started)
+        return AdmissionTicket(self, waiter.future.result())
+
+    def notify(self) -> None:
+        """용량이 바뀌었을 때(엔진 지표 갱신 등) 대기 요청 배정"""
+        self._dispatch()
+
+    def _release(self, service_time: float, backend: Optional[Any] = None) -> None:
+        """슬롯 반납 후 다음 대기 요청에 배정"""
+        self.in_flight -= 1
+        if backend is not None:
+            self._slots.unreserve(backend)
+        if service_time > 0:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._slots is None:
+            while self._queue and self._try_reserve(None)[0]:
+                waiter = heapq.heappop(self._queue)
+                if not waiter.future.done():
+                    self._assign(waiter, None)
+        elif self._queue:
+            # 우선순위 순으로 훑으며 백엔드에 여유가 있는 요청부터 배정
+            waiting = []
+            for waiter in sorted(self._queue):
+                if waiter.future.done():
+                    continue
+                reserved, backend = self._try_reserve(waiter.model)
+                if reserved:
+                    self._assign(waiter, backend)
+                else:
+                    waiting.append(waiter)
+            self._queue = waiting  # 정렬된 리스트는 그대로 힙
+        if len(self._last_virtual) > 2 * len(self._queue) + 64:
+            self._prune_virtual()
+        ADMISSION_QUEUE_DEPTH.set(len(self._queue))
+
+    def _assign(self, waiter: _Waiter, backend: Optional[Any]) -> None:
+        self.in_flight += 1
+        self._virtual_clock = max(self._virtual_clock, waiter.virtual_time)
+        waiter.future.set_result(backend)
+
+    def _prune_virtual(self) -> None:
+        """가상 시간이 전역 시계 이하인 클라이언트 기록 제거 (다음 요청의 가상 시간은 어차피 시계 기준)"""
+        clock = self._virtual_clock
+        self._last_virtual = {key: last for key, last in self._last_virtual.items() if last > clock}
+
+    def _position(self, priority: int, virtual_time: float, model: Optional[str] = None) -> int:
+        """
+        (priority, virtual time) 순서상 앞에 있는 대기 요청 수 (같으면 먼저 온 요청이 앞)
+
+        백엔드 단위 배정이면 다른 모델(백엔드)로 갈 대기 요청은 세지 않습니다 (모델 미지정은 모든 백엔드 후보).
+        """
+        return sum(
+            1 for waiter in self._queue
+            if not waiter.future.done()
+            and (waiter.priority, waiter.virtual_time) <= (priority, virtual_time)
+            and (self._slots is None or waiter.model is None or model is None or waiter.model == model)
+        )
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+
+    def _retry_after(self, position: int, model: Optional[str] = None) -> int:
+        return max(1, math.ceil(self.estimated_wait(position, model)))
+
+    def _reject(self, reason: str) -> None:
+        ADMISSION_REJECTED_TOTAL.labels(reason=reason).inc()
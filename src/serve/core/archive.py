@@ -0,0 +1,360 @@
+"""
+Conversation Archive
+
+유휴 대화의 메시지를 일 단위 파티션 압축 JSONL로 이동 (hot/cold 분리)
+- {archive_dir}/{YYYY-MM-DD}/conversations-{실행시각}-{id}.jsonl.zst (zstandard 미설치 시 .jsonl.gz)
+- 파일 한 행 = 대화 하나: {"conversation_id": ..., "messages": [...]}
+- conversations 행은 archived_at/archive_path를 채운 stub으로 남고 chat_messages 행은 삭제
+- 조회 시 파일에서 메시지를 읽어 복원 (load_archived_messages)
+- 대화 삭제 시 커밋 후 파일에서 해당 레코드 제거 (schedule_purge → purge_archived)
+- 아카이브 후 새 메시지가 온 대화는 다시 유휴가 되면 재아카이브
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import ARCHIVED_CONVERSATIONS_TOTAL, ARCHIVED_MESSAGES_TOTAL
+from src.serve.core.tracing import create_detached_task
+from src.serve.database import async_session_maker
+from src.serve.models.chat import ChatMessage, Conversation
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성 미설치 시 gzip 사용
+    zstandard = None
+
+logger = get_logger(__name__)
+
+# 아카이브 파일에 저장하는 메시지 컬럼
+MESSAGE_COLUMNS = (
+    "id", "conversation_id", "role", "content", "model", "tokens_used",
+    "latency_ms", "extra_data", "first_token_at", "created_at",
+)
+DATETIME_COLUMNS = ("first_token_at", "created_at")
+
+# 아카이브 대상: 아카이브된 적 없거나, 아카이브 이후 새 메시지가 온 대화
+# (아카이브 시 updated_at은 유지되므로 updated_at > archived_at이면 이후 활동이 있었음)
+ARCHIVABLE = or_(Conversation.archived_at.is_(None), Conversation.updated_at > Conversation.archived_at)
+
+# 아카이브 파일 재작성(레코드 제거) 직렬화
+_rewrite_lock = asyncio.Lock()
+
+# 커밋 후 제거할 (archive_path, conversation_id) 목록 (Session.info 키) / 실행 중인 제거 작업
+_PURGES_KEY = "archive_purges"
+_purge_tasks: set[asyncio.Task] = set()
+
+
+# ============================================================
+# File Format
+# ============================================================
+
+def archive_suffix() -> str:
+    """사용할 압축 형식의 파일 확장자"""
+    if settings.archive_compression == "zstd" and zstandard is not None:
+        return ".jsonl.zst"
+    return ".jsonl.gz"
+
+
+def write_archive(path: Path, records: list[dict]) -> None:
+    """압축 JSONL 파일 쓰기 (임시 파일 → rename으로 원자적 생성)"""
+    data = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+    raw = data.encode("utf-8")
+    if path.name.endswith(".zst"):
+        payload = zstandard.ZstdCompressor(level=settings.archive_compression_level).compress(raw)
+    else:
+        payload = gzip.compress(raw, compresslevel=6)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _load_archive(path: str) -> dict[int, list[dict]]:
+    """아카이브 파일 → {conversation_id: 메시지 행 목록}"""
+    with open(path, "rb") as f:
+        payload = f.read()
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    else:
+        raw = gzip.decompress(payload)
+
+    conversations = {}
+    for line in raw.decode("utf-8").splitlines():
+        if line:
+            record = json.loads(line)
+            conversations[record["conversation_id"]] = record["messages"]
+    return conversations
+
+
+# 파일은 레코드 제거(_remove_records) 때만 바뀌며, 그때 캐시를 비움
+_read_archive = lru_cache(maxsize=8)(_load_archive)
+
+
+def _remove_records(path: Path, conversation_ids: set[int]) -> int:
+    """아카이브 파일에서 대화 레코드 제거 (남은 레코드가 없으면 파일 삭제), 제거한 레코드 수 반환"""
+    if not path.exists():
+        return 0
+    conversations = _load_archive(str(path))
+    records = [
+        {"conversation_id": cid, "messages": messages}
+        for cid, messages in conversations.items()
+        if cid not in conversation_ids
+    ]
+    removed = len(conversations) - len(records)
+    if removed and records:
+        write_archive(path, records)
+    elif removed:
+        path.unlink()
+    return removed
+
+
+async def purge_archived(archive_path: str, conversation_ids: Iterable[int], root: Optional[Path] = None) -> int:
+    """
+    아카이브 파일에서 대화 메시지 제거 (대화 삭제, 재아카이브 후 이전 파일 정리)
+
+    Returns:
+        제거한 대화 레코드 수
+    """
+    path = (root or Path(settings.archive_dir)) / archive_path
+    async with _rewrite_lock:
+        removed = await asyncio.to_thread(_remove_records, path, set(conversation_ids))
+        if removed:
+            _read_archive.cache_clear()
+    return removed
+
+
+def schedule_purge(session: AsyncSession, archive_path: str, conversation_id: int) -> None:
+    """
+    세션 커밋 후 아카이브 파일에서 대화 레코드 제거 예약
+
+    커밋 전에 파일을 고치면 커밋이 실패했을 때 대화 stub만 남고 메시지는 사라지므로,
+    커밋이 성공한 뒤에만 제거합니다 (롤백되면 예약 취소).
+    """
+    session.sync_session.info.setdefault(_PURGES_KEY, []).append((archive_path, conversation_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _purge_after_commit(session: Session) -> None:
+    purges = session.info.pop(_PURGES_KEY, None)
+    if not purges:
+        return
+    by_path: dict[str, list[int]] = defaultdict(list)
+    for archive_path, conversation_id in purges:
+        by_path[archive_path].append(conversation_id)
+    for archive_path, conversation_ids in by_path.items():
+        task = create_detached_task(_purge_logged(archive_path, conversation_ids))
+        _purge_tasks.add(task)
+        task.add_done_callback(_purge_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_purges(session: Session) -> None:
+    session.info.pop(_PURGES_KEY, None)
+
+
+async def _purge_logged(archive_path: str, conversation_ids: list[int]) -> None:
+    try:
+        await purge_archived(archive_path, conversation_ids)
+    except Exception as e:
+        logger.exception("archive_purge_failed", archive_path=archive_path, error=str(e))
+
+
+async def wait_purges() -> None:
+    """예약된 아카이브 레코드 제거가 모두 끝날 때까지 대기"""
+    while pending := [task for task in _purge_tasks if not task.done()]:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _to_row(message: ChatMessage) -> dict:
+    row = {column: getattr(message, column) for column in MESSAGE_COLUMNS}
+    for column in DATETIME_COLUMNS:
+        if row[column] is not None:
+            row[column] = row[column].isoformat()
+    return row
+
+
+def _from_row(row: dict) -> ChatMessage:
+    """아카이브 행 → 세션에 속하지 않는 ChatMessage (조회 응답용)"""
+    values = {column: row.get(column) for column in MESSAGE_COLUMNS}
+    for column in DATETIME_COLUMNS:
+        if values[column] is not None:
+            values[column] = datetime.fromisoformat(values[column])
+    return ChatMessage(**values)
+
+
+async def load_archived_messages(archive_path: str, conversation_id: int) -> list[ChatMessage]:
+    """아카이브된 대화의 메시지 복원 (created_at, id 순)"""
+    path = Path(settings.archive_dir) / archive_path
+    conversations = await asyncio.to_thread(_read_archive, str(path))
+    return [_from_row(row) for row in conversations.get(conversation_id, [])]
+
+
+# ============================================================
+# Archiver
+# ============================================================
+
+class ConversationArchiver:
+    """
+    유휴 대화 아카이브 작업
+
+    updated_at이 idle_days보다 오래된 대화를 batch_size개씩 골라 마지막 활동일 파티션별
+    파일로 쓴 뒤, 한 트랜잭션에서 대화 행에 archived_at/archive_path를 기록하고 메시지 행을 삭제합니다.
+    파일을 쓰는 동안 새 메시지가 들어온(또는 삭제된) 대화는 updated_at 조건에 걸려 이번 실행에서 제외되고
+    방금 쓴 파일에서도 제거됩니다.
+    아카이브 이후 추가된 메시지는 hot 테이블에 남아 조회 시 아카이브와 합쳐지며, 대화가 다시 유휴가 되면
+    이전 아카이브 메시지와 합쳐 새 파일로 옮기고 이전 파일의 레코드를 제거합니다.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        idle_days: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        session_maker=async_session_maker,
+    ):
+        self.root = Path(root or settings.archive_dir)
+        self.idle_days = idle_days or settings.archive_idle_days
+        self.batch_size = batch_size or settings.archive_batch_size
+        self.interval = interval or settings.archive_interval
+        self.session_maker = session_maker
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """주기 실행 시작 (lifespan에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await wait_purges()  # 삭제된 대화의 아카이브 레코드 제거 마무리
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.archive_idle()
+            except Exception as e:
+                logger.exception("archive_failed", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def archive_idle(self, now: Optional[datetime] = None) -> int:
+        """유휴 대화를 모두 아카이브 (배치 반복), 아카이브한 대화 수 반환"""
+        total = 0
+        while True:
+            archived, selected = await self.archive_batch(now)
+            total += archived
+            if selected < self.batch_size:
+                return total
+
+    async def archive_batch(self, now: Optional[datetime] = None) -> tuple[int, int]:
+        """
+        유휴 대화 한 배치 아카이브
+
+        Returns:
+            (아카이브한 대화 수, 선택된 대화 수)
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=self.idle_days)
+
+        async with self.session_maker() as session:
+            conversations = (await session.execute(
+                select(Conversation.id, Conversation.updated_at, Conversation.archive_path)
+                .where(ARCHIVABLE, Conversation.updated_at < cutoff)
+                .order_by(Conversation.updated_at)
+                .limit(self.batch_size)
+            )).all()
+            if not conversations:
+                return 0, 0
+            messages = (await session.execute(
+                select(ChatMessage)
+                .where(ChatMessage.conversation_id.in_([c.id for c in conversations]))
+                .order_by(ChatMessage.conversation_id, ChatMessage.created_at, ChatMessage.id)
+            )).scalars().all()
+
+        # 재아카이브: 이전 파일의 메시지 뒤에 hot 메시지를 이어 붙임 (hot 행 id만 삭제 대상)
+        by_conversation: dict[int, list[dict]] = defaultdict(list)
+        previous = {c.id: c.archive_path for c in conversations if c.archive_path}
+        for cid, archive_path in previous.items():
+            archived = await asyncio.to_thread(_read_archive, str(self.root / archive_path))
+            by_conversation[cid].extend(archived.get(cid, []))
+        hot_ids: dict[int, list[int]] = defaultdict(list)
+        for message in messages:
+            by_conversation[message.conversation_id].append(_to_row(message))
+            hot_ids[message.conversation_id].append(message.id)
+
+        # 마지막 활동일 파티션별 파일 작성
+        partitions: dict[str, list[int]] = defaultdict(list)
+        for conversation in conversations:
+            partitions[conversation.updated_at.strftime("%Y-%m-%d")].append(conversation.id)
+
+        run = f"{now:%H%M%S}-{uuid.uuid4().hex[:8]}"
+        archived = moved = 0
+        for day, ids in sorted(partitions.items()):
+            archive_path = f"{day}/conversations-{run}{archive_suffix()}"
+            records = [{"conversation_id": cid, "messages": by_conversation.get(cid, [])} for cid in ids]
+            await asyncio.to_thread(write_archive, self.root / archive_path, records)
+
+            async with self.session_maker() as session, session.begin():
+                await session.execute(
+                    update(Conversation)
+                    .where(
+                        Conversation.id.in_(ids),
+                        ARCHIVABLE,
+                        Conversation.updated_at < cutoff,  # 파일 작성 중 새 메시지가 온 대화 제외
+                    )
+                    # updated_at은 유지 (onupdate로 갱신되면 목록 정렬이 바뀜)
+                    .values(archived_at=now, archive_path=archive_path, updated_at=Conversation.updated_at)
+                )
+                stamped = (await session.execute(
+                    select(Conversation.id).where(Conversation.archive_path == archive_path)
+                )).scalars().all()
+                message_ids = [message_id for cid in stamped for message_id in hot_ids.get(cid, [])]
+                for i in range(0, len(message_ids), 500):
+                    await session.execute(
+                        delete(ChatMessage).where(ChatMessage.id.in_(message_ids[i:i + 500]))
+                    )
+
+            # 파일 작성 중 새 메시지가 왔거나 삭제된 대화는 UPDATE에서 빠지므로 새 파일에서 제거
+            # (삭제 쪽은 이전 파일만 정리하므로 여기서 빼지 않으면 새 파일에 메시지가 남음)
+            # 재아카이브한 대화는 이전 파일에서 제거
+            skipped = set(ids) - set(stamped)
+            if skipped:
+                await purge_archived(archive_path, skipped, self.root)
+            for cid in stamped:
+                if cid in previous:
+                    await purge_archived(previous[cid], [cid], self.root)
+
+            archived += len(stamped)
+            moved += len(message_ids)
+
+        ARCHIVED_CONVERSATIONS_TOTAL.inc(archived)
+        ARCHIVED_MESSAGES_TOTAL.inc(moved)
+        logger.info("conversations_archived", conversations=archived, messages=moved, partitions=len(partitions))
+        return archived, len(conversations)
+
+
+# 전역 아카이버
+conversation_archiver = ConversationArchiver()
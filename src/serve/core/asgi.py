@@ -0,0 +1,54 @@
+"""
+ASGI Helpers
+
+순수 ASGI 미들웨어 공통 유틸리티
+"""
+
+from starlette.routing import Mount
+from starlette.types import Scope
+
+# 라우트에 매칭되지 않은 요청(404 등)의 라벨 - 원본 경로를 라벨로 쓰지 않아 카디널리티 제한
+UNMATCHED_ROUTE = "<unmatched>"
+
+# endpoint → 라우트 (scope["route"]를 기록하지 않는 라우트용, 최초 조회 시 채움)
+_endpoint_routes: dict = {}
+
+
+def _route_for_endpoint(scope: Scope):
+    """
+    매칭된 endpoint로 라우트 조회
+
+    FastAPI 라우터는 APIRoute만 scope["route"]에 기록하므로 /docs, /openapi.json 같은
+    일반 Route는 scope["endpoint"]로 앱 라우트 목록에서 한 번 찾아 캐시합니다.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return None
+    if endpoint not in _endpoint_routes:
+        app = scope.get("app")
+        _endpoint_routes[endpoint] = next(
+            (r for r in getattr(app, "routes", ()) if getattr(r, "endpoint", None) is endpoint), None
+        )
+    return _endpoint_routes[endpoint]
+
+
+def route_template(scope: Scope, root_path: str = "") -> str:
+    """
+    라우터가 매칭한 경로 템플릿 (예: /v1/conversations/{conversation_id})
+
+    라우터는 매칭한 라우트를 scope["route"]에, Mount 접두사를 scope["root_path"]에 기록하므로
+    앱 호출 이후(응답 시작 시점) 같은 scope에서 읽습니다.
+
+    Args:
+        scope: 앱에 전달한 ASGI scope
+        root_path: 미들웨어 진입 시점의 root_path (Mount 접두사 계산 기준)
+    """
+    route = scope.get("route") or _route_for_endpoint(scope)
+    path = getattr(route, "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    prefix = scope.get("root_path", "")[len(root_path):]
+    if isinstance(route, Mount):
+        # 하위 앱이 라우트를 기록하지 않음 (StaticFiles, 하위 라우터 404 등) → 마운트 경로
+        return prefix
+    return prefix + path
@@ -0,0 +1,437 @@
+"""
+Batch Completion
+
+오프라인 대량 채팅 완성 (JSONL 업로드 → 제한 병렬 실행 → JSONL 결과)
+- 입력 행: {"request_id": ..., "body": <프롬프트 문자열 | 채팅 완성 요청 객체>}
+- 결과는 완료 순서대로 output.jsonl에 추가되며, 재시작 시 이미 기록된 request_id는 건너뜀
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.serve.core.admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from src.serve.core.config import settings
+from src.serve.core.llm_router import LLMRouter
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import BATCH_REQUESTS_TOTAL
+from src.serve.core.tracing import create_detached_task
+
+logger = get_logger(__name__)
+
+# 채팅 완성 요청 객체에서 허용하는 필드
+REQUEST_FIELDS = ("messages", "model", "temperature", "max_tokens", "top_p")
+
+# 재시작 시 이어서 실행할 상태
+RESUMABLE_STATUSES = ("queued", "running")
+
+
+def parse_batch_line(line: str) -> tuple[str, dict]:
+    """
+    입력 JSONL 한 행 파싱
+
+    body가 문자열이면 단일 user 메시지로, 객체면 채팅 완성 요청으로 해석합니다.
+    (title 등 나머지 필드는 무시)
+
+    Raises:
+        ValueError: 형식 오류
+    """
+    item = json.loads(line)
+    if not isinstance(item, dict) or "request_id" not in item or "body" not in item:
+        raise ValueError("each line needs 'request_id' and 'body'")
+
+    body = item["body"]
+    if isinstance(body, str):
+        payload = {"messages": [{"role": "user", "content": body}]}
+    elif isinstance(body, dict) and isinstance(body.get("messages"), list) and body["messages"]:
+        payload = {k: body[k] for k in REQUEST_FIELDS if body.get(k) is not None}
+    else:
+        raise ValueError("'body' must be a prompt string or an object with 'messages'")
+
+    for message in payload["messages"]:
+        if not isinstance(message, dict) or "role" not in message or "content" not in message:
+            raise ValueError("each message needs 'role' and 'content'")
+    return str(item["request_id"]), payload
+
+
+def parse_batch_input(content: bytes) -> list[tuple[str, dict]]:
+    """입력 JSONL 전체 파싱 (빈 줄 무시, request_id 중복 금지)"""
+    requests: list[tuple[str, dict]] = []
+    seen: set[str] = set()
+    for number, line in enumerate(content.decode("utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            request_id, payload = parse_batch_line(line)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"line {number}: {e}") from e
+        if request_id in seen:
+            raise ValueError(f"line {number}: duplicate request_id '{request_id}'")
+        seen.add(request_id)
+        requests.append((request_id, payload))
+    return requests
+
+
+@dataclass
+class BatchJob:
+    """배치 작업 상태 (meta.json에 저장)"""
+    id: str
+    directory: Path
+    total: int
+    status: str = "queued"  # queued / running / completed / failed / cancelled
+    completed: int = 0
+    failed: int = 0
+    model: Optional[str] = None
+    max_concurrency: int = field(default_factory=lambda: settings.batch_concurrency)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    @property
+    def input_path(self) -> Path:
+        return self.directory / "input.jsonl"
+
+    @property
+    def output_path(self) -> Path:
+        return self.directory / "output.jsonl"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.failed
+
+    def save(self) -> None:
+        """meta.json 저장 (임시 파일 → rename으로 원자적 교체)"""
+        meta = {
+            "id": self.id,
+            "total": self.total,
+            "status": self.status,
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+
+    @classmethod
+    def load(cls, directory: Path) -> "BatchJob":
+        """meta.json에서 복원 (진행률은 output.jsonl로 다시 계산)"""
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        parse = lambda v: datetime.fromisoformat(v) if v else None  # noqa: E731
+        return cls(
+            id=meta["id"],
+            directory=directory,
+            total=meta["total"],
+            status=meta["status"],
+            model=meta.get("model"),
+            max_concurrency=meta.get("max_concurrency") or settings.batch_concurrency,
+            created_at=parse(meta["created_at"]),
+            started_at=parse(meta.get("started_at")),
+            finished_at=parse(meta.get("finished_at")),
+            error=meta.get("error"),
+        )
+
+
+class BatchManager:
+    """
+    배치 작업 관리자
+
+    배치마다 worker max_concurrency개가 공유 큐에서 요청을 꺼내 LLMRouter로 보내고,
+    단일 writer가 결과를 output.jsonl에 모아서 기록합니다.
+    upstream 슬롯은 낮은 우선순위(settings.batch_priority)로 어드미션 컨트롤러에서 받으므로
+    대화형 요청이 항상 먼저 처리됩니다.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.batch_dir)
+        self._jobs: dict[str, BatchJob] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    # ============================================================
+    # Job Management
+    # ============================================================
+
+    def get(self, batch_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(batch_id)
+
+    def list_jobs(self) -> list[BatchJob]:
+        """최근 생성 순 배치 목록"""
+        return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def is_running(self, batch_id: str) -> bool:
+        task = self._tasks.get(batch_id)
+        return task is not None and not task.done()
+
+    async def create(
+        self,
+        content: bytes,
+        llm: LLMRouter,
+        admission: AdmissionController,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> BatchJob:
+        """
+        배치 생성 및 실행 시작
+
+        Raises:
+            ValueError: 입력 형식 오류 / 요청 수 초과
+        """
+        requests = parse_batch_input(content)
+        if not requests:
+            raise ValueError("batch input is empty")
+        if len(requests) > settings.batch_max_requests:
+            raise ValueError(f"batch exceeds {settings.batch_max_requests} requests")
+
+        batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+        job = BatchJob(
+            id=batch_id,
+            directory=self.root / batch_id,
+            total=len(requests),
+            model=model,
+            max_concurrency=max_concurrency or settings.batch_concurrency,
+        )
+
+        def write() -> None:
+            job.directory.mkdir(parents=True, exist_ok=True)
+            job.input_path.write_bytes(content)
+            job.output_path.touch()
+            job.save()
+
+        await asyncio.to_thread(write)
+        self._jobs[job.id] = job
+        self.resume(job, llm, admission)
+        logger.info("batch_created", batch_id=job.id, total=job.total)
+        return job
+
+    def resume(self, job: BatchJob, llm: LLMRouter, admission: AdmissionController) -> None:
+        """배치 실행 (이미 실행 중이면 무시)"""
+        if self.is_running(job.id):
+            return
+        job.status = "queued"
+        job.error = None
+        # 요청(POST /v1/batches)에서 시작해도 배치 실행은 요청 트레이스와 분리
+        self._tasks[job.id] = create_detached_task(self._run(job, llm, admission))
+
+    async def cancel(self, job: BatchJob) -> None:
+        """배치 취소 (이미 기록된 결과는 유지, resume으로 재개 가능)"""
+        job.status = "cancelled"
+        task = self._tasks.pop(job.id, None)
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        job.finished_at = datetime.utcnow()
+        await asyncio.to_thread(job.save)
+
+    async def start(self, llm: LLMRouter, admission: AdmissionController) -> None:
+        """디스크의 배치 목록 복원 및 미완료 배치 재개 (lifespan에서 호출)"""
+        directories = await asyncio.to_thread(
+            lambda: list(self.root.glob("*/meta.json")) if self.root.exists() else []
+        )
+        for meta_path in directories:
+            try:
+                job = await asyncio.to_thread(BatchJob.load, meta_path.parent)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("batch_load_failed", path=str(meta_path), error=str(e))
+                continue
+            self._jobs[job.id] = job
+            if job.status in RESUMABLE_STATUSES:
+                logger.info("batch_resumed", batch_id=job.id)
+                self.resume(job, llm, admission)
+            else:
+                await asyncio.to_thread(self._recount, job)
+
+    async def close(self) -> None:
+        """실행 중 배치 중단 (상태는 running으로 남아 다음 시작 시 재개)"""
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    # ============================================================
+    # Execution
+    # ============================================================
+
+    async def _run(self, job: BatchJob, llm: LLMRouter, admission: AdmissionController) -> None:
+        """남은 요청을 max_concurrency개 worker로 실행"""
+        try:
+            done = await asyncio.to_thread(self._recount, job)
+            content = await asyncio.to_thread(job.input_path.read_bytes)
+            pending = [item for item in parse_batch_input(content) if item[0] not in done]
+
+            job.status = "running"
+            job.started_at = job.started_at or datetime.utcnow()
+            job.finished_at = None
+            await asyncio.to_thread(job.save)
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in pending:
+                queue.put_nowait(item)
+            results: asyncio.Queue = asyncio.Queue()
+
+            writer = asyncio.create_task(self._write_results(job, results))
+            workers = [
+                asyncio.create_task(self._worker(job, queue, results, llm, admission))
+                for _ in range(min(job.max_concurrency, len(pending)))
+            ]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                results.put_nowait(None)
+                await writer  # 완료된 결과는 취소 시에도 기록
+
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            logger.info("batch_completed", batch_id=job.id, completed=job.completed, failed=job.failed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            logger.exception("batch_failed", batch_id=job.id, error=str(e))
+        await asyncio.to_thread(job.save)
+
+    async def _worker(
+        self,
+        job: BatchJob,
+        queue: asyncio.Queue,
+        results: asyncio.Queue,
+        llm: LLMRouter,
+        admission: AdmissionController,
+    ) -> None:
+        while True:
+            try:
+                request_id, payload = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results.put_nowait(await self._execute(job, request_id, payload, llm, admission))
+
+    async def _execute(
+        self,
+        job: BatchJob,
+        request_id: str,
+        payload: dict,
+        llm: LLMRouter,
+        admission: AdmissionController,
+    ) -> dict:
+        """요청 1건 실행 → 결과 행"""
+        model = payload.get("model") or job.model
+        ticket = await self._admit(job, admission, model)
+        try:
+            response = await llm.chat_completion(
+                messages=payload["messages"],
+                model=model,
+                temperature=payload.get("temperature", settings.default_temperature),
+                max_tokens=payload.get("max_tokens", settings.default_max_tokens),
+                top_p=payload.get("top_p", settings.default_top_p),
+                backend=ticket.backend,
+            )
+        except Exception as e:
+            response = {"error": str(e)}
+        finally:
+            ticket.release()
+
+        if "error" in response:
+            return {"request_id": request_id, "status": "failed", "error": response["error"]}
+        return {
+            "request_id": request_id,
+            "status": "completed",
+            "response": {
+                "content": response["content"],
+                "model": response.get("model"),
+                "usage": response.get("usage", {}),
+                "finish_reason": response.get("finish_reason"),
+            },
+        }
+
+    async def _admit(self, job: BatchJob, admission: AdmissionController, model: Optional[str]) -> AdmissionTicket:
+        """낮은 우선순위로 upstream 슬롯 획득 (거절되면 Retry-After만큼 기다렸다가 재시도)"""
+        while True:
+            try:
+                return await admission.acquire(f"batch:{job.id}", priority=settings.batch_priority, model=model)
+            except AdmissionRejected as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def _write_results(self, job: BatchJob, results: asyncio.Queue) -> None:
+        """결과 큐를 비울 때마다 한 번에 append (None: 종료)"""
+        with open(job.output_path, "a", encoding="utf-8") as f:
+            finished = False
+            while not finished:
+                rows = [await results.get()]
+                while not results.empty():
+                    rows.append(results.get_nowait())
+                finished = rows[-1] is None
+                rows = [r for r in rows if r is not None]
+                if not rows:
+                    continue
+
+                lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows)
+                await asyncio.to_thread(self._append, f, lines)
+                for row in rows:
+                    if row["status"] == "completed":
+                        job.completed += 1
+                    else:
+                        job.failed += 1
+                    BATCH_REQUESTS_TOTAL.labels(status=row["status"]).inc()
+
+    @staticmethod
+    def _append(f, lines: str) -> None:
+        f.write(lines)
+        f.flush()
+
+    @staticmethod
+    def _recount(job: BatchJob) -> set[str]:
+        """
+        output.jsonl에서 완료된 request_id 및 진행률 복원
+
+        크래시로 마지막 행이 잘렸으면 해당 행을 잘라내고 다시 실행합니다.
+        """
+        done: set[str] = set()
+        job.completed = job.failed = 0
+        if not job.output_path.exists():
+            return done
+
+        valid_bytes = 0
+        with open(job.output_path, "rb") as f:
+            for raw in f:
+                try:
+                    row = json.loads(raw)
+                except ValueError:
+                    break
+                if not raw.endswith(b"\n"):
+                    break
+                valid_bytes += len(raw)
+                done.add(row["request_id"])
+                if row["status"] == "completed":
+                    job.completed += 1
+                else:
+                    job.failed += 1
+
+        if valid_bytes < job.output_path.stat().st_size:
+            with open(job.output_path, "r+b") as f:
+                f.truncate(valid_bytes)
+        return done
+
+
+# 전역 배치 관리자
+batch_manager = BatchManager()
@@ -0,0 +1,172 @@
+"""
+Circuit Breaker
+
+백엔드별 upstream 장애/포화 감지 및 빠른 실패 (closed → open → half-open)
+"""
+
+import math
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import LLM_CIRCUIT_STATE
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Prometheus 게이지 값
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    서킷 브레이커
+
+    최근 window초 동안의 요청 결과(성공 여부, 지연 시간)를 유지하면서
+    에러율 또는 p99 지연이 임계값을 넘으면 open 상태로 전환해 요청을 즉시 실패시킵니다.
+    연결 자체가 실패하면(서버 재시작 등) 표본 수와 무관하게 바로 open 됩니다.
+    open_seconds가 지나면 half-open 상태에서 probe 요청 1건만 통과시키고,
+    probe가 성공하면 closed, 실패하면 다시 open 됩니다.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        window: Optional[float] = None,
+        min_requests: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        p99_latency: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window = window or settings.circuit_window_seconds
+        self.min_requests = min_requests or settings.circuit_min_requests
+        self.error_rate = error_rate or settings.circuit_error_rate
+        self.p99_latency = p99_latency if p99_latency is not None else settings.circuit_p99_latency
+        self.open_seconds = open_seconds or settings.circuit_open_seconds
+        self.enabled = settings.circuit_breaker_enabled if enabled is None else enabled
+        self._clock = clock
+        self._samples: deque[tuple[float, bool, float]] = deque()  # (시각, 성공 여부, 지연 초)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._p99_checked_at = 0.0
+        self._probing = False
+        self.state = CLOSED
+        self._set_gauge()
+
+    # ============================================================
+    # Admission
+    # ============================================================
+
+    @property
+    def available(self) -> bool:
+        """요청을 보낼 수 있는 상태인지 (상태 변경 없음, 라우팅용)"""
+        if not self.enabled or self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._clock() - self._opened_at >= self.open_seconds
+        return not self._probing
+
+    @property
+    def retry_after(self) -> float:
+        """open 상태가 풀리기까지 남은 시간 (초)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """요청 허용 여부 (half-open에서는 probe 1건만 허용)"""
+        if not self.enabled or self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    # ============================================================
+    # Recording
+    # ============================================================
+
+    def record_success(self, latency: float) -> None:
+        """성공 기록"""
+        if not self.enabled:
+            return
+        if self.state == HALF_OPEN:
+            self._probing = False
+            self._samples.clear()
+            self._failures = 0
+            self._transition(CLOSED)
+            return
+        self._add(True, latency)
+
+    def record_failure(self, latency: float = 0.0, fatal: bool = False) -> None:
+        """
+        실패 기록
+
+        Args:
+            fatal: 연결 실패처럼 서버가 내려간 것이 확실한 경우 즉시 open
+        """
+        if not self.enabled:
+            return
+        if self.state == HALF_OPEN or fatal:
+            self._open()
+            return
+        self._add(False, latency)
+
+    def release_probe(self) -> None:
+        """결과 없이 끝난 probe 반납 (클라이언트 취소 등)"""
+        self._probing = False
+
+    def _add(self, success: bool, latency: float) -> None:
+        now = self._clock()
+        self._samples.append((now, success, latency))
+        if not success:
+            self._failures += 1
+        while self._samples and self._samples[0][0] < now - self.window:
+            _, ok, _ = self._samples.popleft()
+            if not ok:
+                self._failures -= 1
+
+        if self.state == CLOSED and len(self._samples) >= self.min_requests:
+            if self._failures / len(self._samples) >= self.error_rate:
+                self._open()
+            elif self.p99_latency and now - self._p99_checked_at >= 1.0:
+                self._p99_checked_at = now  # 정렬 비용 때문에 초당 1회만 계산
+                if self._p99() >= self.p99_latency:
+                    self._open()
+
+    def _p99(self) -> float:
+        latencies = sorted(latency for _, _, latency in self._samples)
+        return latencies[min(len(latencies) - 1, math.ceil(0.99 * len(latencies)) - 1)]
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._probing = False
+        if self.state != OPEN:
+            logger.warning(
+                "circuit_opened",
+                backend=self.name,
+                samples=len(self._samples),
+                failures=self._failures,
+            )
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == CLOSED and self.state != CLOSED:
+            logger.info("circuit_closed", backend=self.name)
+        self.state = state
+        self._set_gauge()
+
+    def _set_gauge(self) -> None:
+        LLM_CIRCUIT_STATE.labels(backend=self.name).set(STATE_VALUES[self.state])
@@ -0,0 +1,131 @@
+"""
+Request Coalescing
+
+동일한 진행 중 LLM 요청 병합 (single-flight)
+- 비스트리밍: 하나의 upstream 결과를 여러 호출자가 공유
+- 스트리밍: 하나의 upstream SSE 스트림을 여러 구독자에게 팬아웃
+- upstream 지표(TTFT, 토큰 수, 사용량)는 upstream을 시작한 요청만 기록 (joined_inflight())
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Optional
+
+from src.serve.core.metrics import LLM_COALESCED_REQUESTS_TOTAL
+from src.serve.core.tracing import create_detached_task
+
+# 현재 요청이 마지막으로 병합 호출했을 때 다른 요청의 upstream 결과에 합류했는지
+_joined: ContextVar[bool] = ContextVar("coalesce_joined", default=False)
+
+
+def joined_inflight() -> bool:
+    """
+    현재 요청이 진행 중이던 다른 요청의 upstream 호출/스트림에 합류했는지
+
+    합류한 요청(follower)은 llm_coalesced_requests_total만 올리고, upstream 지표는
+    upstream을 시작한 요청(leader)이 한 번만 기록합니다.
+    스트리밍은 첫 청크를 받은 뒤부터 유효합니다 (구독이 첫 반복에서 일어나므로).
+    """
+    return _joined.get()
+
+
+class SingleFlight:
+    """
+    키별 진행 중 요청 병합
+
+    upstream 호출은 별도 태스크로 실행되므로 처음 요청한 클라이언트가
+    연결을 끊어도 나머지 호출자는 결과를 받습니다. (어느 한 요청의 트레이스에도 속하지 않음)
+    """
+
+    def __init__(self):
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        """key가 같은 요청이 진행 중이면 그 결과를, 아니면 fn()을 실행"""
+        task = self._calls.get(key)
+        if task is None:
+            task = create_detached_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            _joined.set(False)
+        else:
+            LLM_COALESCED_REQUESTS_TOTAL.labels(mode="unary").inc()
+            _joined.set(True)
+        result = await asyncio.shield(task)
+        return dict(result)
+
+
+class _Broadcast:
+    """upstream 스트림 1개 → 구독자 N명 (늦게 합류한 구독자는 버퍼부터 재생)"""
+
+    def __init__(self, source: AsyncIterator[bytes], on_done: Callable[[], None]):
+        self.chunks: list[bytes] = []
+        self.done = False
+        self.subscribers = 0
+        self._changed = asyncio.Condition()
+        self._on_done = on_done
+        self._task = create_detached_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[bytes]) -> None:
+        try:
+            async for chunk in source:
+                async with self._changed:
+                    self.chunks.append(chunk)
+                    self._changed.notify_all()
+        finally:
+            self._on_done()
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    def subscribe(self) -> AsyncGenerator[bytes, None]:
+        """구독자 등록 (등록 시점에 카운트해야 먼저 끝난 구독자가 upstream을 취소하지 않음)"""
+        self.subscribers += 1
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncGenerator[bytes, None]:
+        index = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: index < len(self.chunks) or self.done)
+                    pending = self.chunks[index:]
+                    finished = self.done
+                index += len(pending)
+                for chunk in pending:
+                    yield chunk
+                if finished and index >= len(self.chunks):
+                    return
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                self._task.cancel()  # 구독자가 모두 떠나면 upstream 중단
+
+
+class StreamFanout:
+    """키별 진행 중 스트림 공유"""
+
+    def __init__(self):
+        self._streams: dict[str, _Broadcast] = {}
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def subscribe(
+        self,
+        key: str,
+        open_stream: Callable[[], AsyncIterator[bytes]],
+    ) -> AsyncGenerator[bytes, None]:
+        """key가 같은 스트림이 진행 중이면 합류, 아니면 open_stream()으로 새로 시작"""
+        broadcast: Optional[_Broadcast] = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast(open_stream(), on_done=lambda: self._streams.pop(key, None))
+            self._streams[key] = broadcast
+            _joined.set(False)
+        else:
+            LLM_COALESCED_REQUESTS_TOTAL.labels(mode="stream").inc()
+            _joined.set(True)
+        return broadcast.subscribe()
@@ -28,10 +28,101 @@ class Settings(BaseSettings):
     # 서버 설정
     fastapi_host: str = "0.0.0.0"
     fastapi_port: int = 8080
+    json_backend: str = "auto"  # auto / orjson / msgspec / json (응답 직렬화, vLLM 응답 디코딩)
     
     # vLLM 설정
     vllm_base_url: str = "http://localhost:8000/v1"
     default_model: Optional[str] = None
+    llm_request_timeout: float = 60.0
+    llm_router_refresh_interval: float = 30.0  # llm_models 테이블 재로딩 주기 (초)
+    llm_coalesce_enabled: bool = True  # 동일한 진행 중 요청 병합
+    llm_connect_timeout: float = 2.0  # 연결 타임아웃 (서버 다운 시 빠른 실패)
+    llm_models_cache_ttl: float = 30.0  # /models 목록 캐시 (초)
+    
+    # 헤징 / 재시도 (꼬리 지연 완화)
+    llm_hedge_enabled: bool = True
+    llm_hedge_percentile: float = 95.0  # 최근 TTFT 분위수를 넘으면 다른 백엔드로 헤지
+    llm_hedge_min_delay: float = 0.05  # 최소 헤지 대기 (초)
+    llm_hedge_min_samples: int = 20  # 분위수 계산에 필요한 최소 표본 수
+    llm_retry_attempts: int = 2  # 비스트리밍 요청 재시도 횟수
+    llm_retry_backoff: float = 0.1  # jitter backoff 기준 (초)
+    llm_retry_deadline: float = 30.0  # 재시도 포함 전체 데드라인 (초)
+    
+    # 서킷 브레이커 (백엔드별)
+    circuit_breaker_enabled: bool = True
+    circuit_window_seconds: float = 30.0  # 에러율/p99 집계 구간
+    circuit_min_requests: int = 10  # 판정에 필요한 최소 요청 수
+    circuit_error_rate: float = 0.5
+    circuit_p99_latency: float = 0.0  # p99 지연 임계값 (초, 0: 사용 안 함)
+    circuit_open_seconds: float = 10.0  # open 유지 시간 (이후 half-open probe)
+    
+    # 어드미션 제어 (백엔드별 동시 요청 상한 + 우선순위 대기열)
+    llm_max_inflight_per_backend: int = 0  # 0: 무제한
+    admission_max_queue: int = 256
+    admission_queue_timeout: float = 10.0  # 대기 데드라인 (초)
+    admission_default_priority: int = 10  # 작을수록 먼저 처리
+    admission_priorities: dict[str, int] = {}  # API 키별 우선순위
+    
+    # vLLM 엔진 지표 (백엔드별 /metrics 스크랩 → 라우팅/어드미션에 반영)
+    engine_metrics_enabled: bool = True
+    engine_metrics_interval: float = 2.0  # 스크랩 주기 (초)
+    engine_metrics_timeout: float = 1.0
+    engine_metrics_stale_after: float = 10.0  # 이보다 오래된 지표는 무시 (스크랩 실패 시)
+    engine_kv_cache_saturation: float = 0.95  # KV 캐시 사용률이 이 이상이면 포화
+    engine_max_waiting: int = 4  # 엔진 대기 시퀀스가 이보다 많으면 포화 (정상 배칭에서도 몇 개는 대기)
+    engine_max_waiting_ratio: float = 0.5  # 또는 실행 시퀀스 수 × 이 비율보다 많으면 포화 (큰 쪽 기준)
+    engine_saturation_admission: bool = False  # 포화 백엔드 용량을 포화 시점 진행 중 요청 수로 제한 (opt-in)
+    
+    # 메시지 write-behind 큐 (대화 저장을 요청 경로 밖에서 일괄 처리)
+    message_queue_enabled: bool = True
+    message_queue_size: int = 1024  # 대기 가능한 교환(사용자+어시스턴트) 수, 가득 차면 요청이 대기
+    message_batch_size: int = 256  # INSERT 한 번에 저장할 최대 메시지 수
+    message_write_retries: int = 3  # 배치 저장 실패 시 재시도 횟수
+    message_flush_timeout: float = 2.0  # 이력 조회 전 미저장 메시지 대기 상한 (초)
+    message_dead_letter_path: str = "./data/message_dead_letter.jsonl"  # 교환 단위 재시도까지 실패한 메시지
+    
+    # 대화 아카이브 (유휴 대화 메시지를 일 단위 압축 JSONL로 이동)
+    archive_enabled: bool = False
+    archive_dir: str = "./data/archive"
+    archive_idle_days: float = 30.0  # 마지막 활동 후 이 기간이 지나면 아카이브
+    archive_interval: float = 3600.0  # 실행 주기 (초)
+    archive_batch_size: int = 500  # 파일/트랜잭션당 최대 대화 수
+    archive_compression: str = "zstd"  # zstd (zstandard 필요) / gzip
+    archive_compression_level: int = 9
+    
+    # 메시지 통계 롤업 (관리자 대시보드용 시간별 사전 집계)
+    stats_rollup_enabled: bool = True
+    stats_rollup_interval: float = 60.0  # 증분 집계 주기 (초)
+    stats_rollup_batch_size: int = 5000  # 한 트랜잭션에서 집계할 최대 메시지 수
+    stats_rollup_gap_timeout: float = 600.0  # 워터마크 아래 빈 id를 늦은 커밋 대비로 다시 조회하는 기간 (초)
+    stats_rollup_max_gaps: int = 10000  # 추적할 빈 id 최대 개수
+    
+    # 컨텍스트 윈도우 (서버 측 대화 이력 조립)
+    tokenizer_name: Optional[str] = None  # HF 토크나이저 ID/경로 (없으면 근사치)
+    context_max_tokens: int = 4096  # LLMModel 미연결 프리셋의 컨텍스트 상한
+    context_history_limit: int = 100  # 조립 시 불러올 최근 메시지 수
+    preset_cache_ttl: float = 60.0  # LLMConfig 프리셋 캐시 TTL (초)
+    preset_cache_size: int = 128
+    
+    # 응답 캐시 (temperature=0 요청)
+    response_cache_enabled: bool = True
+    response_cache_ttl: int = 300  # 기본 TTL (초), 프리셋별 cache_ttl_seconds로 재정의
+    response_cache_size: int = 1024  # 메모리 LRU 최대 항목 수
+    response_cache_path: Optional[str] = None  # SQLite 디스크 계층 경로 (없으면 메모리만)
+    
+    # 시맨틱 캐시 (sentence-transformers 필요)
+    semantic_cache_enabled: bool = False
+    semantic_cache_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    semantic_cache_threshold: float = 0.92  # 기본 코사인 유사도 임계값 (프리셋별 재정의)
+    semantic_cache_size: int = 5000
+    semantic_cache_eviction: str = "lru"  # lru / fifo
+    semantic_cache_ttl: int = 3600
+    
+    # 배치 완성 (/v1/batches)
+    batch_dir: str = "./data/batches"  # 배치별 입력/결과 JSONL 저장 경로
+    batch_concurrency: int = 64  # 배치당 동시 upstream 요청 수 (vLLM continuous batching 활용)
+    batch_max_requests: int = 50000
+    batch_priority: int = 100  # 어드미션 우선순위 (대화형 요청보다 뒤)
     
     # 데이터베이스
     database_url: str = "sqlite+aiosqlite:///./mlops_chat.db"
@@ -54,6 +145,26 @@ class Settings(BaseSettings):
 
     # 로깅
     log_dir: str = "./logs/fastapi"  # 로컬: ./logs/fastapi, Docker: /logs
+    log_queue_enabled: bool = True  # 로그 렌더링/쓰기를 백그라운드 스레드에서 처리
+    log_queue_size: int = 10000  # 대기 가능한 로그 레코드 수
+    log_queue_drop_policy: str = "drop_newest"  # 큐가 가득 찼을 때: drop_newest / drop_oldest / block
+    log_request_sample_rate: float = 1.0  # request_started/completed 기록 비율 (오류는 항상 기록)
+    log_request_sample_rates: dict[str, float] = {}  # 경로 접두사별 비율, 예: {"/v1/chat/completions": 0.1}
+
+    # 토큰 사용량 집계 (/metrics/usage, 모델 × 프리셋 × 사용자)
+    usage_window_minutes: int = 60  # 분 단위 롤링 집계 보관 기간
+    usage_max_users: int = 50  # 사용자 라벨 수 상한 (초과 사용자는 "other")
+    usage_user_salt: str = "change-this-usage-salt"  # 사용자 라벨 해시 키
+
+    # 요청 트레이싱 (구간별 소요 시간)
+    tracing_enabled: bool = True  # 요청 트레이스 기록 (request_completed의 spans 필드)
+    tracing_server_timing: bool = True  # 응답에 Server-Timing 헤더 추가
+    tracing_exporter: str = ""  # 내보내기: "" (안 함) / jsonl / otlp
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"  # OTLP/HTTP collector
+    tracing_jsonl_path: str = "./logs/fastapi/traces.jsonl"
+    tracing_export_interval: float = 5.0  # 내보내기 주기 (초)
+    tracing_export_batch_size: int = 256  # 한 번에 내보내는 트레이스 수
+    tracing_export_queue_size: int = 2048  # 대기 가능한 트레이스 수 (초과 시 버림)
 
     # Admin 설정
     admin_username: str = "admin"
@@ -61,6 +172,7 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "change-this-secret-key-in-production"
     jwt_algorithm: str = "HS256"
     admin_token_expire_minutes: int = 60
+    admin_dashboard_cache_ttl: float = 10.0  # 시스템 상태/메시지 통계 대시보드 결과 캐시 (초)
 
 
 @lru_cache
@@ -0,0 +1,53 @@
+"""
+Context Window
+
+서버 측 대화 이력 조립 및 토큰 예산 기반 트리밍
+"""
+
+from typing import Optional, Sequence
+
+from src.serve.core.tokenizer import MESSAGE_OVERHEAD_TOKENS, count_message_tokens, count_tokens
+
+
+def build_context(
+    new_messages: list[dict],
+    history: Sequence[dict] = (),
+    system_prompt: Optional[str] = None,
+    fewshot: Sequence[dict] = (),
+    budget: Optional[int] = None,
+) -> list[dict]:
+    """
+    프롬프트 메시지 조립
+
+    [system_prompt] + fewshot + history + new_messages 순서로 조립하고,
+    budget(프롬프트 토큰 상한)을 넘으면 history의 가장 오래된 턴부터 제거합니다.
+    system_prompt, fewshot, new_messages는 항상 유지됩니다.
+
+    Args:
+        new_messages: 이번 요청에서 새로 추가된 메시지
+        history: 저장된 이전 대화 (오래된 순)
+        system_prompt: LLMConfig 시스템 프롬프트
+        fewshot: LLMConfig few-shot 예시 (order 순)
+        budget: 프롬프트 토큰 상한 (None이면 트리밍 안 함)
+    """
+    head = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    head.extend({"role": m["role"], "content": m["content"]} for m in fewshot)
+
+    if budget is None:
+        return head + list(history) + new_messages
+
+    remaining = budget - count_message_tokens(head + new_messages)
+    kept: list[dict] = []
+    for message in reversed(history):
+        cost = count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if cost > remaining:
+            break
+        remaining -= cost
+        kept.append(message)
+    kept.reverse()
+
+    # 어시스턴트 응답으로 시작하는 고아 턴 제거
+    while kept and kept[0]["role"] == "assistant":
+        kept.pop(0)
+
+    return head + kept + new_messages
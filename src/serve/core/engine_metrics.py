@@ -0,0 +1,219 @@
+"""
+Engine Metrics
+
+vLLM 엔진 지표 수집 (백엔드별 Prometheus /metrics 주기 스크랩)
+- KV 캐시 사용률, 실행/대기 시퀀스 수, prefix 캐시 적중률 파싱 (vLLM v0/v1 지표 이름 모두 인식)
+- backend 라벨을 붙여 llm_backend_* 게이지로 재노출 + 포화 반영 후 전체 용량(llm_router_capacity)
+- LLMRouter 백엔드 선택(포화 여부 → 예상 부하 순)에 사용
+- engine_saturation_admission이면 포화 백엔드의 어드미션 용량을 포화 시점 진행 중 요청 수로 고정
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import (
+    LLM_BACKEND_ENGINE_RUNNING,
+    LLM_BACKEND_ENGINE_WAITING,
+    LLM_BACKEND_KV_CACHE_USAGE,
+    LLM_BACKEND_PREFIX_CACHE_HIT_RATIO,
+    LLM_BACKEND_SATURATED,
+    LLM_BACKEND_SCRAPE_ERRORS_TOTAL,
+    LLM_ROUTER_CAPACITY,
+)
+
+logger = get_logger(__name__)
+
+# vLLM 지표 이름 → EngineStats 필드
+# 모델별 시리즈는 합산하고, 사용률/적중률은 최댓값 사용
+_FIELDS = {
+    "vllm:kv_cache_usage_perc": "kv_cache_usage",
+    "vllm:gpu_cache_usage_perc": "kv_cache_usage",  # v0, v1 초기
+    "vllm:num_requests_running": "running",
+    "vllm:num_requests_waiting": "waiting",
+    "vllm:gpu_prefix_cache_hit_rate": "prefix_cache_hit_rate",  # v0 게이지
+    "vllm:prefix_cache_queries_total": "prefix_cache_queries",  # v1 누적 카운터 (토큰 단위)
+    "vllm:prefix_cache_hits_total": "prefix_cache_hits",
+    "vllm:gpu_prefix_cache_queries_total": "prefix_cache_queries",
+    "vllm:gpu_prefix_cache_hits_total": "prefix_cache_hits",
+}
+_MAX_FIELDS = {"kv_cache_usage", "prefix_cache_hit_rate"}
+
+
+@dataclass
+class EngineStats:
+    """백엔드 1곳의 엔진 지표 스냅샷"""
+    kv_cache_usage: float = 0.0  # 0~1
+    running: int = 0
+    waiting: int = 0
+    prefix_cache_hit_rate: Optional[float] = None  # 0~1
+    prefix_cache_queries: Optional[float] = None
+    prefix_cache_hits: Optional[float] = None
+    in_flight: int = 0  # 스크랩 시점의 게이트웨이 진행 중 요청 수 (부하 보정 기준)
+    scraped_at: float = 0.0  # time.monotonic()
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() - self.scraped_at <= settings.engine_metrics_stale_after
+
+    @property
+    def saturated(self) -> bool:
+        """
+        KV 캐시가 거의 찼거나 엔진 대기열에 시퀀스가 쌓임 = 새 요청은 대기하거나 선점을 유발
+
+        정상 배칭에서도 스케줄 직전의 시퀀스 몇 개는 대기하므로 대기 기준은 실행 시퀀스 수에 비례해 늘립니다.
+        """
+        max_waiting = max(settings.engine_max_waiting, self.running * settings.engine_max_waiting_ratio)
+        return self.waiting > max_waiting or self.kv_cache_usage >= settings.engine_kv_cache_saturation
+
+
+def parse_engine_metrics(text: str) -> EngineStats:
+    """
+    vLLM /metrics 텍스트(Prometheus exposition format)에서 필요한 시리즈만 파싱
+
+    히스토그램 등 나머지 줄은 이름만 보고 건너뛰므로 전체 파서보다 가볍습니다.
+    """
+    values: dict[str, float] = {}
+    for line in text.splitlines():
+        if not line.startswith("vllm:"):
+            continue
+        brace, space = line.find("{"), line.find(" ")
+        if space < 0:
+            continue
+        if 0 <= brace < space:
+            name, rest = line[:brace], line[line.rfind("}") + 1:]
+        else:
+            name, rest = line[:space], line[space:]
+        field = _FIELDS.get(name)
+        if field is None:
+            continue
+        try:
+            value = float(rest.split()[0])
+        except (IndexError, ValueError):
+            continue
+        if field in _MAX_FIELDS:
+            values[field] = max(values.get(field, 0.0), value)
+        else:
+            values[field] = values.get(field, 0.0) + value
+
+    return EngineStats(
+        kv_cache_usage=values.get("kv_cache_usage", 0.0),
+        running=int(values.get("running", 0)),
+        waiting=int(values.get("waiting", 0)),
+        prefix_cache_hit_rate=values.get("prefix_cache_hit_rate"),
+        prefix_cache_queries=values.get("prefix_cache_queries"),
+        prefix_cache_hits=values.get("prefix_cache_hits"),
+    )
+
+
+def apply_engine_stats(backend, stats: EngineStats) -> None:
+    """
+    스크랩한 지표를 Backend에 반영 (포화 백엔드의 고정 용량 held 갱신 포함)
+
+    포화가 새로 시작되면 그 시점의 진행 중 요청 수(최소 1)를 held로 고정하고, 포화가 풀리면 해제합니다.
+    현재 진행 중 요청 수를 그대로 쓰면 새로 배정된 요청(과 헤지 요청)만큼 용량이 함께 늘어나
+    포화 중에도 배정이 멈추지 않습니다. engine_saturation_admission이 꺼져 있으면 held를 두지 않습니다.
+    """
+    was_saturated = backend.saturated  # 이전 지표가 오래되었으면 False → 새 포화로 취급
+    backend.engine = stats
+    if not (settings.engine_saturation_admission and stats.saturated):
+        backend.held = None
+    elif not was_saturated or backend.held is None:
+        backend.held = max(backend.occupied, 1)
+
+
+def _fill_hit_rate(stats: EngineStats, previous: Optional[EngineStats]) -> None:
+    """v1 누적 카운터는 이전 스크랩과의 차이로 적중률 계산 (이번 구간에 조회가 없으면 이전 값 유지)"""
+    if stats.prefix_cache_hit_rate is not None or stats.prefix_cache_queries is None or previous is None:
+        return
+    if previous.prefix_cache_queries is None or previous.prefix_cache_hits is None:
+        return
+    queries = stats.prefix_cache_queries - previous.prefix_cache_queries
+    if queries > 0:
+        stats.prefix_cache_hit_rate = max(stats.prefix_cache_hits - previous.prefix_cache_hits, 0.0) / queries
+    elif queries == 0:
+        stats.prefix_cache_hit_rate = previous.prefix_cache_hit_rate
+
+
+# ============================================================
+# Scraper
+# ============================================================
+
+class EngineMetricsScraper:
+    """
+    백엔드별 엔진 지표 주기 스크랩
+
+    LLMRouter의 각 Backend.engine에 최신 EngineStats를 기록하고, 스크랩마다
+    어드미션 컨트롤러에 용량 변화를 알려 포화가 풀린 즉시 대기 요청을 배정하게 합니다.
+    스크랩에 실패한 백엔드의 지표는 engine_metrics_stale_after 이후 무시됩니다 (진행 중 요청 수 기준으로 복귀).
+    """
+
+    def __init__(self, interval: Optional[float] = None, timeout: Optional[float] = None):
+        self.interval = interval or settings.engine_metrics_interval
+        self.timeout = timeout or settings.engine_metrics_timeout
+        self._router = None
+        self._admission = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, router, admission=None) -> None:
+        """
+        주기 스크랩 시작 (lifespan에서 호출)
+
+        Args:
+            router: 스크랩 대상 백엔드를 가진 LLMRouter
+            admission: 스크랩 후 notify()할 AdmissionController
+        """
+        self._router = router
+        self._admission = admission
+        if settings.engine_metrics_enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.scrape()
+            except Exception as e:
+                logger.exception("engine_metrics_scrape_failed", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def scrape(self) -> None:
+        """모든 백엔드를 동시에 한 번 스크랩"""
+        backends = list(self._router.backends)
+        await asyncio.gather(*(self._scrape_backend(backend) for backend in backends))
+        LLM_ROUTER_CAPACITY.set(self._router.capacity)
+        if self._admission is not None:
+            self._admission.notify()
+
+    async def _scrape_backend(self, backend) -> None:
+        text = await backend.client.fetch_metrics(self.timeout)
+        if backend.retired:
+            return
+        if text is None:
+            LLM_BACKEND_SCRAPE_ERRORS_TOTAL.labels(backend=backend.name).inc()
+            return
+
+        stats = parse_engine_metrics(text)
+        stats.in_flight = backend.in_flight
+        stats.scraped_at = time.monotonic()
+        _fill_hit_rate(stats, backend.engine)
+        apply_engine_stats(backend, stats)
+
+        LLM_BACKEND_KV_CACHE_USAGE.labels(backend=backend.name).set(stats.kv_cache_usage)
+        LLM_BACKEND_ENGINE_RUNNING.labels(backend=backend.name).set(stats.running)
+        LLM_BACKEND_ENGINE_WAITING.labels(backend=backend.name).set(stats.waiting)
+        LLM_BACKEND_SATURATED.labels(backend=backend.name).set(int(stats.saturated))
+        if stats.prefix_cache_hit_rate is not None:
+            LLM_BACKEND_PREFIX_CACHE_HIT_RATIO.labels(backend=backend.name).set(stats.prefix_cache_hit_rate)
+
+
+# 전역 엔진 지표 스크래퍼
+engine_metrics_scraper = EngineMetricsScraper()
@@ -0,0 +1,61 @@
+"""
+Hedging / Retry
+
+upstream 꼬리 지연(p99) 완화
+- 헤징: 최근 TTFT 분위수 안에 첫 바이트가 없으면 다른 백엔드로 중복 요청, 먼저 온 쪽 사용
+- 재시도: 비스트리밍 요청을 전체 데드라인 안에서 jitter backoff로 재시도
+"""
+
+import math
+import random
+from collections import deque
+from typing import Optional
+
+from src.serve.core.config import settings
+
+# 스트리밍 에러 이벤트 접두어 (LLMClient.chat_completion_stream)
+ERROR_CHUNK_PREFIX = b'data: {"error"'
+
+
+class LatencyWindow:
+    """최근 지연 시간 표본 (분위수 조회용, 일정 개수마다 재계산)"""
+
+    def __init__(self, size: int = 512, refresh_every: int = 32):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._sorted: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_refresh += 1
+
+    def percentile(self, q: float) -> float:
+        if self._since_refresh >= self._refresh_every or len(self._sorted) != len(self._samples):
+            self._sorted = sorted(self._samples)
+            self._since_refresh = 0
+        index = min(len(self._sorted) - 1, max(0, math.ceil(q / 100 * len(self._sorted)) - 1))
+        return self._sorted[index]
+
+
+def hedge_delay(window: LatencyWindow) -> Optional[float]:
+    """헤지 요청을 보낼 때까지 기다릴 시간 (표본이 부족하거나 비활성화면 None)"""
+    if not settings.llm_hedge_enabled or len(window) < settings.llm_hedge_min_samples:
+        return None
+    return max(settings.llm_hedge_min_delay, window.percentile(settings.llm_hedge_percentile))
+
+
+def is_retryable(result: dict) -> bool:
+    """재시도 가능한 실패인지 (전송 오류, 5xx, 429, 서킷 open)"""
+    if "error" not in result:
+        return False
+    status_code = result.get("status_code")
+    return status_code is None or status_code >= 500 or status_code == 429
+
+
+def backoff_delay(attempt: int) -> float:
+    """full-jitter 지수 backoff (초)"""
+    return random.uniform(0, settings.llm_retry_backoff * (2 ** attempt))
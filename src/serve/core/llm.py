@@ -4,10 +4,42 @@ LLM Client
 vLLM 서버 클라이언트 래퍼
 """
 
+import asyncio
+import json
+import math
+import time
+
 import httpx
 from typing import AsyncGenerator, Optional
 
+from src.serve.core.circuit_breaker import CircuitBreaker
 from src.serve.core.config import settings
+from src.serve.core.serialization import loads
+from src.serve.core.streaming import sse_data
+from src.serve.core.tracing import SPAN_KIND_CLIENT, span, start_span
+
+
+def _classify_failure(error: Exception) -> tuple[bool, bool]:
+    """
+    서킷 브레이커 관점의 실패 분류
+
+    Returns:
+        (백엔드 실패 여부, 즉시 open 여부)
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True, True  # 서버 다운/재시작
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code >= 500 or code == 429, False  # 4xx는 요청 문제
+    return True, False
+
+
+def metrics_url(base_url: str) -> str:
+    """OpenAI 호환 API URL(.../v1)에 대응하는 vLLM Prometheus 엔드포인트"""
+    base = base_url.rstrip("/")
+    if base.endswith("/v1"):
+        base = base[:-len("/v1")]
+    return f"{base}/metrics"
 
 
 class LLMClient:
@@ -17,45 +49,109 @@ class LLMClient:
         self,
         base_url: Optional[str] = None,
         timeout: float = 60.0,
+        api_key: Optional[str] = None,
+        name: Optional[str] = None,
     ):
         self.base_url = (base_url or settings.vllm_base_url).rstrip("/")
         self.timeout = timeout
+        self.api_key = api_key
+        self.breaker = CircuitBreaker(name or "default")
         self._client: Optional[httpx.AsyncClient] = None
+        self._models: Optional[list[str]] = None
+        self._models_expires_at = 0.0
+        self._models_lock = asyncio.Lock()
     
     async def _get_client(self) -> httpx.AsyncClient:
         """HTTP 클라이언트 획득"""
         if self._client is None or self._client.is_closed:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
-                timeout=self.timeout,
+                timeout=httpx.Timeout(self.timeout, connect=settings.llm_connect_timeout),
+                headers=headers,
             )
         return self._client
     
+    def _observe(self, started: float, error: Optional[Exception] = None) -> None:
+        """요청 결과를 서킷 브레이커에 기록"""
+        latency = time.monotonic() - started
+        if error is None:
+            self.breaker.record_success(latency)
+            return
+        failure, fatal = _classify_failure(error)
+        if failure:
+            self.breaker.record_failure(latency, fatal=fatal)
+        else:
+            self.breaker.record_success(latency)
+    
+    def _circuit_open_error(self) -> dict:
+        """서킷 open 시 즉시 반환하는 에러"""
+        return {
+            "error": f"Circuit open: backend '{self.breaker.name}' is unavailable",
+            "retry_after": max(1, math.ceil(self.breaker.retry_after)),
+        }
+    
     async def close(self):
         """클라이언트 종료"""
         if self._client and not self._client.is_closed:
             await self._client.aclose()
             self._client = None
     
-    async def health_check(self) -> bool:
-        """vLLM 서버 상태 확인"""
+    async def _fetch_models(self) -> Optional[list[str]]:
+        """/models 조회 (TTL 캐시, 실패 시 None)"""
+        async with self._models_lock:
+            if self._models is not None and time.monotonic() < self._models_expires_at:
+                return self._models
+            if not self.breaker.allow():
+                return None
+            
+            started = time.monotonic()
+            try:
+                client = await self._get_client()
+                response = await client.get("/models")
+                response.raise_for_status()
+                models = [model["id"] for model in loads(response.content).get("data", [])]
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                self._observe(started, e)
+                return None
+            
+            self._observe(started)
+            self._models = models
+            self._models_expires_at = time.monotonic() + settings.llm_models_cache_ttl
+            return models
+    
+    async def fetch_metrics(self, timeout: float) -> Optional[str]:
+        """
+        vLLM /metrics 텍스트 조회 (엔진 지표 스크랩용)
+        
+        요청 처리 실패가 아니므로 서킷 브레이커에는 반영하지 않습니다.
+        
+        Returns:
+            Prometheus exposition 텍스트 (실패 시 None)
+        """
         try:
             client = await self._get_client()
-            response = await client.get("/models")
-            return response.status_code == 200
-        except Exception:
+            response = await client.get(metrics_url(self.base_url), timeout=timeout)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            return None
+        return response.text
+    
+    async def health_check(self) -> bool:
+        """vLLM 서버 상태 확인 (서킷 open이면 요청 없이 False)"""
+        if not self.breaker.available:
             return False
+        return await self._fetch_models() is not None
     
     async def list_models(self) -> list[str]:
-        """사용 가능한 모델 목록"""
-        try:
-            client = await self._get_client()
-            response = await client.get("/models")
-            response.raise_for_status()
-            data = response.json()
-            return [model["id"] for model in data.get("data", [])]
-        except Exception:
-            return []
+        """사용 가능한 모델 목록 (조회 실패 시 마지막으로 성공한 목록)"""
+        models = await self._fetch_models()
+        if models is None:
+            return list(self._models or [])
+        return list(models)
     
     async def chat_completion(
         self,
@@ -80,36 +176,58 @@ class LLMClient:
         Returns:
             {"content": str, "model": str, "usage": dict, ...}
         """
+        if not self.breaker.allow():
+            return self._circuit_open_error()
+        
         client = await self._get_client()
         
         payload = {
             "model": model or settings.default_model or "default",
             "messages": messages,
-            "temperature": temperature or settings.default_temperature,
-            "max_tokens": max_tokens or settings.default_max_tokens,
-            "top_p": top_p or settings.default_top_p,
+            "temperature": temperature if temperature is not None else settings.default_temperature,
+            "max_tokens": max_tokens if max_tokens is not None else settings.default_max_tokens,
+            "top_p": top_p if top_p is not None else settings.default_top_p,
             "stream": stream,
         }
         
+        started = time.monotonic()
         try:
-            response = await client.post("/chat/completions", json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            # OpenAI 형식 응답 파싱
-            choice = data.get("choices", [{}])[0]
-            message = choice.get("message", {})
-            
+            with span(
+                "llm.request", SPAN_KIND_CLIENT, **{"llm.backend": self.breaker.name, "llm.model": payload["model"]}
+            ) as request_span:
+                response = await client.post("/chat/completions", json=payload)
+                response.raise_for_status()
+                data = loads(response.content)
+                if request_span is not None:
+                    usage = data.get("usage") or {}
+                    request_span.set(**{
+                        "llm.prompt_tokens": usage.get("prompt_tokens"),
+                        "llm.completion_tokens": usage.get("completion_tokens"),
+                    })
+        except httpx.HTTPStatusError as e:
+            self._observe(started, e)
             return {
-                "content": message.get("content", ""),
-                "model": data.get("model", payload["model"]),
-                "usage": data.get("usage", {}),
-                "finish_reason": choice.get("finish_reason"),
+                "error": f"HTTP {e.response.status_code}: {e.response.text}",
+                "status_code": e.response.status_code,
             }
-        except httpx.HTTPStatusError as e:
-            return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
         except Exception as e:
+            self._observe(started, e)
             return {"error": str(e)}
+        self._observe(started)
+        
+        # OpenAI 형식 응답 파싱
+        choice = data.get("choices", [{}])[0]
+        message = choice.get("message", {})
+        
+        return {
+            "content": message.get("content", ""),
+            "model": data.get("model", payload["model"]),
+            "usage": data.get("usage", {}),
+            "finish_reason": choice.get("finish_reason"),
+        }
     
     async def chat_completion_stream(
         self,
@@ -118,32 +236,67 @@ class LLMClient:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         top_p: Optional[float] = None,
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
-        채팅 완성 스트리밍
+        채팅 완성 스트리밍 (raw SSE passthrough)
+        
+        upstream 응답 본문을 줄 단위로 나누거나 디코딩하지 않고 받은 그대로 전달합니다.
+        (압축 해제가 필요 없도록 Accept-Encoding: identity로 요청)
         
         Yields:
-            SSE 형식 청크
+            SSE 바이트 청크 ("data: {...}\n\n", 청크 경계는 이벤트 경계와 다를 수 있음)
         """
+        if not self.breaker.allow():
+            yield sse_data(json.dumps(self._circuit_open_error()))
+            return
+        
         client = await self._get_client()
         
         payload = {
             "model": model or settings.default_model or "default",
             "messages": messages,
-            "temperature": temperature or settings.default_temperature,
-            "max_tokens": max_tokens or settings.default_max_tokens,
-            "top_p": top_p or settings.default_top_p,
+            "temperature": temperature if temperature is not None else settings.default_temperature,
+            "max_tokens": max_tokens if max_tokens is not None else settings.default_max_tokens,
+            "top_p": top_p if top_p is not None else settings.default_top_p,
             "stream": True,
+            "stream_options": {"include_usage": True},  # 마지막 청크에 usage 포함
         }
         
+        # yield를 사이에 두고 끝나므로 활성 span으로 바꾸지 않는 start_span 사용
+        # prefill: 요청 ~ 첫 청크 (upstream 대기열 + 프롬프트 처리), decode: 첫 청크 ~ 스트림 종료
+        attributes = {"llm.backend": self.breaker.name, "llm.model": payload["model"]}
+        prefill = start_span("llm.prefill", SPAN_KIND_CLIENT, **attributes)
+        decode = None
+        error: Optional[Exception] = None
+        started = time.monotonic()
+        observed = False
         try:
-            async with client.stream("POST", "/chat/completions", json=payload) as response:
+            async with client.stream(
+                "POST",
+                "/chat/completions",
+                json=payload,
+                headers={"Accept-Encoding": "identity"},
+            ) as response:
                 response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        yield line[6:]  # "data: " 제거
+                self._observe(started)  # 응답 헤더 수신 시점까지의 지연으로 판정
+                observed = True
+                async for chunk in response.aiter_raw():
+                    if prefill is not None and decode is None:
+                        prefill.end()
+                        decode = start_span("llm.decode", SPAN_KIND_CLIENT, **attributes)
+                    yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            if not observed:
+                self.breaker.release_probe()
+            raise
         except Exception as e:
-            yield f'{{"error": "{str(e)}"}}'
+            error = e
+            self._observe(started, e)
+            yield sse_data(json.dumps({"error": str(e)}))
+        finally:
+            for stream_span in (prefill, decode):
+                if stream_span is not None:
+                    stream_span.end(error)
     
     async def completion(
         self,
@@ -161,31 +314,44 @@ class LLMClient:
         Returns:
             {"content": str, "model": str, "usage": dict}
         """
+        if not self.breaker.allow():
+            return self._circuit_open_error()
+        
         client = await self._get_client()
         
         payload = {
             "model": model or settings.default_model or "default",
             "prompt": prompt,
-            "temperature": temperature or settings.default_temperature,
-            "max_tokens": max_tokens or settings.default_max_tokens,
+            "temperature": temperature if temperature is not None else settings.default_temperature,
+            "max_tokens": max_tokens if max_tokens is not None else settings.default_max_tokens,
         }
         
+        started = time.monotonic()
         try:
             response = await client.post("/completions", json=payload)
             response.raise_for_status()
-            data = response.json()
-            
-            choice = data.get("choices", [{}])[0]
-            
+            data = loads(response.content)
+        except httpx.HTTPStatusError as e:
+            self._observe(started, e)
             return {
-                "content": choice.get("text", ""),
-                "model": data.get("model", payload["model"]),
-                "usage": data.get("usage", {}),
+                "error": f"HTTP {e.response.status_code}: {e.response.text}",
+                "status_code": e.response.status_code,
             }
-        except httpx.HTTPStatusError as e:
-            return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
         except Exception as e:
+            self._observe(started, e)
             return {"error": str(e)}
+        self._observe(started)
+        
+        choice = data.get("choices", [{}])[0]
+        
+        return {
+            "content": choice.get("text", ""),
+            "model": data.get("model", payload["model"]),
+            "usage": data.get("usage", {}),
+        }
 
 
 # 전역 LLM 클라이언트 (선택적 사용)
@@ -0,0 +1,591 @@
+"""
+LLM Router
+
+llm_models 테이블 기반 멀티 엔드포인트 라우팅 레이어
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Optional, Sequence
+
+from sqlalchemy import select
+
+from src.serve.core.coalesce import SingleFlight, StreamFanout
+from src.serve.core.config import settings
+from src.serve.core.engine_metrics import EngineStats
+from src.serve.core.hedging import (
+    ERROR_CHUNK_PREFIX,
+    LatencyWindow,
+    backoff_delay,
+    hedge_delay,
+    is_retryable,
+)
+from src.serve.core.llm import LLMClient
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import (
+    LLM_BACKEND_ENGINE_RUNNING,
+    LLM_BACKEND_ENGINE_WAITING,
+    LLM_BACKEND_IN_FLIGHT,
+    LLM_BACKEND_KV_CACHE_USAGE,
+    LLM_BACKEND_PREFIX_CACHE_HIT_RATIO,
+    LLM_BACKEND_SATURATED,
+    LLM_BACKEND_SCRAPE_ERRORS_TOTAL,
+    LLM_CIRCUIT_STATE,
+    LLM_HEDGED_REQUESTS_TOTAL,
+    LLM_RETRIES_TOTAL,
+)
+from src.serve.core.response_cache import make_cache_key
+from src.serve.core.tracing import create_detached_task
+from src.serve.database import async_session_maker
+from src.serve.models.llm import LLMModel
+
+logger = get_logger(__name__)
+
+
+@dataclass(eq=False)
+class Backend:
+    """라우팅 대상 vLLM 엔드포인트 (LLMModel 행 1개 = Backend 1개)"""
+    id: Optional[int]  # None: settings.vllm_base_url 기본 백엔드
+    name: str
+    api_url: str
+    api_key: Optional[str]
+    max_tokens_limit: int
+    client: LLMClient
+    in_flight: int = 0
+    admitted: int = 0  # 이 백엔드로 배정된 어드미션 슬롯 수 (LLMRouter.reserve)
+    retired: bool = False
+    engine: Optional[EngineStats] = None  # EngineMetricsScraper가 갱신
+    held: Optional[int] = None  # 포화가 시작된 시점의 진행 중 요청 수 (포화 동안 고정된 용량, 스크래퍼가 갱신)
+
+    @property
+    def occupied(self) -> int:
+        """상한 비교 기준 (배정된 슬롯과 실제 upstream 요청 중 큰 값 - 헤지/재시도 요청 포함)"""
+        return max(self.admitted, self.in_flight)
+
+    @property
+    def pending(self) -> int:
+        """슬롯은 배정되었지만 아직 upstream으로 보내지 않은 요청 수"""
+        return max(self.admitted - self.in_flight, 0)
+
+    @property
+    def engine_stats(self) -> Optional[EngineStats]:
+        """최근 엔진 지표 (스크랩되지 않았거나 오래되었으면 None)"""
+        if self.engine is None or not self.engine.fresh:
+            return None
+        return self.engine
+
+    @property
+    def saturated(self) -> bool:
+        stats = self.engine_stats
+        return stats is not None and stats.saturated
+
+    @property
+    def load(self) -> int:
+        """
+        예상 엔진 부하 (실행 + 대기 시퀀스)
+
+        스크랩 이후 이 게이트웨이의 진행 중 요청 수 변화를 더해 보정하고,
+        엔진 지표가 없으면 진행 중 요청 수를 사용합니다.
+        """
+        stats = self.engine_stats
+        if stats is None:
+            return self.in_flight
+        return max(self.in_flight, stats.running + stats.waiting + self.in_flight - stats.in_flight)
+
+
+def _clear_backend_gauges(backend: Backend) -> None:
+    """제거된 백엔드의 게이지 라벨 삭제"""
+    for gauge in (
+        LLM_BACKEND_IN_FLIGHT,
+        LLM_CIRCUIT_STATE,
+        LLM_BACKEND_KV_CACHE_USAGE,
+        LLM_BACKEND_ENGINE_RUNNING,
+        LLM_BACKEND_ENGINE_WAITING,
+        LLM_BACKEND_PREFIX_CACHE_HIT_RATIO,
+        LLM_BACKEND_SATURATED,
+        LLM_BACKEND_SCRAPE_ERRORS_TOTAL,
+    ):
+        try:
+            gauge.remove(backend.name)
+        except KeyError:
+            pass
+
+
+class LLMRouter:
+    """
+    LLMClient 앞단 라우터
+
+    활성화된 LLMModel 행마다 커넥션 풀을 가진 LLMClient를 하나씩 유지하고,
+    요청마다 예상 부하가 가장 적은 백엔드를 선택합니다 (least-outstanding, 엔진 지표가 있으면
+    vLLM이 보고한 실행/대기 시퀀스 수 기준이며 KV 캐시/대기열이 포화된 백엔드는 후순위).
+    테이블 변경은 주기적 refresh로 재시작 없이 반영됩니다.
+    동일한 페이로드의 동시 요청은 하나의 upstream 호출로 병합됩니다.
+    첫 바이트가 최근 TTFT 분위수보다 늦으면 다른 백엔드로 헤지 요청을 보내고,
+    비스트리밍 요청은 데드라인 안에서 재시도합니다.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.refresh_interval = refresh_interval or settings.llm_router_refresh_interval
+        self.timeout = timeout or settings.llm_request_timeout
+        self._backends: list[Backend] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.coalesce = settings.llm_coalesce_enabled
+        self.max_in_flight = settings.llm_max_inflight_per_backend
+        self._single_flight = SingleFlight()
+        self._fanout = StreamFanout()
+        self._latency = {"unary": LatencyWindow(), "stream": LatencyWindow()}
+
+    @property
+    def backends(self) -> list[Backend]:
+        """현재 라우팅 대상 백엔드 목록"""
+        if not self._backends:
+            self._backends = [self._default_backend()]
+        return self._backends
+
+    def _default_backend(self) -> Backend:
+        """llm_models 테이블이 비어 있을 때 사용하는 기본 백엔드"""
+        return Backend(
+            id=None,
+            name="default",
+            api_url=settings.vllm_base_url,
+            api_key=None,
+            max_tokens_limit=settings.default_max_tokens,
+            client=LLMClient(timeout=self.timeout, name="default"),
+        )
+
+    # ============================================================
+    # Backend Table Sync
+    # ============================================================
+
+    async def refresh(self) -> None:
+        """llm_models 테이블에서 활성 엔드포인트 목록 재로딩"""
+        try:
+            async with async_session_maker() as session:
+                result = await session.execute(
+                    select(LLMModel).where(LLMModel.is_active == True)  # noqa: E712
+                )
+                rows = result.scalars().all()
+        except Exception as e:
+            logger.warning("llm_router_refresh_failed", error=str(e))
+            return
+        await self.apply(rows)
+
+    async def apply(self, rows: Sequence[LLMModel]) -> None:
+        """
+        LLMModel 행 목록을 백엔드 목록에 반영
+
+        URL/API 키가 바뀌지 않은 백엔드는 기존 커넥션 풀을 그대로 재사용하고,
+        사라진 백엔드는 진행 중 요청이 모두 끝난 뒤 닫습니다.
+        """
+        async with self._lock:
+            current = {b.id: b for b in self._backends}
+            updated: list[Backend] = []
+
+            for row in rows:
+                backend = current.pop(row.id, None)
+                if backend and backend.api_url == row.api_url and backend.api_key == row.api_key:
+                    backend.name = row.name
+                    backend.max_tokens_limit = row.max_tokens_limit
+                else:
+                    if backend:
+                        current[row.id] = backend  # 설정 변경 → 기존 풀 폐기
+                    backend = Backend(
+                        id=row.id,
+                        name=row.name,
+                        api_url=row.api_url,
+                        api_key=row.api_key,
+                        max_tokens_limit=row.max_tokens_limit,
+                        client=LLMClient(
+                            base_url=row.api_url,
+                            timeout=self.timeout,
+                            api_key=row.api_key,
+                            name=row.name,
+                        ),
+                    )
+                updated.append(backend)
+
+            if not updated:
+                default = current.pop(None, None)
+                updated.append(default or self._default_backend())
+
+            self._backends = updated
+            for backend in current.values():
+                await self._retire(backend)
+
+        logger.debug("llm_router_refreshed", backends=[b.name for b in updated])
+
+    async def _retire(self, backend: Backend) -> None:
+        """백엔드 제거 (진행 중 요청이 없으면 즉시 종료)"""
+        backend.retired = True
+        if backend.in_flight == 0:
+            _clear_backend_gauges(backend)
+            await backend.client.close()
+
+    async def _refresh_loop(self) -> None:
+        """주기적 refresh 루프"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    async def start(self) -> None:
+        """초기 로딩 후 백그라운드 refresh 시작 (lifespan에서 호출)"""
+        await self.refresh()
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        """refresh 중지 및 모든 커넥션 풀 종료"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        for backend in self._backends:
+            await backend.client.close()
+        self._backends = []
+
+    # ============================================================
+    # Backend Selection
+    # ============================================================
+
+    def _candidates(self, model: Optional[str], exclude: Optional[Backend] = None) -> list[Backend]:
+        """
+        model을 처리할 수 있는 백엔드 후보
+
+        model이 LLMModel.name과 일치하는 백엔드가 있으면 그 백엔드들, 없으면 전체 백엔드입니다.
+        서킷이 열린 백엔드와 exclude는 다른 후보가 있으면 제외합니다.
+        """
+        backends = self.backends
+        candidates = [b for b in backends if model and b.name == model] or backends
+        candidates = [b for b in candidates if b.client.breaker.available] or candidates
+        return [b for b in candidates if b is not exclude] or candidates
+
+    def pick(self, model: Optional[str] = None, exclude: Optional[Backend] = None) -> Backend:
+        """요청을 보낼 백엔드 선택 (후보 중 포화되지 않은 백엔드 우선, 예상 부하가 가장 적은 것)"""
+        return min(self._candidates(model, exclude), key=lambda b: (b.saturated, b.load, random.random()))
+
+    def _primary(self, model: Optional[str], backend: Optional[Backend], exclude: Optional[Backend] = None) -> Backend:
+        """어드미션에서 배정된 백엔드 (제거되었거나 서킷이 열렸으면 새로 선택)"""
+        if backend is None or backend.retired or backend is exclude or not backend.client.breaker.available:
+            return self.pick(model, exclude=exclude)
+        return backend
+
+    def reserve(self, model: Optional[str] = None) -> Optional[Backend]:
+        """
+        어드미션 슬롯을 배정할 백엔드 선택 (AdmissionController가 호출)
+
+        pick()과 같은 후보 중 상한 미만인 백엔드를 고르고, 모두 상한이면 None을 반환합니다 (대기열에서 대기).
+        배정된 요청은 이 백엔드로 먼저 보내므로 특정 모델(백엔드)로 몰린 요청도 백엔드별 상한을 넘지 않습니다.
+        """
+        free = [b for b in self._candidates(model) if not self._limit(b) or b.occupied < self._limit(b)]
+        if not free:
+            return None
+        backend = min(free, key=lambda b: (b.saturated, b.load + b.pending, random.random()))
+        backend.admitted += 1
+        return backend
+
+    def unreserve(self, backend: Backend) -> None:
+        """reserve()로 배정한 슬롯 반납"""
+        backend.admitted -= 1
+
+    def capacity_for(self, model: Optional[str] = None) -> int:
+        """model 요청이 동시에 쓸 수 있는 슬롯 수 (예상 대기 시간 계산용, 0: 무제한)"""
+        limits = [self._limit(b) for b in self._candidates(model)]
+        return 0 if 0 in limits else sum(limits)
+
+    def _pick_hedge(self, model: Optional[str], primary: Backend) -> Optional[Backend]:
+        """헤지 요청 대상 (primary 외에 여유 있는 백엔드가 없으면 None)"""
+        backend = self.pick(model, exclude=primary)
+        if backend is primary or not backend.client.breaker.available or backend.saturated:
+            return None
+        if self.max_in_flight and backend.occupied >= self.max_in_flight:
+            return None
+        return backend
+
+    def _limit(self, backend: Backend) -> int:
+        """
+        백엔드 1곳의 동시 upstream 요청 상한 (0: 무제한)
+
+        스크래퍼가 포화를 보고하고 held를 고정한 백엔드(engine_saturation_admission)는 held만 인정하므로,
+        새 요청은 vLLM 대기열 대신 어드미션 대기열(우선순위/공정성 적용)에서 기다립니다.
+        지표가 오래되어 포화로 보지 않으면 held는 무시합니다.
+        """
+        if backend.held is None or not backend.saturated:
+            return self.max_in_flight
+        return min(backend.held, self.max_in_flight) if self.max_in_flight else backend.held
+
+    @property
+    def capacity(self) -> int:
+        """
+        전체 동시 upstream 요청 상한 (백엔드별 상한의 합, 0: 무제한)
+
+        백엔드별 상한이 없으면 모든 백엔드가 포화일 때만 제한합니다.
+        실제 배정은 reserve()가 백엔드 단위로 판단하며, 이 값은 게이지/예상 대기 시간용입니다.
+        """
+        limits = [self._limit(b) for b in self.backends]
+        return 0 if 0 in limits else sum(limits)
+
+    def _acquire(self, backend: Backend) -> None:
+        backend.in_flight += 1
+        LLM_BACKEND_IN_FLIGHT.labels(backend=backend.name).set(backend.in_flight)
+
+    def _release(self, backend: Backend) -> None:
+        backend.in_flight -= 1
+        if backend.retired:
+            if backend.in_flight == 0:
+                _clear_backend_gauges(backend)
+                create_detached_task(backend.client.close())
+            return
+        LLM_BACKEND_IN_FLIGHT.labels(backend=backend.name).set(backend.in_flight)
+
+    # ============================================================
+    # LLMClient Interface
+    # ============================================================
+
+    async def health_check(self) -> bool:
+        """하나 이상의 백엔드가 응답하면 정상"""
+        results = await asyncio.gather(*(b.client.health_check() for b in self.backends))
+        return any(results)
+
+    async def list_models(self) -> list[str]:
+        """전체 백엔드의 모델 목록 (중복 제거)"""
+        results = await asyncio.gather(*(b.client.list_models() for b in self.backends))
+        return list(dict.fromkeys(model for models in results for model in models))
+
+    async def chat_completion(
+        self,
+        messages: list[dict],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        stream: bool = False,
+        backend: Optional[Backend] = None,
+    ) -> dict:
+        """채팅 완성 요청 (동일 요청이 진행 중이면 결과 공유, backend: 어드미션에서 배정된 백엔드)"""
+        async def dispatch() -> dict:
+            return await self._with_retries(
+                lambda backend: backend.client.chat_completion(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    stream=stream,
+                ),
+                model,
+                primary=backend,
+            )
+
+        if not self.coalesce:
+            return await dispatch()
+        key = make_cache_key(model, messages, temperature, top_p, max_tokens)
+        return await self._single_flight.do(key, dispatch)
+
+    async def chat_completion_stream(
+        self,
+        messages: list[dict],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        backend: Optional[Backend] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """채팅 완성 스트리밍 (동일 스트림이 진행 중이면 합류, backend: 어드미션에서 배정된 백엔드)"""
+        def dispatch() -> AsyncGenerator[bytes, None]:
+            return self._hedged_stream(
+                lambda backend: backend.client.chat_completion_stream(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                ),
+                model,
+                primary=backend,
+            )
+
+        if self.coalesce:
+            key = make_cache_key(model, messages, temperature, top_p, max_tokens)
+            stream = self._fanout.subscribe(key, dispatch)
+        else:
+            stream = dispatch()
+        async for chunk in stream:
+            yield chunk
+
+    async def completion(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> dict:
+        """텍스트 완성 요청 (선택된 백엔드로 위임)"""
+        return await self._with_retries(
+            lambda backend: backend.client.completion(
+                prompt=prompt,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ),
+            model,
+        )
+
+    # ============================================================
+    # Hedging / Retry
+    # ============================================================
+
+    async def _call(self, backend: Backend, call: Callable[[Backend], Awaitable[dict]]) -> dict:
+        """백엔드 1곳에 비스트리밍 요청 (성공 지연은 헤지 기준 표본으로 기록)"""
+        self._acquire(backend)
+        started = time.monotonic()
+        try:
+            result = await call(backend)
+        finally:
+            self._release(backend)
+        if "error" not in result:
+            self._latency["unary"].add(time.monotonic() - started)
+        return result
+
+    async def _hedged(
+        self,
+        call: Callable[[Backend], Awaitable[dict]],
+        model: Optional[str],
+        exclude: Optional[Backend] = None,
+        primary: Optional[Backend] = None,
+    ) -> tuple[dict, Backend]:
+        """
+        헤지 요청
+
+        최근 응답 지연 분위수 안에 응답이 없으면 다른 백엔드로 같은 요청을 보내고,
+        먼저 성공한 응답을 사용합니다 (나머지는 취소).
+
+        Returns:
+            (응답, 응답한 백엔드)
+        """
+        primary = self._primary(model, primary, exclude=exclude)
+        tasks = {asyncio.ensure_future(self._call(primary, call)): primary}
+        try:
+            delay = hedge_delay(self._latency["unary"])
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                secondary = None if done else self._pick_hedge(model, primary)
+                if secondary:
+                    LLM_HEDGED_REQUESTS_TOTAL.labels(mode="unary").inc()
+                    tasks[asyncio.ensure_future(self._call(secondary, call))] = secondary
+
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    backend = tasks.pop(task)
+                    result = task.result()
+                    if "error" not in result or not tasks:
+                        return result, backend
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _with_retries(
+        self,
+        call: Callable[[Backend], Awaitable[dict]],
+        model: Optional[str],
+        primary: Optional[Backend] = None,
+    ) -> dict:
+        """재시도 가능한 실패는 다른 백엔드 우선으로 jitter backoff 후 재시도 (전체 데드라인 내)"""
+        deadline = time.monotonic() + settings.llm_retry_deadline
+        failed: Optional[Backend] = None
+        attempt = 0
+        while True:
+            result, failed = await self._hedged(call, model, exclude=failed, primary=primary)
+            primary = None
+            if not is_retryable(result) or attempt >= settings.llm_retry_attempts:
+                return result
+            delay = backoff_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                return result
+            attempt += 1
+            LLM_RETRIES_TOTAL.inc()
+            logger.debug("llm_retry", backend=failed.name, attempt=attempt, error=result["error"])
+            await asyncio.sleep(delay)
+
+    async def _open_stream(
+        self,
+        backend: Backend,
+        open_stream: Callable[[Backend], AsyncIterator[bytes]],
+    ) -> AsyncGenerator[bytes, None]:
+        """백엔드 1곳의 스트림 (첫 청크까지의 시간을 헤지 기준 표본으로 기록)"""
+        self._acquire(backend)
+        started = time.monotonic()
+        first = True
+        try:
+            async for chunk in open_stream(backend):
+                if first:
+                    first = False
+                    if not chunk.startswith(ERROR_CHUNK_PREFIX):
+                        self._latency["stream"].add(time.monotonic() - started)
+                yield chunk
+        finally:
+            self._release(backend)
+
+    async def _hedged_stream(
+        self,
+        open_stream: Callable[[Backend], AsyncIterator[bytes]],
+        model: Optional[str],
+        primary: Optional[Backend] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        헤지 스트림
+
+        최근 TTFT 분위수 안에 첫 청크가 없으면 다른 백엔드로 같은 스트림을 열고,
+        먼저 정상 청크를 보낸 스트림을 끝까지 중계합니다 (나머지는 닫음).
+        """
+        primary = self._primary(model, primary)
+        streams = {}  # 첫 청크 대기 태스크 → 스트림
+        stream = self._open_stream(primary, open_stream)
+        streams[asyncio.ensure_future(stream.__anext__())] = stream
+        winner, first_chunk = None, None
+        try:
+            delay = hedge_delay(self._latency["stream"])
+            if delay is not None:
+                done, _ = await asyncio.wait(streams, timeout=delay)
+                secondary = None if done else self._pick_hedge(model, primary)
+                if secondary:
+                    LLM_HEDGED_REQUESTS_TOTAL.labels(mode="stream").inc()
+                    stream = self._open_stream(secondary, open_stream)
+                    streams[asyncio.ensure_future(stream.__anext__())] = stream
+
+            while streams and winner is None:
+                done, _ = await asyncio.wait(streams, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stream = streams.pop(task)
+                    try:
+                        chunk = task.result()
+                    except StopAsyncIteration:
+                        continue
+                    if winner is None and (not chunk.startswith(ERROR_CHUNK_PREFIX) or not streams):
+                        winner, first_chunk = stream, chunk
+                    else:
+                        await stream.aclose()
+        finally:
+            for task, stream in streams.items():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                await stream.aclose()
+
+        if winner is None:
+            return
+        try:
+            yield first_chunk
+            async for chunk in winner:
+                yield chunk
+        finally:
+            await winner.aclose()
@@ -4,25 +4,34 @@ FastAPI Structured Logging
 structlog 기반 JSON 로깅 설정 및 미들웨어
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
+import random
 import sys
 import time
 import uuid
 from contextvars import ContextVar
 from pathlib import Path
-from typing import Callable
+from typing import Optional
 
 import structlog
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.serve.core.asgi import route_template
 from src.serve.core.config import settings
+from src.serve.core.metrics import LOG_RECORDS_DROPPED_TOTAL
+from src.serve.core.tracing import current_trace
 
 
 # Request ID Context Variable
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 
+# 큐 로깅 리스너 (setup_logging에서 시작)
+_queue_listener: Optional["DrainingQueueListener"] = None
+
 
 # ============================================================
 # Structlog Configuration
@@ -72,7 +81,8 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     
-    # 기존 핸들러 제거
+    # 기존 핸들러 제거 (재설정 시 이전 리스너는 남은 레코드를 쓰고 종료)
+    shutdown_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
@@ -95,8 +105,6 @@ def setup_logging(
             )
         )
     
-    root_logger.addHandler(console_handler)
-    
     # 파일 핸들러 (JSON 형식으로 항상 기록)
     log_file = Path(log_dir) / "app.log"
     file_handler = logging.handlers.RotatingFileHandler(
@@ -111,7 +119,19 @@ def setup_logging(
             processor=structlog.processors.JSONRenderer(),
         )
     )
-    root_logger.addHandler(file_handler)
+    
+    if settings.log_queue_enabled:
+        # 이벤트 루프 스레드는 레코드를 큐에 넣기만 하고, JSON 렌더링과 콘솔/파일 쓰기는 리스너 스레드에서 처리
+        global _queue_listener
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+        root_logger.addHandler(BoundedQueueHandler(log_queue, settings.log_queue_drop_policy))
+        _queue_listener = DrainingQueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
+    else:
+        root_logger.addHandler(console_handler)
+        root_logger.addHandler(file_handler)
     
     # 서드파티 로거 레벨 조정
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
@@ -120,6 +140,76 @@ def setup_logging(
     logging.getLogger("httpcore").setLevel(logging.WARNING)
 
 
+def shutdown_logging() -> None:
+    """큐 리스너 종료 (남은 레코드를 모두 쓴 뒤 반환, 종료 시 호출)"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+# ============================================================
+# Queued Handler
+# ============================================================
+
+DROP_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    크기 제한 큐 핸들러
+    
+    기본 QueueHandler는 호출 스레드에서 레코드를 포매팅(JSON 렌더링)하고 무제한 큐를 가정하므로,
+    포매팅은 리스너 스레드로 미루고 큐가 가득 차면 drop_policy에 따라 처리합니다.
+    - drop_newest: 새 레코드를 버림 (기본값, 요청 경로가 절대 대기하지 않음)
+    - drop_oldest: 가장 오래된 레코드를 버리고 새 레코드를 넣음
+    - block: 자리가 날 때까지 대기 (로그 유실 없음, 디스크 지연이 요청 지연으로 전파)
+    버린 레코드 수는 log_records_dropped_total 메트릭으로 노출합니다.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = "drop_newest"):
+        super().__init__(log_queue)
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown log queue drop policy: {drop_policy}")
+        self.drop_policy = drop_policy
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 같은 프로세스 안의 리스너가 받으므로 포매팅/피클링 준비 없이 그대로 전달
+        # (structlog 이벤트 dict는 리스너 쪽 ProcessorFormatter가 렌더링)
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.drop_policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.drop_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        LOG_RECORDS_DROPPED_TOTAL.inc()
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """종료 시 큐가 가득 차 있어도 남은 레코드를 모두 쓰고 멈추는 리스너"""
+    
+    def enqueue_sentinel(self) -> None:
+        # 기본 구현(put_nowait)은 큐가 가득 차면 queue.Full로 실패
+        self.queue.put(self._sentinel)
+
+
 def _add_request_id(logger, method_name, event_dict):
     """Request ID 추가"""
     req_id = request_id_var.get()
@@ -156,62 +246,103 @@ def get_logger(name: str = __name__) -> structlog.BoundLogger:
 # Request Logging Middleware
 # ============================================================
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """HTTP 요청/응답 로깅 미들웨어"""
+class RequestLoggingMiddleware:
+    """
+    HTTP 요청/응답 로깅 순수 ASGI 미들웨어
+
+    request_completed는 응답 본문 전송이 끝난 뒤(스트리밍 응답 전체) 라우트 템플릿과 함께 기록합니다.
+    request_started/request_completed는 경로별 비율로 샘플링하며(sample_rate 필드 포함),
+    5xx 응답과 예외는 샘플링과 무관하게 항상 기록합니다.
+    TracingMiddleware 안쪽에서 실행되면 trace_id와 구간별 소요 시간(spans, ms)을 함께 기록합니다.
+    """
     
-    def __init__(self, app):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.logger = get_logger("http")
+        # 긴 접두사 우선 매칭
+        self.sample_rates = sorted(
+            settings.log_request_sample_rates.items(), key=lambda item: len(item[0]), reverse=True
+        )
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Request ID 생성 또는 헤더에서 가져오기
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4())[:8])
-        request_id_var.set(request_id)
+    def sample_rate(self, path: str) -> float:
+        """경로에 적용할 샘플링 비율"""
+        for prefix, rate in self.sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return settings.log_request_sample_rate
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # 경로 필터 (metrics, health 제외)
-        if request.url.path in ("/metrics", "/health"):
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            return response
+        # Request ID 생성 또는 헤더에서 가져오기
+        request_headers = Headers(scope=scope)
+        request_id = request_headers.get("X-Request-ID") or str(uuid.uuid4())[:8]
+        token = request_id_var.set(request_id)
         
-        start_time = time.time()
+        path = scope["path"]
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        # 경로 필터 (metrics, health 제외) + 샘플링
+        sample_rate = 0.0 if path in ("/metrics", "/health") else self.sample_rate(path)
+        sampled = sample_rate >= 1.0 or random.random() < sample_rate
+        status_code = 500
+        start_time = time.perf_counter()
         
-        # 요청 로깅
-        self.logger.info(
-            "request_started",
-            method=request.method,
-            path=request.url.path,
-            query=str(request.query_params),
-            client_ip=request.client.host if request.client else "unknown",
-        )
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Response Header에 Request ID 추가
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
         
-        try:
-            response = await call_next(request)
-            
-            # 응답 로깅
-            duration_ms = (time.time() - start_time) * 1000
+        if sampled:
+            client = scope.get("client")
             self.logger.info(
-                "request_completed",
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                duration_ms=round(duration_ms, 2),
+                "request_started",
+                method=method,
+                path=path,
+                query=scope.get("query_string", b"").decode("latin-1"),
+                client_ip=client[0] if client else "unknown",
+                sample_rate=sample_rate,
             )
-            
-            # Response Header에 Request ID 추가
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
-            
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
             self.logger.exception(
                 "request_failed",
-                method=request.method,
-                path=request.url.path,
+                method=method,
+                path=path,
+                route=route_template(scope, root_path),
                 error=str(e),
                 duration_ms=round(duration_ms, 2),
+                **_trace_fields(),
             )
             raise
+        else:
+            if sampled or status_code >= 500:
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                self.logger.info(
+                    "request_completed",
+                    method=method,
+                    path=path,
+                    route=route_template(scope, root_path),
+                    status_code=status_code,
+                    duration_ms=round(duration_ms, 2),
+                    sample_rate=sample_rate if sampled else 1.0,
+                    **_trace_fields(),
+                )
+        finally:
+            request_id_var.reset(token)
 
 
+def _trace_fields() -> dict:
+    """현재 요청 트레이스의 로그 필드"""
+    trace = current_trace()
+    if trace is None:
+        return {}
+    return {"trace_id": trace.trace_id, "spans": trace.breakdown()}
@@ -0,0 +1,239 @@
+"""
+Message Writer
+
+채팅 메시지 write-behind 큐
+- 라우터는 사용자/어시스턴트 메시지를 큐에 넣고 바로 응답 (DB 지연이 응답 지연에 포함되지 않음)
+- 백그라운드 워커가 쌓인 메시지를 executemany INSERT + updated_at UPDATE 한 번으로 저장
+- 큐 크기 제한 (가득 차면 enqueue가 대기 = backpressure), 종료 시 남은 메시지 flush
+- 배치가 끝내 실패하면 교환 단위로 나눠 다시 저장하고, 그래도 실패한 교환은 dead-letter JSONL에 보관
+"""
+
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import (
+    MESSAGE_FLUSH_DURATION_SECONDS,
+    MESSAGE_QUEUE_DEPTH,
+    MESSAGE_WRITES_TOTAL,
+)
+from src.serve.cruds.chat import create_messages
+from src.serve.database import async_session_maker
+
+logger = get_logger(__name__)
+
+
+class MessageWriter:
+    """
+    채팅 메시지 write-behind 큐
+
+    큐 항목은 한 요청의 메시지 행 목록(사용자 + 어시스턴트)이며, 워커는 저장하는 동안 쌓인
+    항목을 batch_size 메시지까지 모아 트랜잭션 하나로 저장합니다 (group commit).
+    워커가 실행 중이 아니면(lifespan 밖, 비활성화) 호출한 쪽에서 바로 저장합니다.
+    """
+
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession] = async_session_maker,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        retries: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        dead_letter_path: Optional[str] = None,
+    ):
+        self.session_maker = session_maker
+        self.max_queue = max_queue or settings.message_queue_size
+        self.batch_size = batch_size or settings.message_batch_size
+        self.retries = settings.message_write_retries if retries is None else retries
+        self.enabled = settings.message_queue_enabled if enabled is None else enabled
+        self.dead_letter_path = Path(dead_letter_path or settings.message_dead_letter_path)
+        self._queue: asyncio.Queue[Optional[list[dict]]] = asyncio.Queue(maxsize=self.max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._pending: dict[int, int] = {}  # conversation_id -> 미저장 메시지 수
+        self._dead: set[int] = set()  # 마지막 저장이 dead-letter로 끝난 conversation_id
+        self._flushed = asyncio.Condition()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """워커 시작 (lifespan에서 호출)"""
+        if self.enabled and not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """큐에 남은 메시지를 모두 저장하고 워커 종료"""
+        if not self.running:
+            return
+        task, self._task = self._task, None  # 이후 enqueue는 직접 저장
+        await self._queue.put(None)
+        await task
+
+    # ============================================================
+    # Enqueue
+    # ============================================================
+
+    async def enqueue(self, rows: list[dict]) -> None:
+        """
+        메시지 행 저장 요청 (crud.message_row 형식)
+
+        대화 행은 호출 전에 커밋되어 있어야 합니다 (워커는 별도 세션에서 INSERT).
+        큐가 가득 차면 자리가 날 때까지 대기합니다.
+        """
+        if not rows:
+            return
+        if not self.running:
+            async with self.session_maker() as session, session.begin():
+                await create_messages(session, rows)
+            MESSAGE_WRITES_TOTAL.labels(status="inline").inc(len(rows))
+            return
+
+        for row in rows:
+            conversation_id = row["conversation_id"]
+            self._pending[conversation_id] = self._pending.get(conversation_id, 0) + 1
+        await self._queue.put(rows)
+        MESSAGE_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def wait_flushed(self, conversation_id: int, timeout: Optional[float] = None) -> bool:
+        """
+        대화의 미저장 메시지가 저장될 때까지 대기 (이력 조회 전 read-your-writes)
+
+        Returns:
+            timeout 안에 저장 완료 여부 (dead-letter로 보낸 메시지가 있으면 False)
+        """
+        if conversation_id not in self._pending:
+            return conversation_id not in self._dead
+        timeout = settings.message_flush_timeout if timeout is None else timeout
+        try:
+            async with self._flushed:
+                await asyncio.wait_for(
+                    self._flushed.wait_for(lambda: conversation_id not in self._pending),
+                    timeout,
+                )
+            return conversation_id not in self._dead
+        except asyncio.TimeoutError:
+            return False
+
+    # ============================================================
+    # Worker
+    # ============================================================
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch, size = [item], len(item)
+            while size < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                size += len(item)
+            MESSAGE_QUEUE_DEPTH.set(self._queue.qsize())
+            await self._write(batch)
+
+    async def _insert(self, rows: list[dict]) -> None:
+        async with self.session_maker() as session, session.begin():
+            await create_messages(session, rows)
+
+    async def _write(self, exchanges: list[list[dict]]) -> None:
+        """
+        배치 저장 (실패 시 jitter backoff 재시도)
+
+        재시도까지 실패하면 행 하나(삭제된 대화의 FK 위반 등) 때문에 다른 대화의 메시지까지
+        잃지 않도록 교환 단위로 한 번씩 다시 저장하고, 그래도 실패한 교환만 dead-letter로 보냅니다.
+        """
+        started = time.monotonic()
+        rows = [row for exchange in exchanges for row in exchange]
+        for attempt in range(self.retries + 1):
+            try:
+                await self._insert(rows)
+                MESSAGE_WRITES_TOTAL.labels(status="written").inc(len(rows))
+                self._dead.difference_update(row["conversation_id"] for row in rows)
+                break
+            except Exception as e:
+                if attempt >= self.retries:
+                    logger.warning(
+                        "message_batch_write_failed",
+                        messages=len(rows),
+                        exchanges=len(exchanges),
+                        error=str(e),
+                    )
+                    await self._write_each(exchanges)
+                    break
+                await asyncio.sleep(random.uniform(0, 0.1 * 2 ** attempt))
+        MESSAGE_FLUSH_DURATION_SECONDS.observe(time.monotonic() - started)
+
+        for row in rows:
+            conversation_id = row["conversation_id"]
+            remaining = self._pending.get(conversation_id, 0) - 1
+            if remaining > 0:
+                self._pending[conversation_id] = remaining
+            else:
+                self._pending.pop(conversation_id, None)
+        async with self._flushed:
+            self._flushed.notify_all()
+
+    async def _write_each(self, exchanges: list[list[dict]]) -> None:
+        """교환별 개별 트랜잭션으로 저장 (실패한 교환은 dead-letter)"""
+        for exchange in exchanges:
+            conversation_ids = {row["conversation_id"] for row in exchange}
+            try:
+                await self._insert(exchange)
+            except Exception as e:
+                self._dead.update(conversation_ids)
+                await self._dead_letter(exchange, e)
+                continue
+            MESSAGE_WRITES_TOTAL.labels(status="written").inc(len(exchange))
+            self._dead.difference_update(conversation_ids)
+
+    async def _dead_letter(self, rows: list[dict], error: Exception) -> None:
+        """저장하지 못한 교환을 dead-letter JSONL에 추가 (한 줄 = 교환 하나, 수동 재처리용)"""
+        record = {
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "error": f"{type(error).__name__}: {error}",
+            "rows": [
+                {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+                for row in rows
+            ],
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        try:
+            await asyncio.to_thread(_append_line, self.dead_letter_path, line)
+        except Exception as e:
+            MESSAGE_WRITES_TOTAL.labels(status="failed").inc(len(rows))
+            logger.exception("message_dead_letter_failed", messages=len(rows), record=line, error=str(e))
+            return
+        MESSAGE_WRITES_TOTAL.labels(status="dead_letter").inc(len(rows))
+        logger.error(
+            "message_dead_lettered",
+            messages=len(rows),
+            conversations=sorted({row["conversation_id"] for row in rows}),
+            path=str(self.dead_letter_path),
+            error=str(error),
+        )
+
+
+def _append_line(path: Path, line: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+# 전역 메시지 writer
+message_writer = MessageWriter()
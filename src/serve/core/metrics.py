@@ -5,13 +5,13 @@ FastAPI 메트릭 수집 및 노출
 """
 
 import time
-from typing import Callable
 
-from fastapi import Request, Response
 from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest, CONTENT_TYPE_LATEST
-from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy import event
 from starlette.responses import Response as StarletteResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from src.serve.core.asgi import route_template
 from src.serve.core.config import settings
 
 
@@ -51,6 +51,24 @@ HTTP_REQUESTS_IN_PROGRESS = Gauge(
     ["method", "endpoint"]
 )
 
+# 어드미션 제어 (vLLM 앞단 대기열)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Number of requests waiting for an upstream LLM slot",
+)
+
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time spent waiting for an upstream LLM slot",
+    buckets=[0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+ADMISSION_REJECTED_TOTAL = Counter(
+    "admission_rejected_total",
+    "Total number of requests rejected by admission control",
+    ["reason"]
+)
+
 # LLM 요청 메트릭
 LLM_REQUESTS_TOTAL = Counter(
     "llm_requests_total",
@@ -71,10 +89,205 @@ LLM_TOKENS_GENERATED = Counter(
     ["model"]
 )
 
+# 토큰 사용량 (모델 × 프리셋 × 해시된 사용자, core.usage에서 기록)
+LLM_PROMPT_TOKENS_TOTAL = Counter(
+    "llm_prompt_tokens_total",
+    "Total number of prompt tokens sent upstream",
+    ["model", "llm_config", "user"]
+)
+
+LLM_COMPLETION_TOKENS_TOTAL = Counter(
+    "llm_completion_tokens_total",
+    "Total number of completion tokens generated upstream",
+    ["model", "llm_config", "user"]
+)
+
+LLM_TOKENS_PER_SECOND = Histogram(
+    "llm_tokens_per_second",
+    "Completion tokens per second of generation time per request",
+    ["model", "llm_config", "user"],
+    buckets=[1, 5, 10, 20, 40, 80, 160, 320, 640]
+)
+
+# 스트리밍 지연시간 (TTFT / 토큰 간 지연)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from upstream request to first streamed token in seconds",
+    ["model"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0]
+)
+
+LLM_INTER_TOKEN_LATENCY_SECONDS = Histogram(
+    "llm_inter_token_latency_seconds",
+    "Latency between consecutive streamed tokens in seconds",
+    ["model"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+# 응답 캐시
+RESPONSE_CACHE_HITS_TOTAL = Counter(
+    "response_cache_hits_total",
+    "Total number of chat completion response cache hits",
+    ["tier"]
+)
+
+RESPONSE_CACHE_MISSES_TOTAL = Counter(
+    "response_cache_misses_total",
+    "Total number of chat completion response cache misses"
+)
+
+# 시맨틱 캐시
+SEMANTIC_CACHE_REQUESTS_TOTAL = Counter(
+    "semantic_cache_requests_total",
+    "Total number of semantic cache lookups",
+    ["result"]
+)
+
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    "semantic_cache_similarity",
+    "Best cosine similarity score per semantic cache lookup",
+    buckets=[0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.95, 0.98, 1.0]
+)
+
+# 요청 병합 (single-flight)
+LLM_COALESCED_REQUESTS_TOTAL = Counter(
+    "llm_coalesced_requests_total",
+    "Total number of LLM requests served by joining an identical in-flight request",
+    ["mode"]
+)
+
+# 백엔드별 진행 중 LLM 요청 수 (LLMRouter)
+LLM_BACKEND_IN_FLIGHT = Gauge(
+    "llm_backend_requests_in_flight",
+    "Number of in-flight upstream LLM requests per backend",
+    ["backend"]
+)
+
+# 헤지 요청 / 재시도
+LLM_HEDGED_REQUESTS_TOTAL = Counter(
+    "llm_hedged_requests_total",
+    "Total number of duplicate upstream requests sent to another backend after the hedge delay",
+    ["mode"]
+)
+
+LLM_RETRIES_TOTAL = Counter(
+    "llm_retries_total",
+    "Total number of retried upstream LLM requests",
+)
+
+# 백엔드별 서킷 브레이커 상태 (0: closed, 1: half-open, 2: open)
+LLM_CIRCUIT_STATE = Gauge(
+    "llm_circuit_state",
+    "Circuit breaker state per LLM backend (0=closed, 1=half-open, 2=open)",
+    ["backend"]
+)
+
+# vLLM 엔진 지표 (백엔드 /metrics 스크랩 결과 재노출)
+LLM_BACKEND_KV_CACHE_USAGE = Gauge(
+    "llm_backend_kv_cache_usage_ratio",
+    "KV cache usage reported by the vLLM engine per backend (0-1)",
+    ["backend"]
+)
+
+LLM_BACKEND_ENGINE_RUNNING = Gauge(
+    "llm_backend_engine_requests_running",
+    "Number of sequences running on the vLLM engine per backend",
+    ["backend"]
+)
+
+LLM_BACKEND_ENGINE_WAITING = Gauge(
+    "llm_backend_engine_requests_waiting",
+    "Number of sequences waiting in the vLLM engine queue per backend",
+    ["backend"]
+)
+
+LLM_BACKEND_PREFIX_CACHE_HIT_RATIO = Gauge(
+    "llm_backend_prefix_cache_hit_ratio",
+    "Prefix cache hit rate reported by the vLLM engine per backend (0-1)",
+    ["backend"]
+)
+
+LLM_BACKEND_SATURATED = Gauge(
+    "llm_backend_saturated",
+    "Whether the backend engine is saturated (KV cache or waiting queue threshold)",
+    ["backend"]
+)
+
+LLM_ROUTER_CAPACITY = Gauge(
+    "llm_router_capacity",
+    "Upstream concurrency limit across backends after engine saturation (0=unlimited)"
+)
+
+LLM_BACKEND_SCRAPE_ERRORS_TOTAL = Counter(
+    "llm_backend_metrics_scrape_errors_total",
+    "Total number of failed vLLM /metrics scrapes per backend",
+    ["backend"]
+)
+
+# 배치 완성 요청 수
+BATCH_REQUESTS_TOTAL = Counter(
+    "batch_requests_total",
+    "Total number of batch completion requests processed",
+    ["status"]
+)
+
+# 메시지 write-behind 큐
+MESSAGE_QUEUE_DEPTH = Gauge(
+    "message_queue_depth",
+    "Number of chat exchanges waiting to be persisted"
+)
+
+MESSAGE_WRITES_TOTAL = Counter(
+    "message_writes_total",
+    "Total number of chat messages persisted by the write-behind queue",
+    ["status"]
+)
+
+MESSAGE_FLUSH_DURATION_SECONDS = Histogram(
+    "message_flush_duration_seconds",
+    "Duration of write-behind batch inserts in seconds",
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+)
+
+# 대화 아카이브
+ARCHIVED_CONVERSATIONS_TOTAL = Counter(
+    "archived_conversations_total",
+    "Total number of conversations moved to the cold archive"
+)
+
+ARCHIVED_MESSAGES_TOTAL = Counter(
+    "archived_messages_total",
+    "Total number of chat messages moved to the cold archive"
+)
+
+# 메시지 통계 롤업
+STATS_ROLLUP_MESSAGES_TOTAL = Counter(
+    "stats_rollup_messages_total",
+    "Total number of chat messages aggregated into the hourly stats rollup"
+)
+
+STATS_ROLLUP_LAG_SECONDS = Gauge(
+    "stats_rollup_lag_seconds",
+    "Age of the newest chat message aggregated into the hourly stats rollup"
+)
+
+# 로깅
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    "log_records_dropped_total",
+    "Total number of log records dropped because the log queue was full"
+)
+
+# 트레이싱
+TRACES_EXPORTED_TOTAL = Counter(
+    "traces_exported_total",
+    "Total number of request traces handed to the trace exporter",
+    ["status"]  # exported, failed, dropped
+)
+
 # 데이터베이스 메트릭
 DB_CONNECTIONS_ACTIVE = Gauge(
     "db_connections_active",
-    "Number of active database connections"
+    "Number of database connections checked out from the pool"
 )
 
 DB_QUERY_DURATION_SECONDS = Histogram(
@@ -89,63 +302,44 @@ DB_QUERY_DURATION_SECONDS = Histogram(
 # Prometheus Middleware
 # ============================================================
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    """HTTP 요청 메트릭을 수집하는 미들웨어"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+class PrometheusMiddleware:
+    """
+    HTTP 요청 메트릭을 수집하는 순수 ASGI 미들웨어
+
+    endpoint 라벨은 라우터가 매칭한 경로 템플릿이며, 지속시간은 응답 본문 전송이 끝날 때까지
+    (스트리밍 응답 전체) 측정합니다. 진행 중 게이지는 라우트 매칭 전에 올려야 하므로 endpoint="*"로 셉니다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # /metrics 경로는 제외
-        if request.url.path == "/metrics":
-            return await call_next(request)
-        
-        method = request.method
-        endpoint = self._get_endpoint(request)
-        
-        # 진행 중인 요청 증가
-        HTTP_REQUESTS_IN_PROGRESS.labels(method=method, endpoint=endpoint).inc()
-        
-        start_time = time.time()
-        
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        status_code = 500
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method, endpoint="*")
+        in_progress.inc()
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
-            status_code = 500
-            raise
+            await self.app(scope, receive, send_wrapper)
         finally:
-            # 요청 완료 시간
-            duration = time.time() - start_time
-            
-            # 메트릭 기록
-            HTTP_REQUESTS_TOTAL.labels(
-                method=method,
-                endpoint=endpoint,
-                status_code=status_code
-            ).inc()
-            
-            HTTP_REQUEST_DURATION_SECONDS.labels(
-                method=method,
-                endpoint=endpoint
-            ).observe(duration)
-            
-            # 진행 중인 요청 감소
-            HTTP_REQUESTS_IN_PROGRESS.labels(method=method, endpoint=endpoint).dec()
-        
-        return response
-    
-    def _get_endpoint(self, request: Request) -> str:
-        """엔드포인트 경로 추출 (경로 파라미터 정규화)"""
-        path = request.url.path
-        
-        # 경로 파라미터 정규화 (예: /v1/conversations/123 → /v1/conversations/{id})
-        parts = path.split("/")
-        normalized = []
-        for part in parts:
-            if part.isdigit():
-                normalized.append("{id}")
-            else:
-                normalized.append(part)
-        
-        return "/".join(normalized)
+            duration = time.perf_counter() - start_time
+            endpoint = route_template(scope, root_path)
+            HTTP_REQUESTS_TOTAL.labels(method=method, endpoint=endpoint, status_code=status_code).inc()
+            HTTP_REQUEST_DURATION_SECONDS.labels(method=method, endpoint=endpoint).observe(duration)
+            in_progress.dec()
 
 
 # ============================================================
@@ -173,6 +367,22 @@ def record_llm_request(model: str, duration: float, tokens: int, success: bool =
         LLM_TOKENS_GENERATED.labels(model=model).inc(tokens)
 
 
+def record_llm_ttft(model: str, ttft: float):
+    """스트리밍 TTFT (Time To First Token) 기록"""
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(model=model).observe(ttft)
+
+
 def record_db_query(operation: str, duration: float):
     """DB 쿼리 메트릭 기록"""
     DB_QUERY_DURATION_SECONDS.labels(operation=operation).observe(duration)
+
+
+def instrument_engine(engine) -> None:
+    """
+    커넥션 풀 이벤트로 DB_CONNECTIONS_ACTIVE 갱신
+
+    Args:
+        engine: 동기 Engine (AsyncEngine은 .sync_engine 전달)
+    """
+    event.listen(engine, "checkout", lambda *args: DB_CONNECTIONS_ACTIVE.inc())
+    event.listen(engine, "checkin", lambda *args: DB_CONNECTIONS_ACTIVE.dec())
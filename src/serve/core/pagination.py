@@ -0,0 +1,39 @@
+"""
+Keyset Pagination
+
+목록 API용 불투명 커서 (정렬 키 + id)
+- OFFSET 대신 마지막 행의 (정렬 시각, id) 이후부터 조회해 깊은 페이지도 인덱스 범위 스캔으로 처리
+- 다음 페이지 커서는 X-Next-Cursor 응답 헤더로 전달
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = tuple[datetime, int]
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """(정렬 시각, id) → URL-safe 커서 문자열"""
+    raw = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """
+    커서 문자열 → (정렬 시각, id)
+
+    Raises:
+        ValueError: 잘못된 커서
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,120 @@
+"""
+Preset Cache
+
+LLMConfig + few-shot 프리셋 인프로세스 캐시 (TTL + LRU)
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.serve.core.config import settings
+from src.serve.models.chat import LLMConfig
+
+DEFAULT_KEY = "default"
+
+
+@dataclass(frozen=True)
+class FewshotTurn:
+    """Few-shot 예시 메시지 (불변)"""
+    role: str
+    content: str
+
+
+@dataclass(frozen=True)
+class Preset:
+    """완전히 로딩된 LLMConfig 스냅샷 (불변, 세션과 무관하게 공유 가능)"""
+    id: int
+    name: str
+    model_name: str
+    system_prompt: Optional[str]
+    temperature: float
+    max_tokens: int
+    top_p: float
+    is_default: bool
+    max_tokens_limit: Optional[int]  # 연결된 LLMModel의 토큰 상한
+    cache_ttl_seconds: Optional[int] = None
+    semantic_cache_threshold: Optional[float] = None
+    fewshot: tuple[FewshotTurn, ...] = ()
+
+    @classmethod
+    def from_orm(cls, config: LLMConfig) -> "Preset":
+        """fewshot_messages, llm_model이 로딩된 LLMConfig로부터 생성"""
+        return cls(
+            id=config.id,
+            name=config.name,
+            model_name=config.model_name,
+            system_prompt=config.system_prompt,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            top_p=config.top_p,
+            is_default=config.is_default,
+            max_tokens_limit=config.llm_model.max_tokens_limit if config.llm_model else None,
+            cache_ttl_seconds=config.cache_ttl_seconds,
+            semantic_cache_threshold=config.semantic_cache_threshold,
+            fewshot=tuple(FewshotTurn(f.role, f.content) for f in config.fewshot_messages),
+        )
+
+    def fewshot_messages(self) -> list[dict]:
+        """few-shot 예시를 채팅 메시지 형식으로 반환"""
+        return [{"role": f.role, "content": f.content} for f in self.fewshot]
+
+
+class PresetCache:
+    """
+    프리셋 캐시
+
+    id 또는 "default" 키로 Preset을 캐시합니다. 없는 프리셋(None)도
+    캐시하여 반복 조회를 막고, LLMConfig 쓰기 시 invalidate()로 전체를 비웁니다.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        self.maxsize = maxsize or settings.preset_cache_size
+        self.ttl = ttl if ttl is not None else settings.preset_cache_ttl
+        self._entries: OrderedDict[Union[int, str], tuple[float, Optional[Preset]]] = OrderedDict()
+        self._generation = 0
+
+    async def get(
+        self,
+        db: AsyncSession,
+        config_id: Optional[int] = None,
+    ) -> Optional[Preset]:
+        """프리셋 조회 (config_id가 없으면 기본 프리셋)"""
+        key = config_id if config_id is not None else DEFAULT_KEY
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        generation = self._generation
+        preset = await self._load(db, config_id)
+
+        # 로딩 중 invalidate가 일어났으면 오래된 값일 수 있으므로 저장하지 않음
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttl, preset)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return preset
+
+    async def _load(self, db: AsyncSession, config_id: Optional[int]) -> Optional[Preset]:
+        """DB에서 프리셋 로딩"""
+        from src.serve.cruds import chat as crud
+
+        if config_id is not None:
+            config = await crud.get_llm_config(db, config_id, include_related=True)
+        else:
+            config = await crud.get_default_llm_config(db, include_related=True)
+        return Preset.from_orm(config) if config else None
+
+    def invalidate(self) -> None:
+        """캐시 전체 무효화 (is_default 변경이 다른 프리셋에도 영향을 주므로 전체 삭제)"""
+        self._generation += 1
+        self._entries.clear()
+
+
+# 전역 프리셋 캐시
+preset_cache = PresetCache()
@@ -0,0 +1,193 @@
+"""
+Response Cache
+
+결정적(temperature=0) 채팅 완성 응답 캐시
+- 메모리 LRU (크기 제한)
+- 선택적 SQLite 디스크 계층 (RESPONSE_CACHE_PATH)
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+from src.serve.core.config import settings
+from src.serve.core.metrics import RESPONSE_CACHE_HITS_TOTAL, RESPONSE_CACHE_MISSES_TOTAL
+from src.serve.core.streaming import sse_data
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """캐시된 채팅 완성 응답 (LLMClient.chat_completion 반환 형식과 동일)"""
+    content: str
+    model: str
+    usage: dict = field(default_factory=dict)
+    finish_reason: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachedResponse":
+        return cls(
+            content=data["content"],
+            model=data["model"],
+            usage=dict(data.get("usage") or {}),
+            finish_reason=data.get("finish_reason"),
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def make_cache_key(
+    model: Optional[str],
+    messages: list[dict],
+    temperature: float,
+    top_p: float,
+    max_tokens: int,
+) -> str:
+    """모델, 메시지, 샘플링 파라미터의 정규화된 해시"""
+    payload = {
+        "model": model or settings.default_model or "default",
+        "messages": [{"role": m["role"], "content": m["content"]} for m in messages],
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _SQLiteTier:
+    """SQLite 디스크 캐시 계층 (동기 - 스레드 풀에서 실행)"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[float, CachedResponse]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[1], CachedResponse.from_dict(json.loads(row[0]))
+
+    def set(self, key: str, value: CachedResponse, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value.to_dict(), ensure_ascii=False), expires_at),
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    채팅 완성 응답 캐시
+
+    메모리 LRU를 먼저 조회하고, 디스크 계층이 설정되어 있으면
+    메모리 미스 시 디스크를 조회한 뒤 메모리로 승격합니다.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        path: Optional[str] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.enabled = settings.response_cache_enabled if enabled is None else enabled
+        self.maxsize = maxsize or settings.response_cache_size
+        self._memory: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        path = path or settings.response_cache_path
+        self._disk = _SQLiteTier(path) if self.enabled and path else None
+
+    def ttl_for(self, preset) -> int:
+        """프리셋별 TTL (LLMConfig.cache_ttl_seconds, 없으면 기본값 / 0이면 캐시 안 함)"""
+        if preset is not None and preset.cache_ttl_seconds is not None:
+            return preset.cache_ttl_seconds
+        return settings.response_cache_ttl
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """캐시 조회"""
+        entry = self._memory.get(key)
+        if entry and entry[0] > time.time():
+            self._memory.move_to_end(key)
+            RESPONSE_CACHE_HITS_TOTAL.labels(tier="memory").inc()
+            return entry[1]
+        if entry:
+            del self._memory[key]
+
+        if self._disk:
+            entry = await asyncio.to_thread(self._disk.get, key)
+            if entry:
+                self._put_memory(key, *entry)
+                RESPONSE_CACHE_HITS_TOTAL.labels(tier="disk").inc()
+                return entry[1]
+
+        RESPONSE_CACHE_MISSES_TOTAL.inc()
+        return None
+
+    async def set(self, key: str, value: CachedResponse, ttl: int) -> None:
+        """캐시 저장"""
+        expires_at = time.time() + ttl
+        self._put_memory(key, expires_at, value)
+        if self._disk:
+            await asyncio.to_thread(self._disk.set, key, value, expires_at)
+
+    def _put_memory(self, key: str, expires_at: float, value: CachedResponse) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """메모리 계층 비우기"""
+        self._memory.clear()
+
+    def close(self) -> None:
+        """디스크 계층 종료"""
+        if self._disk:
+            self._disk.close()
+            self._disk = None
+
+
+async def replay_stream(cached: CachedResponse) -> AsyncGenerator[bytes, None]:
+    """
+    캐시된 응답을 OpenAI 스트리밍 청크 형식으로 재생
+
+    LLMClient.chat_completion_stream과 같은 형식(SSE 바이트 이벤트)을 yield합니다.
+    """
+    base = {"object": "chat.completion.chunk", "model": cached.model}
+    for piece in re.findall(r"\s*\S+|\s+", cached.content):
+        yield sse_data(json.dumps(
+            {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]},
+            ensure_ascii=False,
+        ))
+    yield sse_data(json.dumps(
+        {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": cached.finish_reason or "stop"}]}
+    ))
+    if cached.usage:
+        yield sse_data(json.dumps({**base, "choices": [], "usage": cached.usage}))
+
+
+# 전역 응답 캐시
+response_cache = ResponseCache()
@@ -0,0 +1,199 @@
+"""
+Semantic Cache
+
+임베딩 유사도 기반 응답 캐시 (의역된 질문 재사용)
+- CPU 소형 임베딩 모델 (sentence-transformers, 선택 의존성)
+- 정규화 벡터 행렬 + 내적 검색 (brute-force, 수천 건 규모)
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import SEMANTIC_CACHE_REQUESTS_TOTAL, SEMANTIC_CACHE_SIMILARITY
+from src.serve.core.response_cache import CachedResponse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # 선택 의존성 미설치 시 비활성화
+    SentenceTransformer = None
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SemanticLookup:
+    """유사도 검색 결과 (미스 시 같은 임베딩으로 저장)"""
+    namespace: str
+    embedding: object
+    response: Optional[CachedResponse] = None
+    score: float = 0.0
+
+
+def semantic_namespace(model: Optional[str], prefix: list[dict]) -> str:
+    """
+    캐시 네임스페이스 계산
+
+    마지막 user 메시지 앞의 프롬프트(system + few-shot)와 모델이 같은 요청끼리만
+    답변을 공유합니다.
+    """
+    canonical = json.dumps(
+        {
+            "model": model or settings.default_model or "default",
+            "prefix": [{"role": m["role"], "content": m["content"]} for m in prefix],
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    """
+    임베딩 유사도 캐시
+
+    고정 크기 벡터 행렬에 정규화 임베딩을 저장하고 내적(코사인 유사도)으로 검색합니다.
+    용량 초과 시 만료된 슬롯을 먼저, 없으면 eviction 정책(lru/fifo)에 따라 슬롯을 재사용합니다.
+    네임스페이스는 슬롯 수로 참조를 세어 마지막 슬롯이 재사용되면 제거합니다 (대화마다 새 네임스페이스가 생겨도 누적되지 않음).
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        capacity: Optional[int] = None,
+        eviction: Optional[str] = None,
+        ttl: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        encoder: Optional[Callable[[str], object]] = None,
+    ):
+        enabled = settings.semantic_cache_enabled if enabled is None else enabled
+        if enabled and (np is None or (encoder is None and SentenceTransformer is None)):
+            logger.warning("semantic_cache_disabled", reason="sentence-transformers not installed")
+            enabled = False
+        self.enabled = enabled
+        self.model_name = model_name or settings.semantic_cache_model
+        self.capacity = capacity or settings.semantic_cache_size
+        self.eviction = eviction or settings.semantic_cache_eviction
+        self.ttl = ttl if ttl is not None else settings.semantic_cache_ttl
+        self._encoder = encoder
+        self._load_lock = asyncio.Lock()  # 동시 첫 조회에서 모델을 한 번만 생성
+        self._namespaces: dict[str, int] = {}  # 네임스페이스 → id
+        self._namespace_refs: dict[int, int] = {}  # id → 사용 중인 슬롯 수
+        self._namespace_ids_seq = itertools.count()
+        self._slot_namespaces: list[Optional[str]] = [None] * self.capacity
+        self._order: OrderedDict[int, None] = OrderedDict()  # eviction 순서 (앞쪽이 먼저 제거)
+        self._responses: list[Optional[CachedResponse]] = [None] * self.capacity
+        self._vectors = None  # (capacity, dim) float32, 첫 저장 시 할당
+        if self.enabled:
+            self._namespace_ids = np.full(self.capacity, -1, dtype=np.int64)
+            self._expires_at = np.zeros(self.capacity, dtype=np.float64)
+
+    async def load_model(self) -> None:
+        """
+        임베딩 모델 로딩 (lifespan 사전 로딩, 없으면 첫 조회 시)
+
+        모델 생성은 스레드 풀에서 한 번만 실행하고, 그동안 들어온 조회는 완료를 기다립니다.
+        """
+        if self._encoder is not None:
+            return
+        async with self._load_lock:
+            if self._encoder is None:
+                model = await asyncio.to_thread(SentenceTransformer, self.model_name, device="cpu")
+                self._encoder = lambda t: model.encode(t, normalize_embeddings=True)
+
+    def _encode(self, text: str):
+        """텍스트 임베딩 (정규화, 동기 - 스레드 풀에서 실행)"""
+        return np.asarray(self._encoder(text), dtype=np.float32)
+
+    async def lookup(
+        self,
+        namespace: str,
+        text: str,
+        threshold: float,
+    ) -> SemanticLookup:
+        """마지막 user 메시지와 가장 유사한 저장 답변 검색"""
+        await self.load_model()
+        embedding = await asyncio.to_thread(self._encode, text)
+        lookup = SemanticLookup(namespace=namespace, embedding=embedding)
+
+        namespace_id = self._namespaces.get(namespace)
+        if self._vectors is not None and namespace_id is not None:
+            valid = (self._namespace_ids == namespace_id) & (self._expires_at > time.time())
+            if valid.any():
+                scores = np.where(valid, self._vectors @ embedding, -1.0)
+                best = int(scores.argmax())
+                lookup.score = float(scores[best])
+                SEMANTIC_CACHE_SIMILARITY.observe(lookup.score)
+                if lookup.score >= threshold:
+                    lookup.response = self._responses[best]
+                    if self.eviction == "lru":
+                        self._order.move_to_end(best)
+
+        SEMANTIC_CACHE_REQUESTS_TOTAL.labels(result="hit" if lookup.response else "miss").inc()
+        return lookup
+
+    def store(self, lookup: SemanticLookup, response: CachedResponse) -> None:
+        """미스였던 요청의 응답을 같은 임베딩으로 저장"""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.capacity, lookup.embedding.shape[0]), dtype=np.float32)
+
+        if len(self._order) < self.capacity:
+            slot = next(i for i, r in enumerate(self._responses) if r is None)
+        else:
+            expired = np.flatnonzero(self._expires_at <= time.time())
+            if expired.size:
+                slot = int(expired[0])
+                del self._order[slot]
+            else:
+                slot, _ = self._order.popitem(last=False)
+            self._release_namespace(slot)
+
+        namespace_id = self._namespaces.get(lookup.namespace)
+        if namespace_id is None:
+            namespace_id = self._namespaces[lookup.namespace] = next(self._namespace_ids_seq)
+        self._namespace_refs[namespace_id] = self._namespace_refs.get(namespace_id, 0) + 1
+        self._slot_namespaces[slot] = lookup.namespace
+        self._vectors[slot] = lookup.embedding
+        self._namespace_ids[slot] = namespace_id
+        self._expires_at[slot] = time.time() + self.ttl
+        self._responses[slot] = response
+        self._order[slot] = None
+        self._order.move_to_end(slot)
+
+    def _release_namespace(self, slot: int) -> None:
+        """재사용할 슬롯의 네임스페이스 참조 해제 (마지막 슬롯이면 네임스페이스 제거)"""
+        namespace = self._slot_namespaces[slot]
+        self._slot_namespaces[slot] = None
+        namespace_id = self._namespaces.get(namespace)
+        if namespace_id is None:
+            return
+        self._namespace_refs[namespace_id] -= 1
+        if self._namespace_refs[namespace_id] == 0:
+            del self._namespace_refs[namespace_id]
+            del self._namespaces[namespace]
+
+    def clear(self) -> None:
+        """전체 항목 삭제"""
+        self._order.clear()
+        self._responses = [None] * self.capacity
+        self._slot_namespaces = [None] * self.capacity
+        self._namespaces.clear()
+        self._namespace_refs.clear()
+        if self.enabled:
+            self._namespace_ids.fill(-1)
+
+
+# 전역 시맨틱 캐시
+semantic_cache = SemanticCache()
@@ -0,0 +1,88 @@
+"""
+JSON Serialization
+
+선택적 고속 JSON 백엔드 (orjson > msgspec > 표준 json)
+- 앱 기본 응답 클래스 (FastJSONResponse)
+- vLLM 응답 본문 디코딩 (loads)
+"""
+
+import json
+from typing import Any, Callable, Union
+
+from fastapi.responses import JSONResponse
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 미설치 시 다음 백엔드 사용
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logger = get_logger(__name__)
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _available(name: str) -> bool:
+    return name == "json" or (name == "orjson" and orjson is not None) or (
+        name == "msgspec" and msgspec is not None
+    )
+
+
+def select_backend(name: str = "auto") -> str:
+    """
+    사용할 JSON 백엔드 결정
+
+    Args:
+        name: auto / orjson / msgspec / json (설치되지 않은 백엔드는 auto로 대체)
+    """
+    if name != "auto":
+        if name in BACKENDS and _available(name):
+            return name
+        logger.warning("json_backend_unavailable", backend=name)
+    return next(backend for backend in BACKENDS if _available(backend))
+
+
+def _json_dumps(content: Any) -> bytes:
+    # Starlette JSONResponse.render와 동일한 출력
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def get_codec(backend: str) -> tuple[Callable[[Any], bytes], Callable[[Union[bytes, str]], Any]]:
+    """백엔드별 (dumps, loads) 함수"""
+    if backend == "orjson":
+        return (lambda content: orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)), orjson.loads
+    if backend == "msgspec":
+        decoder = msgspec.json.Decoder()
+
+        def _msgspec_loads(data: Union[bytes, str]) -> Any:
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as e:  # 다른 백엔드처럼 ValueError로 통일
+                raise ValueError(str(e)) from e
+
+        return msgspec.json.Encoder().encode, _msgspec_loads
+    return _json_dumps, json.loads
+
+
+JSON_BACKEND = select_backend(settings.json_backend)
+dumps, loads = get_codec(JSON_BACKEND)
+
+
+class FastJSONResponse(JSONResponse):
+    """선택된 JSON 백엔드로 렌더링하는 기본 응답 클래스"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,82 @@
+"""
+Quantile Sketch
+
+병합 가능한 분위수 스케치 (DDSketch 방식 로그 버킷 히스토그램)
+- 값 x는 ceil(log_γ x) 버킷에 카운트 (γ = (1+α)/(1-α)) → 분위수 상대 오차 α 이내
+- 같은 α의 스케치는 버킷 카운트 합으로 병합 (시간/모델별 롤업을 합쳐 임의 구간 분위수 계산)
+- JSON 직렬화 가능한 dict로 DB 컬럼에 저장
+"""
+
+import math
+from typing import Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """
+    음이 아닌 값의 분위수 스케치
+
+    0 이하 값은 zero 카운트로 따로 셉니다 (지연/토큰 수는 음수가 없음).
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위수 (0 <= q <= 1), 비어 있으면 None"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # 버킷 (γ^(k-1), γ^k]의 대표값
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    # ============================================================
+    # Serialization
+    # ============================================================
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.relative_accuracy,
+            "zero": self.zero_count,
+            "bins": {str(key): count for key, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "QuantileSketch":
+        """to_dict 결과에서 복원 (None이면 빈 스케치)"""
+        if not data:
+            return cls()
+        sketch = cls(data.get("alpha", DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(key): count for key, count in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero", 0)
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
@@ -0,0 +1,316 @@
+"""
+Message Stats Rollup
+
+chat_messages → message_stats_hourly 증분 집계 (관리자 통계 대시보드용)
+- 시간(UTC 정시) × 모델 × 역할 버킷별 카운트/합계/최소/최대 + 지연·TTFT·생성 속도 분위수 스케치
+- rollup_watermarks의 마지막 처리 id 이후 메시지만 읽어 기존 버킷에 병합 (주기 실행)
+- 워터마크 아래의 빈 id는 gap으로 기록해 다시 조회 (먼저 발급된 id가 늦게 커밋되는 경우)
+- 대시보드는 원본 메시지 대신 버킷 행만 읽어 임의 기간을 합산 (p50/p90/p99는 스케치 병합)
+- 모든 계산은 Python에서 하므로 SQLite/PostgreSQL 결과가 동일
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+from src.serve.core.metrics import STATS_ROLLUP_LAG_SECONDS, STATS_ROLLUP_MESSAGES_TOTAL
+from src.serve.core.sketch import QuantileSketch
+from src.serve.database import async_session_maker
+from src.serve.models.chat import ChatMessage
+from src.serve.models.stats import MessageStatsHourly, RollupWatermark
+
+logger = get_logger(__name__)
+
+WATERMARK_NAME = "message_stats_hourly"
+
+MESSAGE_COLUMNS = (
+    ChatMessage.id, ChatMessage.created_at, ChatMessage.model, ChatMessage.role,
+    ChatMessage.latency_ms, ChatMessage.tokens_used, ChatMessage.first_token_at,
+    ChatMessage.extra_data,
+)
+
+# 버킷별로 count/sum/min/max + 스케치를 유지하는 측정값
+SKETCH_METRICS = ("latency", "ttft", "tps")
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def truncate_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+# ============================================================
+# Bucket Update
+# ============================================================
+
+def _observe(bucket: MessageStatsHourly, prefix: str, value: float, sketch: QuantileSketch) -> None:
+    """버킷의 {prefix}_count/sum/min/max 갱신 + 스케치에 추가"""
+    setattr(bucket, f"{prefix}_count", (getattr(bucket, f"{prefix}_count") or 0) + 1)
+    setattr(bucket, f"{prefix}_sum", (getattr(bucket, f"{prefix}_sum") or 0) + value)
+    current_min = getattr(bucket, f"{prefix}_min")
+    current_max = getattr(bucket, f"{prefix}_max")
+    setattr(bucket, f"{prefix}_min", value if current_min is None else min(current_min, value))
+    setattr(bucket, f"{prefix}_max", value if current_max is None else max(current_max, value))
+    sketch.add(value)
+
+
+def tokens_per_second(message) -> Optional[float]:
+    """
+    생성 속도 (completion tokens / 생성 시간)
+
+    생성 시간은 TTFT가 있으면 첫 토큰 이후 구간, 없으면 전체 응답 시간입니다.
+    completion_tokens가 기록되지 않은 메시지(이전 버전 데이터)는 제외합니다.
+    """
+    completion_tokens = (message.extra_data or {}).get("completion_tokens")
+    if not completion_tokens or not message.latency_ms:
+        return None
+    generation_ms = float(message.latency_ms)
+    if message.first_token_at is not None:
+        ttft_ms = (message.first_token_at - message.created_at).total_seconds() * 1000
+        if 0 <= ttft_ms < generation_ms:
+            generation_ms -= ttft_ms
+    return completion_tokens * 1000 / generation_ms
+
+
+def apply_messages(buckets: dict[tuple, MessageStatsHourly], messages: Iterable) -> None:
+    """
+    메시지(ChatMessage 컬럼 행)를 (hour, model, role) 버킷에 누적
+
+    TTFT는 DB 함수(julianday 등) 대신 여기서 계산하므로 백엔드와 무관합니다.
+    """
+    sketches: dict[tuple, dict[str, QuantileSketch]] = {}
+    for message in messages:
+        key = (truncate_hour(message.created_at), message.model or "", message.role)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = MessageStatsHourly(
+                hour=key[0], model=key[1], role=key[2],
+                message_count=0, tokens_count=0, tokens_sum=0,
+                **{f"{metric}_{field}": 0 for metric in SKETCH_METRICS for field in ("count", "sum")},
+            )
+        if key not in sketches:
+            sketches[key] = {
+                metric: QuantileSketch.from_dict(getattr(bucket, f"{metric}_sketch"))
+                for metric in SKETCH_METRICS
+            }
+
+        bucket.message_count += 1
+        if message.latency_ms is not None:
+            _observe(bucket, "latency", float(message.latency_ms), sketches[key]["latency"])
+        if message.first_token_at is not None:
+            ttft_ms = max((message.first_token_at - message.created_at).total_seconds() * 1000, 0.0)
+            _observe(bucket, "ttft", ttft_ms, sketches[key]["ttft"])
+        tps = tokens_per_second(message)
+        if tps is not None:
+            _observe(bucket, "tps", tps, sketches[key]["tps"])
+        if message.tokens_used is not None:
+            bucket.tokens_count += 1
+            bucket.tokens_sum += message.tokens_used
+
+    # JSON 컬럼은 새 객체를 대입해야 변경으로 감지됨
+    for key, bucket_sketches in sketches.items():
+        for metric, sketch in bucket_sketches.items():
+            setattr(buckets[key], f"{metric}_sketch", sketch.to_dict())
+
+
+# ============================================================
+# Rollup Job
+# ============================================================
+
+class MessageStatsRollup:
+    """
+    메시지 통계 증분 롤업 작업
+
+    한 트랜잭션에서 워터마크 이후 메시지를 id 순으로 batch_size개까지 읽어 버킷에 병합하고
+    워터마크를 전진시키므로, 실패하거나 여러 워커가 동시에 실행해도 중복 집계되지 않습니다.
+
+    PostgreSQL 시퀀스나 여러 writer에서는 먼저 발급된 id가 더 큰 id보다 늦게 커밋될 수 있습니다.
+    (write-behind 행의 created_at은 요청 시각이라 커밋 시각 기준 대기로는 막을 수 없음)
+    그래서 워터마크를 넘길 때 보이지 않은 id를 워터마크 행에 gap으로 남기고, 매 실행마다 다시 조회해
+    나타난 행을 집계합니다. 롤백/삭제로 끝내 나타나지 않는 id는 gap_timeout 후 버립니다.
+    """
+
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession] = async_session_maker,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        gap_timeout: Optional[float] = None,
+        max_gaps: Optional[int] = None,
+    ):
+        self.session_maker = session_maker
+        self.batch_size = batch_size or settings.stats_rollup_batch_size
+        self.interval = interval or settings.stats_rollup_interval
+        self.gap_timeout = settings.stats_rollup_gap_timeout if gap_timeout is None else gap_timeout
+        self.max_gaps = max_gaps or settings.stats_rollup_max_gaps
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """주기 실행 시작 (lifespan에서 호출)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.exception("stats_rollup_failed", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def run(self, now: Optional[datetime] = None) -> int:
+        """밀린 메시지를 모두 집계 (배치 반복), 집계한 메시지 수 반환"""
+        total = 0
+        while True:
+            processed, complete = await self.run_batch(now)
+            total += processed
+            if not complete:
+                return total
+
+    async def run_batch(self, now: Optional[datetime] = None) -> tuple[int, bool]:
+        """
+        메시지 한 배치 집계 (늦게 커밋된 gap 행 + 워터마크 이후 행)
+
+        Returns:
+            (집계한 메시지 수, 배치가 가득 찼는지 = 남은 메시지가 더 있을 수 있음)
+        """
+        now = now or datetime.utcnow()
+
+        async with self.session_maker() as session, session.begin():
+            watermark = await session.get(RollupWatermark, WATERMARK_NAME, with_for_update=True)
+            if watermark is None:
+                watermark = RollupWatermark(name=WATERMARK_NAME, last_id=0)
+                session.add(watermark)
+
+            # gap: {id(str): 처음 발견 시각} (JSON 컬럼)
+            gaps: dict[str, str] = dict(watermark.gaps or {})
+            late = []
+            if gaps:
+                late = (await session.execute(
+                    select(*MESSAGE_COLUMNS)
+                    .where(ChatMessage.id.in_([int(gap) for gap in gaps]))
+                    .order_by(ChatMessage.id)
+                )).all()
+                for row in late:
+                    del gaps[str(row.id)]
+
+            rows = (await session.execute(
+                select(*MESSAGE_COLUMNS)
+                .where(ChatMessage.id > watermark.last_id)
+                .order_by(ChatMessage.id)
+                .limit(self.batch_size)
+            )).all()
+            previous = watermark.last_id
+            for row in rows:
+                for missing in range(max(previous + 1, row.id - self.max_gaps), row.id):
+                    gaps[str(missing)] = now.isoformat(timespec="seconds")
+                previous = row.id
+
+            expired = (now - timedelta(seconds=self.gap_timeout)).isoformat(timespec="seconds")
+            kept = sorted((int(gap), seen) for gap, seen in gaps.items() if seen >= expired)[-self.max_gaps:]
+            gaps = {str(gap): seen for gap, seen in kept}
+            if gaps != (watermark.gaps or {}):
+                watermark.gaps = gaps or None
+
+            messages = [*late, *rows]
+            if not messages:
+                return 0, False
+
+            hours = {truncate_hour(m.created_at) for m in messages}
+            existing = (await session.execute(
+                select(MessageStatsHourly).where(MessageStatsHourly.hour.in_(hours))
+            )).scalars().all()
+            buckets = {(b.hour, b.model, b.role): b for b in existing}
+            apply_messages(buckets, messages)
+            session.add_all(b for b in buckets.values() if b.id is None)
+            if rows:
+                watermark.last_id = rows[-1].id
+
+        STATS_ROLLUP_MESSAGES_TOTAL.inc(len(messages))
+        STATS_ROLLUP_LAG_SECONDS.set(max((datetime.utcnow() - messages[-1].created_at).total_seconds(), 0))
+        logger.debug(
+            "stats_rolled_up",
+            messages=len(messages), late=len(late), gaps=len(gaps), buckets=len(hours), last_id=watermark.last_id,
+        )
+        return len(messages), len(rows) == self.batch_size
+
+
+# ============================================================
+# Dashboard Queries
+# ============================================================
+
+def rollup_query(start: date, end: date):
+    """기간(양 끝 포함)의 버킷 행 조회 쿼리"""
+    return (
+        select(MessageStatsHourly)
+        .where(
+            MessageStatsHourly.hour >= datetime.combine(start, datetime.min.time()),
+            MessageStatsHourly.hour < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        )
+    )
+
+
+def _average(total: float, count: int) -> Optional[float]:
+    return total / count if count else None
+
+
+def _percentiles(buckets: list[MessageStatsHourly], metric: str) -> dict[str, Optional[float]]:
+    """버킷 스케치를 병합한 p50/p90/p99"""
+    merged = QuantileSketch()
+    for bucket in buckets:
+        sketch = getattr(bucket, f"{metric}_sketch")
+        if sketch:
+            merged.merge(QuantileSketch.from_dict(sketch))
+    return {name: merged.quantile(q) for name, q in PERCENTILES.items()}
+
+
+def _summary(buckets: list[MessageStatsHourly]) -> dict:
+    summary = {
+        "count": sum(b.message_count for b in buckets),
+        "avg_tokens": _average(sum(b.tokens_sum for b in buckets), sum(b.tokens_count for b in buckets)),
+        "total_tokens": sum(b.tokens_sum for b in buckets),
+    }
+    for metric in SKETCH_METRICS:
+        summary[f"avg_{metric}"] = _average(
+            sum(getattr(b, f"{metric}_sum") for b in buckets),
+            sum(getattr(b, f"{metric}_count") for b in buckets),
+        )
+        summary[metric] = _percentiles(buckets, metric)
+    return summary
+
+
+def summarize_rollup(buckets: list[MessageStatsHourly], daily_limit: int = 14) -> dict:
+    """버킷 행 → 대시보드 요약 (전체 / 역할별 / 모델별 / 최근 일별)"""
+    by_role: dict[str, list] = defaultdict(list)
+    by_model: dict[str, list] = defaultdict(list)
+    by_day: dict[date, list] = defaultdict(list)
+    for bucket in buckets:
+        by_role[bucket.role].append(bucket)
+        if bucket.model:
+            by_model[bucket.model].append(bucket)
+        by_day[bucket.hour.date()].append(bucket)
+
+    return {
+        "overall": _summary(buckets),
+        "role_stats": [{"role": role, **_summary(rows)} for role, rows in sorted(by_role.items())],
+        "model_stats": [{"model": model, **_summary(rows)} for model, rows in sorted(by_model.items())],
+        "daily_stats": [
+            {"date": day, **_summary(by_day[day])}
+            for day in sorted(by_day, reverse=True)[:daily_limit]
+        ],
+    }
+
+
+# 전역 롤업 작업
+message_stats_rollup = MessageStatsRollup()
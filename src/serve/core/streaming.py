@@ -0,0 +1,215 @@
+"""
+Streaming Tap
+
+SSE 바이트 스트림을 그대로 중계하면서 TTFT, 토큰 수, 응답 본문을 수집
+"""
+
+import json
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.serve.core.metrics import (
+    LLM_INTER_TOKEN_LATENCY_SECONDS,
+    record_llm_request,
+    record_llm_ttft,
+)
+from src.serve.core.serialization import loads
+from src.serve.core.usage import ANONYMOUS_USER, NO_CONFIG, record_usage
+
+EVENT_BOUNDARY = b"\n\n"
+DONE_EVENT = b"data: [DONE]\n\n"
+
+# 내용이 있는 delta (빈 문자열 제외) / 응답 모델 이름
+CONTENT_PATTERN = re.compile(rb'"content":\s*"(?!")')
+MODEL_PATTERN = re.compile(rb'"model":\s*"([^"]+)"')
+
+# finish() 일괄 파싱용 (content JSON 문자열 리터럴 / finish_reason)
+CONTENT_VALUE_PATTERN = re.compile(r'"content":\s*("(?:[^"\\]|\\.)*")')
+FINISH_REASON_PATTERN = re.compile(r'"finish_reason":\s*"([^"]+)"')
+
+
+class StreamTap:
+    """
+    vLLM SSE 바이트 스트림 관찰자 (passthrough)
+
+    upstream 바이트 청크를 그대로 feed()에 넘기면 완성된 SSE 이벤트 경계(\\n\\n)까지를
+    재조립 없이 돌려주고, 이벤트별 JSON 파싱 없이 첫 토큰 시각과 토큰 간 지연만 기록합니다.
+    본문/usage/finish_reason은 finish()에서 버퍼를 한 번만 파싱해 복원합니다.
+    upstream의 [DONE] 이벤트는 게이트웨이가 추가 이벤트를 보낸 뒤 직접 보내도록 걸러냅니다.
+
+    Usage:
+        tap = StreamTap(model="llama3")
+        async for chunk in llm.chat_completion_stream(...):
+            data = tap.feed(chunk)
+            if data:
+                yield data
+        yield tap.flush()
+        tap.finish()
+    """
+
+    def __init__(
+        self,
+        model: str,
+        record_metrics: bool = True,
+        llm_config: str = NO_CONFIG,
+        user: str = ANONYMOUS_USER,
+    ):
+        self.model = model
+        self.record_metrics = record_metrics
+        self.llm_config = llm_config  # 토큰 사용량 라벨
+        self.user = user
+        self.started_at = datetime.utcnow()
+        self.first_token_at: Optional[datetime] = None
+        self.completion_tokens = 0
+        self.usage: dict = {}
+        self.finish_reason: Optional[str] = None
+        self.error: Optional[str] = None
+        self._parts: list[str] = []
+        self._events: list[bytes] = []  # 전달한 이벤트 블록 (finish()에서 파싱)
+        self._tail = b""  # 아직 경계가 오지 않은 이벤트 조각
+        self._start = time.perf_counter()
+        self._last_token: Optional[float] = None
+        self._itl = None
+
+    @property
+    def content(self) -> str:
+        """응답 본문 (finish() 이후)"""
+        return "".join(self._parts)
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """TTFT (초)"""
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started_at).total_seconds()
+
+    @property
+    def total_tokens(self) -> int:
+        """usage 청크가 있으면 그 값을, 없으면 중계한 토큰 수를 사용"""
+        return self.usage.get("total_tokens") or self.completion_tokens
+
+    @property
+    def output_tokens(self) -> int:
+        """생성 토큰 수 (usage 청크가 있으면 그 값을, 없으면 중계한 토큰 수를 사용)"""
+        return self.usage.get("completion_tokens") or self.completion_tokens
+
+    def feed(self, chunk: bytes) -> bytes:
+        """
+        upstream 바이트 청크 처리
+
+        Returns:
+            클라이언트로 보낼 완성된 이벤트 블록 (경계 전 조각은 다음 청크와 합쳐 전달)
+        """
+        if self._tail:
+            chunk = self._tail + chunk
+        boundary = chunk.rfind(EVENT_BOUNDARY)
+        if boundary < 0:
+            self._tail = chunk
+            return b""
+        end = boundary + len(EVENT_BOUNDARY)
+        block, self._tail = chunk[:end], chunk[end:]
+
+        if block.endswith(DONE_EVENT):
+            block = block[:-len(DONE_EVENT)]
+        if not block:
+            return b""
+
+        tokens = len(CONTENT_PATTERN.findall(block))
+        if tokens:
+            self._on_tokens(time.perf_counter(), tokens, block)
+        self._events.append(block)
+        return block
+
+    def flush(self) -> bytes:
+        """스트림 종료 시 경계 없이 남은 조각을 이벤트로 마감해 반환"""
+        tail, self._tail = self._tail, b""
+        if not tail.strip():
+            return b""
+        return self.feed(tail.rstrip(b"\n") + EVENT_BOUNDARY)
+
+    def _on_tokens(self, now: float, count: int, block: bytes) -> None:
+        """토큰 이벤트 수신 시 TTFT / 토큰 간 지연 기록"""
+        self.completion_tokens += count
+        if self._last_token is None:
+            match = MODEL_PATTERN.search(block)
+            if match:
+                self.model = match.group(1).decode("utf-8", "replace")
+            ttft = now - self._start
+            self.first_token_at = self.started_at + timedelta(seconds=ttft)
+            if self.record_metrics:
+                record_llm_ttft(self.model, ttft)
+                self._itl = LLM_INTER_TOKEN_LATENCY_SECONDS.labels(model=self.model)
+            count -= 1
+        if self._itl is not None:
+            if self._last_token is not None:
+                self._itl.observe(now - self._last_token)
+                count -= 1
+            for _ in range(count):
+                self._itl.observe(0.0)  # 같은 청크로 함께 도착한 토큰
+        self._last_token = now
+
+    def _parse(self) -> None:
+        """
+        버퍼에 모인 이벤트를 한 번에 파싱해 본문/usage/finish_reason 복원
+
+        이벤트마다 디코딩하지 않고 content 문자열만 모아 JSON 배열 하나로 디코딩하며,
+        usage/에러 이벤트만 개별 파싱합니다.
+        """
+        text = b"".join(self._events).decode("utf-8", "replace")
+        self._events.clear()
+
+        contents = CONTENT_VALUE_PATTERN.findall(text)
+        if contents:
+            self._parts = loads("[" + ",".join(contents) + "]")
+        reasons = FINISH_REASON_PATTERN.findall(text)
+        if reasons:
+            self.finish_reason = reasons[-1]
+
+        for line in text.split("\n"):
+            if not line.startswith("data:") or ('"usage"' not in line and '"error"' not in line):
+                continue
+            try:
+                data = loads(line[5:])
+            except ValueError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            if "error" in data:
+                self.error = str(data["error"])
+            elif data.get("usage"):
+                self.usage = data["usage"]
+
+    def finish(self) -> int:
+        """스트림 종료 처리 - 버퍼 파싱, LLM 요청 메트릭 기록 후 전체 지연(ms) 반환"""
+        duration = time.perf_counter() - self._start
+        self._parse()
+        if not self.record_metrics:
+            return int(duration * 1000)
+        record_llm_request(
+            model=self.model,
+            duration=duration,
+            tokens=self.total_tokens if self.error is None else 0,
+            success=self.error is None,
+        )
+        if self.error is None:
+            record_usage(
+                self.model,
+                self.llm_config,
+                self.user,
+                prompt_tokens=self.usage.get("prompt_tokens", 0),
+                completion_tokens=self.output_tokens,
+                generation_seconds=duration - (self.ttft or 0.0),  # 첫 토큰 이후 (decode)
+            )
+        return int(duration * 1000)
+
+
+def sse_data(payload: str) -> bytes:
+    """SSE data 이벤트 1개 직렬화"""
+    return b"data: " + payload.encode("utf-8") + EVENT_BOUNDARY
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """이름 있는 SSE 이벤트 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
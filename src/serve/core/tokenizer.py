@@ -0,0 +1,72 @@
+"""
+Tokenizer
+
+컨텍스트 윈도우 계산용 토큰 카운터
+- 토크나이저는 lifespan에서 워커 스레드로 로딩 (요청 처리 중에는 로딩하지 않음)
+"""
+
+import asyncio
+from functools import lru_cache
+from typing import Optional
+
+from src.serve.core.config import settings
+from src.serve.core.logging import get_logger
+
+try:
+    from transformers import AutoTokenizer
+except ImportError:  # transformers 미설치 시 근사치 사용
+    AutoTokenizer = None
+
+logger = get_logger(__name__)
+
+# 채팅 템플릿이 메시지마다 추가하는 역할 토큰/구분자 근사치
+MESSAGE_OVERHEAD_TOKENS = 4
+# 어시스턴트 응답 시작 토큰 근사치
+REPLY_PRIMING_TOKENS = 2
+
+# load_tokenizer()로 로딩한 토크나이저 (없으면 근사치 사용)
+_tokenizer = None
+
+
+@lru_cache(maxsize=4)
+def get_tokenizer(name: Optional[str] = None):
+    """
+    HuggingFace 토크나이저 로딩 (캐시)
+
+    name이 없으면 settings.tokenizer_name을 사용하고,
+    설정되지 않았거나 로딩에 실패하면 None을 반환합니다.
+    """
+    name = name or settings.tokenizer_name
+    if not name or AutoTokenizer is None:
+        return None
+    try:
+        return AutoTokenizer.from_pretrained(name, token=settings.huggingface_token)
+    except Exception as e:
+        logger.warning("tokenizer_load_failed", tokenizer=name, error=str(e))
+        return None
+
+
+async def load_tokenizer(name: Optional[str] = None):
+    """
+    토크나이저를 워커 스레드에서 로딩해 count_tokens()에 등록 (lifespan에서 호출)
+
+    from_pretrained는 파일/네트워크 I/O로 수 초가 걸리므로 이벤트 루프에서 실행하지 않습니다.
+    """
+    global _tokenizer
+    _tokenizer = await asyncio.to_thread(get_tokenizer, name)
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수 (로딩된 토크나이저가 없으면 UTF-8 4바이트당 1토큰으로 근사)"""
+    if _tokenizer is not None:
+        return len(_tokenizer.encode(text, add_special_tokens=False))
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def count_message_tokens(messages: list[dict]) -> int:
+    """채팅 메시지 리스트의 프롬프트 토큰 수"""
+    return sum(
+        count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    ) + REPLY_PRIMING_TOKENS
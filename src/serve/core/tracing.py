@@ -0,0 +1,447 @@
+"""
+Request Tracing
+
+요청 단위 구간(span) 계측 - 인증 / DB / upstream 대기 / prefill / decode / 저장 / 커밋
+- TracingMiddleware가 요청마다 루트 span을 만들고, 계측 지점은 span()으로 하위 구간을 기록
+- 응답 헤더 Server-Timing (응답 시작 전까지 끝난 구간의 이름별 합계) + request_completed 로그의 spans 필드
+- OpenTelemetry 호환 OTLP/JSON으로 내보내기: JSONL 파일 또는 로컬 collector (OTLP/HTTP)
+- 요청 밖(백그라운드 워커 등)에서는 span()이 아무것도 기록하지 않음
+- 요청보다 오래 살 수 있는 태스크는 create_detached_task로 만들어 끝난 트레이스에 span이 붙지 않게 함
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import Context, ContextVar
+from pathlib import Path
+from typing import Coroutine, Iterator, Optional
+
+import httpx
+import structlog
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.serve.core.asgi import route_template
+from src.serve.core.config import settings
+from src.serve.core.metrics import TRACES_EXPORTED_TOTAL
+
+# core.logging이 이 모듈을 import하므로 structlog를 직접 사용
+logger = structlog.get_logger(__name__)
+
+# OTLP SpanKind / StatusCode
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_ERROR = 2
+
+# 트레이스당 보관하는 span 수 상한 (쿼리가 많은 요청의 메모리 제한)
+MAX_SPANS_PER_TRACE = 512
+
+EXPORTERS = ("", "jsonl", "otlp")
+
+# 현재 활성 span (하위 span의 부모)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+# ============================================================
+# Span / Trace
+# ============================================================
+
+class Span:
+    """시간 구간 하나 (시작 시각은 epoch ns, 길이는 monotonic 시계로 측정)"""
+
+    __slots__ = (
+        "trace", "name", "span_id", "parent_id", "kind", "attributes",
+        "start_ns", "end_ns", "error", "_started",
+    )
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict] = None,
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        """소요 시간 (끝나지 않았으면 현재까지)"""
+        end = self.end_ns if self.end_ns is not None else self.start_ns + time.perf_counter_ns() - self._started
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """구간 종료 후 트레이스에 추가 (두 번째 호출부터는 무시)"""
+        if self.end_ns is not None:
+            return
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.add(self)
+
+    def to_otlp(self) -> dict:
+        """OTLP/JSON Span"""
+        data = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        if self.error:
+            data["status"] = {"code": STATUS_CODE_ERROR, "message": self.error}
+        return data
+
+
+class Trace:
+    """요청 하나의 span 모음"""
+
+    __slots__ = ("trace_id", "remote_parent_id", "root", "spans", "dropped_spans")
+
+    def __init__(self, trace_id: Optional[str] = None, remote_parent_id: Optional[str] = None):
+        self.trace_id = trace_id or _new_id(128)
+        self.remote_parent_id = remote_parent_id  # traceparent 헤더로 전달된 호출자 span
+        self.root: Optional[Span] = None
+        self.spans: list[Span] = []
+        self.dropped_spans = 0
+
+    @classmethod
+    def from_traceparent(cls, header: Optional[str]) -> "Trace":
+        """W3C traceparent (00-<trace_id>-<parent_id>-<flags>)가 유효하면 호출자 트레이스에 이어서 기록"""
+        parts = (header or "").strip().split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+            try:
+                if int(parts[1], 16) and int(parts[2], 16):
+                    return cls(parts[1].lower(), parts[2].lower())
+            except ValueError:
+                pass
+        return cls()
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def breakdown(self) -> dict[str, float]:
+        """끝난 하위 span의 이름별 소요 시간 합계 (ms, 먼저 끝난 순서)"""
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            if span is not self.root:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return {name: round(ms, 2) for name, ms in totals.items()}
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (이름별 합계 + 현재까지의 total)"""
+        metrics = [f"{name};dur={ms}" for name, ms in self.breakdown().items()]
+        if self.root is not None:
+            metrics.append(f"total;dur={self.root.duration_ms:.2f}")
+        return ", ".join(metrics)
+
+
+def current_trace() -> Optional[Trace]:
+    """현재 요청의 트레이스 (요청 밖이면 None)"""
+    span = _current_span.get()
+    return span.trace if span is not None else None
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Optional[Span]:
+    """
+    현재 span의 하위 span 시작 (활성 span으로 바꾸지 않음, 요청 밖이면 None)
+
+    async generator처럼 yield를 사이에 두고 끝나는 구간은 span() 대신 이 함수와 Span.end()를 사용합니다.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Iterator[Optional[Span]]:
+    """
+    구간 기록 컨텍스트 매니저 (블록 안에서 시작한 span은 이 span의 하위)
+
+    Usage:
+        with span("db.commit"):
+            await session.commit()
+    """
+    current = start_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def create_detached_task(coro: Coroutine) -> asyncio.Task:
+    """
+    요청 컨텍스트를 복사하지 않는 태스크 생성
+
+    asyncio.create_task는 호출 시점의 contextvars를 복사하므로, 요청 중에 만든 배치 실행/
+    병합 leader/클라이언트 종료 태스크가 응답 후에도 이미 내보낸 요청 트레이스에 span을 붙입니다.
+    빈 Context에서 만들면 이런 태스크는 요청 밖 작업으로 취급됩니다 (request_id 로그 바인딩도 없음).
+    """
+    return Context().run(asyncio.create_task, coro)
+
+
+# ============================================================
+# SQLAlchemy Instrumentation
+# ============================================================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query = start_span(
+        "db.query",
+        SPAN_KIND_CLIENT,
+        **{"db.system": conn.dialect.name, "db.operation": statement.split(None, 1)[0].upper()},
+    )
+    if query is not None and context is not None:
+        context._trace_span = query
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query = getattr(context, "_trace_span", None)
+    if query is not None:
+        query.end()
+
+
+def _handle_error(exception_context):
+    query = getattr(exception_context.execution_context, "_trace_span", None)
+    if query is not None:
+        query.end(exception_context.original_exception)
+
+
+def trace_engine(engine) -> None:
+    """
+    SQL 실행마다 db.query span 기록 (AsyncEngine은 .sync_engine 전달)
+
+    AsyncSession의 동기 실행 구간도 호출한 태스크의 contextvars를 공유하므로 요청 트레이스에 붙습니다.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# ============================================================
+# OTLP Export
+# ============================================================
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def otlp_payload(traces: list[Trace]) -> dict:
+    """OTLP/HTTP JSON 요청 본문 (ExportTraceServiceRequest)"""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": _otlp_attributes({
+                    "service.name": settings.app_name,
+                    "service.version": settings.app_version,
+                }),
+            },
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span.to_otlp() for trace in traces for span in trace.spans],
+            }],
+        }],
+    }
+
+
+class TraceExporter:
+    """
+    완료된 트레이스 배치 내보내기
+
+    요청 경로는 큐에 넣기만 하고, 백그라운드 태스크가 interval마다 batch_size개씩 OTLP/JSON으로
+    JSONL 파일에 추가하거나 collector(OTLP/HTTP)로 전송합니다.
+    큐가 가득 차거나 전송에 실패한 트레이스는 버리고 traces_exported_total 메트릭에 기록합니다.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        path: Optional[str] = None,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+    ):
+        self.exporter = settings.tracing_exporter if exporter is None else exporter
+        if self.exporter not in EXPORTERS:
+            raise ValueError(f"Unknown trace exporter: {self.exporter}")
+        self.endpoint = endpoint or settings.tracing_otlp_endpoint
+        self.path = Path(path or settings.tracing_jsonl_path)
+        self.max_queue = max_queue or settings.tracing_export_queue_size
+        self.batch_size = batch_size or settings.tracing_export_batch_size
+        self.interval = interval or settings.tracing_export_interval
+        self._queue: deque[Trace] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """내보내기 태스크 시작 (lifespan에서 호출, exporter 미설정 시 무시)"""
+        if self.exporter and not self.running:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        """남은 트레이스를 내보내고 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def export(self, trace: Trace) -> None:
+        """완료된 트레이스를 큐에 추가 (대기하지 않음)"""
+        if not self.running:
+            return
+        if len(self._queue) >= self.max_queue:
+            TRACES_EXPORTED_TOTAL.labels(status="dropped").inc()
+            return
+        self._queue.append(trace)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """큐의 트레이스를 batch_size개씩 내보내기"""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                await self._send(otlp_payload(batch))
+            except Exception as e:
+                TRACES_EXPORTED_TOTAL.labels(status="failed").inc(len(batch))
+                logger.warning("trace_export_failed", exporter=self.exporter, traces=len(batch), error=str(e))
+            else:
+                TRACES_EXPORTED_TOTAL.labels(status="exported").inc(len(batch))
+
+    async def _send(self, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        if self.exporter == "jsonl":
+            await asyncio.to_thread(self._append, body)
+            return
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(5.0))
+        response = await self._client.post(
+            self.endpoint, content=body, headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+
+    def _append(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# 전역 트레이스 내보내기
+trace_exporter = TraceExporter()
+
+
+# ============================================================
+# Tracing Middleware
+# ============================================================
+
+class TracingMiddleware:
+    """
+    요청 트레이스 순수 ASGI 미들웨어
+
+    RequestLoggingMiddleware보다 바깥에 두어 request_completed 로그가 같은 트레이스를 읽게 합니다.
+    Server-Timing 헤더는 응답 시작 시점까지 끝난 구간만 포함하므로, 스트리밍 응답의
+    llm.prefill/llm.decode 등 본문 전송 중 구간은 로그와 내보낸 트레이스에서만 볼 수 있습니다.
+    """
+
+    def __init__(self, app: ASGIApp, exporter: Optional[TraceExporter] = None):
+        self.app = app
+        self.exporter = exporter or trace_exporter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        trace = Trace.from_traceparent(Headers(scope=scope).get("traceparent"))
+        root = trace.root = Span(trace, method, trace.remote_parent_id, SPAN_KIND_SERVER)
+        token = _current_span.set(root)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.tracing_server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        error: Optional[BaseException] = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            route = route_template(scope, root_path)
+            root.name = f"{method} {route}"
+            root.set(**{
+                "http.request.method": method,
+                "http.route": route,
+                "http.response.status_code": status_code,
+            })
+            if error is None and status_code >= 500:
+                root.error = f"HTTP {status_code}"
+            root.end(error)
+            self.exporter.export(trace)
@@ -0,0 +1,177 @@
+"""
+Token Usage
+
+모델 × 프리셋(llm_config) × 사용자별 토큰 사용량 집계
+- Prometheus: prompt/completion 토큰 카운터 + 생성 속도(tokens/sec) 히스토그램
+- /metrics/usage: 최근 N분 분 단위 롤링 집계 (용량 계획용 JSON)
+- 사용자 라벨은 API 키(없으면 클라이언트 IP)의 키 해시이며, 서로 다른 라벨 수를
+  usage_max_users로 제한하고 초과분은 "other"로 합산 (카디널리티 상한)
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.serve.core.config import settings
+from src.serve.core.metrics import (
+    LLM_COMPLETION_TOKENS_TOTAL,
+    LLM_PROMPT_TOKENS_TOTAL,
+    LLM_TOKENS_PER_SECOND,
+)
+
+NO_CONFIG = "none"
+ANONYMOUS_USER = "anonymous"
+OTHER_USERS = "other"
+
+
+# ============================================================
+# User Labels
+# ============================================================
+
+class UserLabeler:
+    """
+    사용자 식별자 → 메트릭 라벨
+
+    원본 키가 메트릭에 노출되지 않도록 salt를 키로 한 BLAKE2b 해시(12자리)를 쓰고,
+    먼저 관측된 max_users개 라벨만 유지합니다 (프로세스 수명 동안 고정).
+    """
+
+    def __init__(self, max_users: Optional[int] = None, salt: Optional[str] = None):
+        self.max_users = settings.usage_max_users if max_users is None else max_users
+        self._salt = (salt if salt is not None else settings.usage_user_salt).encode()[:64]
+        self._labels: set[str] = set()
+
+    def label(self, key: Optional[str]) -> str:
+        if not key:
+            return ANONYMOUS_USER
+        label = hashlib.blake2b(key.encode(), key=self._salt, digest_size=6).hexdigest()
+        if label in self._labels:
+            return label
+        if len(self._labels) >= self.max_users:
+            return OTHER_USERS
+        self._labels.add(label)
+        return label
+
+
+# ============================================================
+# Rolling Window
+# ============================================================
+
+@dataclass
+class UsageCounts:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    generation_seconds: float = 0.0
+
+    def add(self, other: "UsageCounts") -> None:
+        self.requests += other.requests
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.generation_seconds += other.generation_seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            # 요청별 생성 시간 합 기준 평균 생성 속도 (동시 요청의 합산 처리량 아님)
+            "tokens_per_second": (
+                round(self.completion_tokens / self.generation_seconds, 2) if self.generation_seconds else None
+            ),
+        }
+
+
+class UsageWindow:
+    """
+    분 단위 사용량 링 버퍼
+
+    분(epoch // 60)마다 (model, llm_config, user) 키별 카운트를 두고,
+    기록할 때 window_minutes보다 오래된 분을 버립니다.
+    """
+
+    GROUPS = ("model", "llm_config", "user")
+
+    def __init__(self, window_minutes: Optional[int] = None):
+        self.window_minutes = window_minutes or settings.usage_window_minutes
+        self._minutes: dict[int, dict[tuple[str, str, str], UsageCounts]] = {}
+
+    def record(self, key: tuple[str, str, str], counts: UsageCounts, now: Optional[float] = None) -> None:
+        minute = int((time.time() if now is None else now) // 60)
+        bucket = self._minutes.get(minute)
+        if bucket is None:
+            bucket = self._minutes[minute] = {}
+            for old in [m for m in self._minutes if m <= minute - self.window_minutes]:
+                del self._minutes[old]
+        bucket.setdefault(key, UsageCounts()).add(counts)
+
+    def snapshot(self, minutes: Optional[int] = None, now: Optional[float] = None) -> dict:
+        """
+        최근 minutes분 집계
+
+        Returns:
+            분별 합계(사용량이 없는 분 포함, 오래된 순) + 모델/프리셋/사용자별 합계(총 토큰 내림차순)
+        """
+        minutes = min(minutes or self.window_minutes, self.window_minutes)
+        current = int((time.time() if now is None else now) // 60)
+        timeline = []
+        groups: list[dict[str, UsageCounts]] = [{} for _ in self.GROUPS]
+        for minute in range(current - minutes + 1, current + 1):
+            total = UsageCounts()
+            for key, counts in self._minutes.get(minute, {}).items():
+                total.add(counts)
+                for index, value in enumerate(key):
+                    groups[index].setdefault(value, UsageCounts()).add(counts)
+            timeline.append({
+                "minute": datetime.fromtimestamp(minute * 60, timezone.utc).isoformat(),
+                **total.to_dict(),
+            })
+
+        def ranked(group: str, totals: dict[str, UsageCounts]) -> list[dict]:
+            rows = [{group: value, **counts.to_dict()} for value, counts in totals.items()]
+            return sorted(rows, key=lambda row: row["total_tokens"], reverse=True)
+
+        return {
+            "window_minutes": minutes,
+            "minutes": timeline,
+            **{f"by_{group}": ranked(group, totals) for group, totals in zip(self.GROUPS, groups)},
+        }
+
+
+# ============================================================
+# Recording
+# ============================================================
+
+# 전역 사용자 라벨 / 롤링 집계
+user_labeler = UserLabeler()
+usage_window = UsageWindow()
+
+
+def record_usage(
+    model: str,
+    llm_config: str,
+    user: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    generation_seconds: float,
+) -> None:
+    """
+    upstream 응답 한 건의 토큰 사용량 기록 (캐시 히트는 GPU를 쓰지 않으므로 호출하지 않음)
+
+    Args:
+        user: user_labeler.label()로 만든 라벨
+        generation_seconds: 생성 시간 (스트리밍은 첫 토큰 이후, 그 외는 전체 응답 시간)
+    """
+    LLM_PROMPT_TOKENS_TOTAL.labels(model=model, llm_config=llm_config, user=user).inc(prompt_tokens)
+    LLM_COMPLETION_TOKENS_TOTAL.labels(model=model, llm_config=llm_config, user=user).inc(completion_tokens)
+    if completion_tokens and generation_seconds > 0:
+        LLM_TOKENS_PER_SECOND.labels(model=model, llm_config=llm_config, user=user).observe(
+            completion_tokens / generation_seconds
+        )
+    usage_window.record(
+        (model, llm_config, user),
+        UsageCounts(1, prompt_tokens, completion_tokens, generation_seconds),
+    )
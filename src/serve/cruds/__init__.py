@@ -10,7 +10,10 @@ from src.serve.cruds.chat import (
     get_conversations,
     delete_conversation,
     create_message,
+    create_messages,
+    message_row,
     get_messages,
+    get_recent_messages,
     create_llm_config,
     get_llm_config,
     get_llm_configs,
@@ -31,7 +34,10 @@ __all__ = [
     "get_conversations",
     "delete_conversation",
     "create_message",
+    "create_messages",
+    "message_row",
     "get_messages",
+    "get_recent_messages",
     "create_llm_config",
     "get_llm_config",
     "get_llm_configs",
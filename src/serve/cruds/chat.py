@@ -4,12 +4,17 @@ Chat CRUD Operations
 대화 관련 데이터베이스 CRUD 함수
 """
 
+from datetime import datetime
 from typing import Optional, Sequence
 
-from sqlalchemy import select, desc
+from sqlalchemy import event, insert, or_, select, desc, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.serve.core.archive import load_archived_messages, schedule_purge
+from src.serve.core.pagination import Cursor
+from src.serve.core.preset_cache import preset_cache
+from src.serve.core.tracing import span
 from src.serve.models.chat import Conversation, ChatMessage, LLMConfig
 
 
@@ -40,14 +45,31 @@ async def get_conversation(
     conversation_id: int,
     include_messages: bool = False,
 ) -> Optional[Conversation]:
-    """대화 세션 조회"""
+    """
+    대화 세션 조회
+    
+    아카이브된 대화를 include_messages로 조회하면 아카이브 파일의 메시지를 복원해 채운
+    세션 분리(detached) 객체를 반환합니다 (복원한 메시지가 다시 INSERT되지 않도록).
+    """
     query = select(Conversation).where(Conversation.id == conversation_id)
     
     if include_messages:
         query = query.options(selectinload(Conversation.messages))
     
     result = await db.execute(query)
-    return result.scalar_one_or_none()
+    conversation = result.scalar_one_or_none()
+    
+    if include_messages and conversation and conversation.archive_path:
+        archived = await load_archived_messages(conversation.archive_path, conversation.id)
+        hot = list(conversation.messages)
+        db.expunge(conversation)
+        conversation.messages = _merge_messages(archived, hot)
+    return conversation
+
+
+def _merge_messages(archived: list[ChatMessage], hot: Sequence[ChatMessage]) -> list[ChatMessage]:
+    """아카이브 메시지 + 아카이브 이후 추가된 메시지 (created_at, id 순)"""
+    return sorted([*archived, *hot], key=lambda m: (m.created_at, m.id))
 
 
 async def get_conversations(
@@ -55,15 +77,32 @@ async def get_conversations(
     skip: int = 0,
     limit: int = 20,
     session_id: Optional[str] = None,
+    user_id: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
 ) -> Sequence[Conversation]:
-    """대화 세션 목록 조회"""
-    query = select(Conversation).order_by(desc(Conversation.updated_at))
+    """
+    대화 세션 목록 조회 (updated_at 최신순)
+    
+    cursor(마지막 행의 updated_at, id)가 있으면 OFFSET 대신 그 이후 행부터 조회합니다.
+    """
+    query = select(Conversation).order_by(desc(Conversation.updated_at), desc(Conversation.id))
     
     if session_id:
         query = query.where(Conversation.session_id == session_id)
+    if user_id is not None:
+        query = query.where(Conversation.user_id == user_id)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
+    if cursor:
+        updated_at, conversation_id = cursor
+        # 첫 조건은 인덱스 범위 스캔용, 둘째 조건은 같은 시각 내 id 순서
+        query = query.where(
+            Conversation.updated_at <= updated_at,
+            or_(Conversation.updated_at < updated_at, Conversation.id < conversation_id),
+        )
+    else:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.limit(limit))
     return result.scalars().all()
 
 
@@ -71,9 +110,19 @@ async def delete_conversation(
     db: AsyncSession,
     conversation_id: int,
 ) -> bool:
-    """대화 세션 삭제"""
+    """대화 세션 삭제 (아카이브된 메시지는 커밋 후 아카이브 파일에서도 제거)"""
     conversation = await get_conversation(db, conversation_id)
     if conversation:
+        # 행을 잠근 뒤(쓰기 시작) 현재 아카이브 경로를 다시 읽음 - 아카이버가 방금 새 파일로 옮겼으면 그 파일을 정리
+        archive_path = (await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(archive_path=Conversation.archive_path)
+            .returning(Conversation.archive_path)
+            .execution_options(synchronize_session=False)
+        )).scalar_one_or_none()
+        if archive_path:
+            schedule_purge(db, archive_path, conversation_id)
         await db.delete(conversation)
         return True
     return False
@@ -103,35 +152,130 @@ async def create_message(
         latency_ms=latency_ms,
         extra_data=extra_data,
     )
-    db.add(message)
-    await db.flush()
-    await db.refresh(message)
-    
-    # 대화 updated_at 갱신
-    conversation = await get_conversation(db, conversation_id)
-    if conversation:
-        from datetime import datetime
-        conversation.updated_at = datetime.utcnow()
+    with span("db.insert", **{"db.rows": 1}):
+        db.add(message)
+        await db.flush()
+        await db.refresh(message)
+        
+        # 대화 updated_at 갱신 (대화 재조회 없이 단일 UPDATE)
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=datetime.utcnow())
+        )
     
     return message
 
 
+async def create_messages(
+    db: AsyncSession,
+    rows: list[dict],
+) -> None:
+    """
+    메시지 일괄 저장 (write-behind 큐 배치용)
+    
+    모든 행을 하나의 executemany INSERT로 저장하고, 관련 대화의 updated_at은
+    UPDATE 한 번으로 갱신합니다. 행은 같은 키 집합을 가져야 합니다.
+    """
+    if not rows:
+        return
+    with span("db.insert", **{"db.rows": len(rows)}):
+        await db.execute(insert(ChatMessage), rows)
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id.in_({row["conversation_id"] for row in rows}))
+            .values(updated_at=datetime.utcnow())
+        )
+
+
+def message_row(
+    conversation_id: int,
+    role: str,
+    content: str,
+    model: Optional[str] = None,
+    tokens_used: Optional[int] = None,
+    latency_ms: Optional[int] = None,
+    extra_data: Optional[dict] = None,
+    created_at: Optional[datetime] = None,
+    first_token_at: Optional[datetime] = None,
+) -> dict:
+    """create_messages용 메시지 행 (executemany를 위해 항상 같은 키 집합)"""
+    return {
+        "conversation_id": conversation_id,
+        "role": role,
+        "content": content,
+        "model": model,
+        "tokens_used": tokens_used,
+        "latency_ms": latency_ms,
+        "extra_data": extra_data,
+        "created_at": created_at or datetime.utcnow(),
+        "first_token_at": first_token_at,
+    }
+
+
 async def get_messages(
     db: AsyncSession,
     conversation_id: int,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[Cursor] = None,
+    archive_path: Optional[str] = None,
 ) -> Sequence[ChatMessage]:
-    """대화의 메시지 목록 조회"""
+    """
+    대화의 메시지 목록 조회 (오래된 순)
+    
+    cursor(마지막 행의 created_at, id)가 있으면 OFFSET 대신 그 이후 행부터 조회합니다.
+    archive_path가 있으면 아카이브 메시지와 합쳐 메모리에서 페이지를 자릅니다.
+    """
     query = (
         select(ChatMessage)
         .where(ChatMessage.conversation_id == conversation_id)
-        .order_by(ChatMessage.created_at)
-        .offset(skip)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+    )
+    
+    if archive_path:
+        hot = (await db.execute(query)).scalars().all()
+        messages = _merge_messages(await load_archived_messages(archive_path, conversation_id), hot)
+        if cursor:
+            messages = [m for m in messages if (m.created_at, m.id) > cursor]
+        else:
+            messages = messages[skip:]
+        return messages[:limit]
+    
+    if cursor:
+        created_at, message_id = cursor
+        # 첫 조건은 인덱스 범위 스캔용, 둘째 조건은 같은 시각 내 id 순서
+        query = query.where(
+            ChatMessage.created_at >= created_at,
+            or_(ChatMessage.created_at > created_at, ChatMessage.id > message_id),
+        )
+    else:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+
+async def get_recent_messages(
+    db: AsyncSession,
+    conversation_id: int,
+    limit: int = 100,
+    archive_path: Optional[str] = None,
+) -> Sequence[ChatMessage]:
+    """대화의 최근 메시지 limit개 조회 (오래된 순 정렬, 부족하면 아카이브에서 보충)"""
+    query = (
+        select(ChatMessage)
+        .where(ChatMessage.conversation_id == conversation_id)
+        .order_by(desc(ChatMessage.created_at), desc(ChatMessage.id))
         .limit(limit)
     )
     result = await db.execute(query)
-    return result.scalars().all()
+    messages = list(reversed(result.scalars().all()))
+    
+    if archive_path and len(messages) < limit:
+        archived = await load_archived_messages(archive_path, conversation_id)
+        messages = _merge_messages(archived, messages)[-limit:]
+    return messages
 
 
 # ============================================================
@@ -147,6 +291,8 @@ async def create_llm_config(
     max_tokens: int = 512,
     top_p: float = 0.9,
     is_default: bool = False,
+    cache_ttl_seconds: Optional[int] = None,
+    semantic_cache_threshold: Optional[float] = None,
 ) -> LLMConfig:
     """LLM 설정 생성"""
     # 기본값 설정 시 기존 기본값 해제
@@ -161,21 +307,28 @@ async def create_llm_config(
         max_tokens=max_tokens,
         top_p=top_p,
         is_default=is_default,
+        cache_ttl_seconds=cache_ttl_seconds,
+        semantic_cache_threshold=semantic_cache_threshold,
     )
     db.add(config)
     await db.flush()
     await db.refresh(config)
+    _invalidate_presets(db)
     return config
 
 
 async def get_llm_config(
     db: AsyncSession,
     config_id: int,
+    include_related: bool = False,
 ) -> Optional[LLMConfig]:
-    """LLM 설정 조회"""
-    result = await db.execute(
-        select(LLMConfig).where(LLMConfig.id == config_id)
-    )
+    """LLM 설정 조회 (include_related: fewshot_messages, llm_model 함께 로딩)"""
+    query = select(LLMConfig).where(LLMConfig.id == config_id)
+    
+    if include_related:
+        query = query.options(*_llm_config_related())
+    
+    result = await db.execute(query)
     return result.scalar_one_or_none()
 
 
@@ -191,14 +344,26 @@ async def get_llm_configs(
 
 async def get_default_llm_config(
     db: AsyncSession,
+    include_related: bool = False,
 ) -> Optional[LLMConfig]:
     """기본 LLM 설정 조회"""
-    result = await db.execute(
-        select(LLMConfig).where(LLMConfig.is_default == True)  # noqa: E712
-    )
+    query = select(LLMConfig).where(LLMConfig.is_default == True)  # noqa: E712
+    
+    if include_related:
+        query = query.options(*_llm_config_related())
+    
+    result = await db.execute(query)
     return result.scalar_one_or_none()
 
 
+def _llm_config_related() -> list:
+    """LLMConfig 연관 객체 eager loading 옵션"""
+    return [
+        selectinload(LLMConfig.fewshot_messages),
+        selectinload(LLMConfig.llm_model),
+    ]
+
+
 async def update_llm_config(
     db: AsyncSession,
     config_id: int,
@@ -219,6 +384,7 @@ async def update_llm_config(
 
     await db.flush()
     await db.refresh(config)
+    _invalidate_presets(db)
     return config
 
 
@@ -239,9 +405,18 @@ async def delete_llm_config(
         conversation.llm_config_id = None
 
     await db.delete(config)
+    _invalidate_presets(db)
     return True
 
 
+def _invalidate_presets(db: AsyncSession) -> None:
+    """프리셋 캐시 무효화 (커밋 전 다른 요청이 이전 값을 다시 캐시하지 않도록 커밋 후에도 한 번 더)"""
+    preset_cache.invalidate()
+    event.listen(
+        db.sync_session, "after_commit", lambda session: preset_cache.invalidate(), once=True
+    )
+
+
 async def _clear_default_llm_config(db: AsyncSession) -> None:
     """기존 기본값 해제"""
     result = await db.execute(
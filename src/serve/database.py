@@ -3,14 +3,17 @@ Database Configuration - SQLAlchemy 2.0 Async
 
 비동기 SQLAlchemy 엔진 및 세션 설정
 + SQLAdmin용 동기 엔진 추가
+- PostgreSQL (asyncpg): 명시적 커넥션 풀 크기, pre-ping, prepared statement 캐시
+- SQLite: WAL + synchronous=NORMAL, 프로세스 내 쓰기 트랜잭션 직렬화 (single writer)
 """
 
+import asyncio
 import os
 from typing import AsyncGenerator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
 # 데이터베이스 URL (기본: SQLite)
 DATABASE_URL = os.getenv(
@@ -18,6 +21,21 @@ DATABASE_URL = os.getenv(
     "sqlite+aiosqlite:///./mlops_chat.db"
 )
 
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_POSTGRES = DATABASE_URL.startswith("postgresql")
+
+# PostgreSQL 커넥션 풀 (워커 프로세스당)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+
+# SQLite
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SERIALIZE_WRITES = os.getenv("SQLITE_SERIALIZE_WRITES", "true").lower() == "true"
+
 
 def get_sync_database_url() -> str:
     """
@@ -35,23 +53,110 @@ def get_sync_database_url() -> str:
     return url
 
 
+def get_engine_options(sync: bool = False) -> dict:
+    """
+    백엔드별 엔진 옵션
+
+    Args:
+        sync: SQLAdmin용 동기 엔진 (관리 화면 트래픽만 처리하므로 작은 풀)
+    """
+    options: dict = {"echo": DATABASE_ECHO}
+    if IS_POSTGRES:
+        options.update(
+            pool_size=2 if sync else DB_POOL_SIZE,
+            max_overflow=2 if sync else DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,  # 유휴 중 끊긴 연결(DB 재시작, LB 타임아웃) 감지
+        )
+        if not sync:
+            # asyncpg 연결별 prepared statement 캐시 (PgBouncer transaction 모드면 0)
+            options["connect_args"] = {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    연결마다 SQLite PRAGMA 설정
+
+    WAL 모드에서는 읽기와 쓰기가 서로 막지 않고, synchronous=NORMAL은 커밋마다 fsync하지 않습니다
+    (WAL에서는 전원 장애 시 마지막 커밋만 유실될 수 있고 DB는 손상되지 않음).
+    """
+    cursor = dbapi_connection.cursor()
+    if ":memory:" not in DATABASE_URL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
 # 비동기 엔진 생성
 engine = create_async_engine(
     DATABASE_URL,
-    echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
     future=True,
+    **get_engine_options(),
 )
 
 # 동기 엔진 생성 (SQLAdmin용)
 sync_engine = create_engine(
     get_sync_database_url(),
-    echo=os.getenv("DATABASE_ECHO", "false").lower() == "true",
+    **get_engine_options(sync=True),
 )
 
+if IS_SQLITE:
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+
+
+# ============================================================
+# SQLite Single Writer
+# ============================================================
+
+# SQLite는 쓰기 트랜잭션을 하나만 허용하므로, 여러 세션이 동시에 쓰면 잠금 대기(busy_timeout)나
+# "database is locked" 오류가 납니다. 프로세스 안의 쓰기 트랜잭션은 이 락으로 FIFO 순서로 실행합니다.
+# (첫 쓰기 시점에 획득, 트랜잭션이 끝나면 반납 - 읽기 전용 세션은 기다리지 않음)
+sqlite_write_lock = asyncio.Lock()
+_WRITER_KEY = "sqlite_writer"
+
+
+class SerializedWriteSession(AsyncSession):
+    """쓰기 시작 시 sqlite_write_lock을 잡는 AsyncSession (SQLite 전용)"""
+
+    async def _acquire_writer(self) -> None:
+        if not self.sync_session.info.get(_WRITER_KEY):
+            await sqlite_write_lock.acquire()
+            self.sync_session.info[_WRITER_KEY] = True
+
+    def _has_pending_writes(self) -> bool:
+        return bool(self.sync_session.new or self.sync_session.dirty or self.sync_session.deleted)
+
+    async def execute(self, statement, *args, **kwargs):
+        if getattr(statement, "is_dml", False):
+            await self._acquire_writer()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def flush(self, objects=None) -> None:
+        if self._has_pending_writes():
+            await self._acquire_writer()
+        await super().flush(objects)
+
+    async def commit(self) -> None:
+        if self._has_pending_writes():
+            await self._acquire_writer()
+        await super().commit()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_writer(session: Session, transaction) -> None:
+    """최상위 트랜잭션 종료(커밋/롤백/close) 시 쓰기 락 반납"""
+    if transaction.parent is None and session.info.pop(_WRITER_KEY, False):
+        sqlite_write_lock.release()
+
+
 # 세션 팩토리
 async_session_maker = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=SerializedWriteSession if IS_SQLITE and SQLITE_SERIALIZE_WRITES else AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -7,21 +7,45 @@ FastAPI Application Entry Point
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.serve.core.config import settings
 from src.serve.admin import create_admin
-from src.serve.core.metrics import PrometheusMiddleware
+from src.serve.core.archive import conversation_archiver
+from src.serve.core.batch import batch_manager
+from src.serve.core.engine_metrics import engine_metrics_scraper
+from src.serve.core.message_writer import message_writer
+from src.serve.core.metrics import PrometheusMiddleware, instrument_engine
+from src.serve.core.pagination import NEXT_CURSOR_HEADER
+from src.serve.core.response_cache import response_cache
+from src.serve.core.serialization import JSON_BACKEND, FastJSONResponse
+from src.serve.core.semantic_cache import semantic_cache
+from src.serve.core.stats_rollup import message_stats_rollup
+from src.serve.core.tokenizer import load_tokenizer
+from src.serve.core.tracing import TracingMiddleware, trace_engine, trace_exporter
 from src.serve.core.logging import setup_logging, get_logger, RequestLoggingMiddleware
-from src.serve.database import init_db, close_db
+from src.serve.database import engine, sync_engine, init_db, close_db
 from src.serve.routers import router
-from src.serve.routers.dependency import close_llm_client
+from src.serve.routers.dependency import (
+    close_llm_client,
+    get_admission_controller,
+    get_llm_client,
+    start_llm_client,
+)
 
 # structlog 기반 로깅 설정
 # 프로덕션에서는 json_format=True, 개발에서는 False
 setup_logging(log_dir=settings.log_dir, json_format=not settings.debug)
 logger = get_logger(__name__)
 
+# 커넥션 풀 사용량 메트릭 (db_connections_active)
+instrument_engine(engine.sync_engine)
+instrument_engine(sync_engine)
+
+# 요청 트레이스에 SQL 실행 구간(db.query) 기록
+trace_engine(engine.sync_engine)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,6 +54,7 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"vLLM URL: {settings.vllm_base_url}")
     logger.info(f"Database: {settings.database_url}")
+    logger.info(f"JSON backend: {JSON_BACKEND}")
     logger.info(f"Authentication: {'enabled' if settings.enable_auth else 'disabled'}")
     
     # DB 초기화 (개발용 - 프로덕션에서는 Alembic 사용)
@@ -37,11 +62,49 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database tables created (debug mode)")
     
+    # 대화 메시지 write-behind 워커
+    await message_writer.start()
+    
+    # 요청 트레이스 내보내기 (TRACING_EXPORTER 설정 시)
+    await trace_exporter.start()
+    
+    # 유휴 대화 아카이브 (주기 실행)
+    if settings.archive_enabled:
+        await conversation_archiver.start()
+    
+    # 메시지 통계 롤업 (관리자 대시보드)
+    if settings.stats_rollup_enabled:
+        await message_stats_rollup.start()
+    
+    # LLM 라우터 (llm_models 테이블 기반 백엔드 로딩)
+    await start_llm_client()
+    
+    # 미완료 배치 재개 (output.jsonl에 기록된 요청은 건너뜀)
+    await batch_manager.start(await get_llm_client(), await get_admission_controller())
+    
+    # vLLM 엔진 지표 스크랩 (KV 캐시/대기 시퀀스 → 라우팅·어드미션)
+    await engine_metrics_scraper.start(await get_llm_client(), await get_admission_controller())
+    
+    # 컨텍스트 조립용 토크나이저 사전 로딩 (워커 스레드)
+    if settings.tokenizer_name:
+        await load_tokenizer()
+    
+    # 시맨틱 캐시 임베딩 모델 사전 로딩 (워커 스레드)
+    if semantic_cache.enabled:
+        await semantic_cache.load_model()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    await message_stats_rollup.close()
+    await conversation_archiver.close()
+    await batch_manager.close()
+    await engine_metrics_scraper.close()
     await close_llm_client()
+    await message_writer.close()  # 큐에 남은 메시지 flush 후 DB 종료
+    await trace_exporter.close()
+    response_cache.close()
     await close_db()
     logger.info("Shutdown complete")
 
@@ -52,6 +115,9 @@ app = FastAPI(
     description="vLLM 기반 LLM 서빙 API with Clean Architecture",
     version=settings.app_version,
     lifespan=lifespan,
+    # Default()로 감싸야 response_model 라우트가 pydantic-core 직렬화(dump_json)를 유지하고
+    # dict/list를 반환하는 라우트만 FastJSONResponse(orjson/msgspec)로 렌더링됨
+    default_response_class=Default(FastJSONResponse),
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -59,6 +125,9 @@ app = FastAPI(
 # Request 로깅 미들웨어 (structlog)
 app.add_middleware(RequestLoggingMiddleware)
 
+# 요청 트레이싱 미들웨어 (로깅 미들웨어 바깥: request_completed에 구간별 소요 시간 포함)
+app.add_middleware(TracingMiddleware)
+
 # Prometheus 메트릭 미들웨어
 app.add_middleware(PrometheusMiddleware)
 
@@ -69,6 +138,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # 브라우저 클라이언트의 keyset 페이지네이션
 )
 
 # Session 미들웨어는 SQLAdmin이 자체적으로 추가함 (AuthenticationBackend에서)
@@ -0,0 +1,26 @@
+"""add cache_ttl_seconds to llm_configs
+
+Revision ID: 3b7e9d21c4fa
+Revises: 744c594e729a
+Create Date: 2026-10-17 09:30:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9d21c4fa'
+down_revision: Union[str, None] = '744c594e729a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('llm_configs', sa.Column('cache_ttl_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('llm_configs', 'cache_ttl_seconds')
@@ -0,0 +1,26 @@
+"""add semantic_cache_threshold to llm_configs
+
+Revision ID: 8f2c61d0a9e3
+Revises: 3b7e9d21c4fa
+Create Date: 2026-10-17 10:15:47.903116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c61d0a9e3'
+down_revision: Union[str, None] = '3b7e9d21c4fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('llm_configs', sa.Column('semantic_cache_threshold', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('llm_configs', 'semantic_cache_threshold')
@@ -0,0 +1,43 @@
+"""add listing indexes for keyset pagination
+
+Revision ID: 5d1a7c3e9b42
+Revises: 8f2c61d0a9e3
+Create Date: 2026-10-17 11:00:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1a7c3e9b42'
+down_revision: Union[str, None] = '8f2c61d0a9e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 메시지 목록: WHERE conversation_id = ? ORDER BY created_at, id
+    op.create_index(
+        'ix_chat_messages_conversation_id_created_at',
+        'chat_messages', ['conversation_id', 'created_at'],
+    )
+    # 대화 목록: ORDER BY updated_at DESC, id DESC (+ session_id / user_id 필터)
+    op.create_index('ix_conversations_updated_at', 'conversations', ['updated_at'])
+    op.create_index(
+        'ix_conversations_session_id_updated_at',
+        'conversations', ['session_id', 'updated_at'],
+    )
+    op.create_index(
+        'ix_conversations_user_id_updated_at',
+        'conversations', ['user_id', 'updated_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversations_user_id_updated_at', table_name='conversations')
+    op.drop_index('ix_conversations_session_id_updated_at', table_name='conversations')
+    op.drop_index('ix_conversations_updated_at', table_name='conversations')
+    op.drop_index('ix_chat_messages_conversation_id_created_at', table_name='chat_messages')
@@ -0,0 +1,29 @@
+"""add archive columns to conversations
+
+Revision ID: a4e8f27c1d90
+Revises: 5d1a7c3e9b42
+Create Date: 2026-10-17 11:30:41.226817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e8f27c1d90'
+down_revision: Union[str, None] = '5d1a7c3e9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversations', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.add_column('conversations', sa.Column('archive_path', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_column('archive_path')
+        batch_op.drop_column('archived_at')
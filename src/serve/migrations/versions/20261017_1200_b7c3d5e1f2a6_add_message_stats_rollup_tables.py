@@ -0,0 +1,54 @@
+"""add message stats rollup tables
+
+Revision ID: b7c3d5e1f2a6
+Revises: a4e8f27c1d90
+Create Date: 2026-10-17 12:00:12.503114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c3d5e1f2a6'
+down_revision: Union[str, None] = 'a4e8f27c1d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('message_stats_hourly',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('latency_count', sa.Integer(), nullable=False),
+        sa.Column('latency_sum', sa.Float(), nullable=False),
+        sa.Column('latency_min', sa.Float(), nullable=True),
+        sa.Column('latency_max', sa.Float(), nullable=True),
+        sa.Column('latency_sketch', sa.JSON(), nullable=True),
+        sa.Column('ttft_count', sa.Integer(), nullable=False),
+        sa.Column('ttft_sum', sa.Float(), nullable=False),
+        sa.Column('ttft_min', sa.Float(), nullable=True),
+        sa.Column('ttft_max', sa.Float(), nullable=True),
+        sa.Column('ttft_sketch', sa.JSON(), nullable=True),
+        sa.Column('tokens_count', sa.Integer(), nullable=False),
+        sa.Column('tokens_sum', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hour', 'model', 'role', name='uq_message_stats_hourly_bucket')
+        )
+    op.create_table('rollup_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_table('message_stats_hourly')
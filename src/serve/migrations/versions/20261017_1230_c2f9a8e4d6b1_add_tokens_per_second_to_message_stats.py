@@ -0,0 +1,35 @@
+"""add tokens per second to message stats
+
+Revision ID: c2f9a8e4d6b1
+Revises: b7c3d5e1f2a6
+Create Date: 2026-10-17 12:30:27.840215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f9a8e4d6b1'
+down_revision: Union[str, None] = 'b7c3d5e1f2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('message_stats_hourly', sa.Column('tps_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('message_stats_hourly', sa.Column('tps_sum', sa.Float(), server_default='0', nullable=False))
+    op.add_column('message_stats_hourly', sa.Column('tps_min', sa.Float(), nullable=True))
+    op.add_column('message_stats_hourly', sa.Column('tps_max', sa.Float(), nullable=True))
+    op.add_column('message_stats_hourly', sa.Column('tps_sketch', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('message_stats_hourly', schema=None) as batch_op:
+        batch_op.drop_column('tps_sketch')
+        batch_op.drop_column('tps_max')
+        batch_op.drop_column('tps_min')
+        batch_op.drop_column('tps_sum')
+        batch_op.drop_column('tps_count')
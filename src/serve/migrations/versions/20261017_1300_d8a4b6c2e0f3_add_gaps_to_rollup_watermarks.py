@@ -0,0 +1,27 @@
+"""add gaps to rollup watermarks
+
+Revision ID: d8a4b6c2e0f3
+Revises: c2f9a8e4d6b1
+Create Date: 2026-10-17 13:00:41.215370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4b6c2e0f3'
+down_revision: Union[str, None] = 'c2f9a8e4d6b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('rollup_watermarks', sa.Column('gaps', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('rollup_watermarks', schema=None) as batch_op:
+        batch_op.drop_column('gaps')
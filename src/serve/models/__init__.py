@@ -6,6 +6,10 @@ SQLAlchemy ORM 모델 정의
 
 from src.serve.models.chat import ChatMessage, Conversation, FewshotMessage, LLMConfig
 from src.serve.models.llm import LLMModel
+from src.serve.models.stats import MessageStatsHourly, RollupWatermark
 from src.serve.models.user import User, UserRole
 
-__all__ = ["ChatMessage", "Conversation", "FewshotMessage", "LLMConfig", "LLMModel", "User", "UserRole"]
+__all__ = [
+    "ChatMessage", "Conversation", "FewshotMessage", "LLMConfig", "LLMModel",
+    "MessageStatsHourly", "RollupWatermark", "User", "UserRole",
+]
@@ -5,7 +5,7 @@ Chat Models - 대화 기록 ORM 모델
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, Integer, Float, DateTime, ForeignKey, JSON, Boolean
+from sqlalchemy import String, Text, Integer, Float, DateTime, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.serve.database import Base
@@ -26,6 +26,10 @@ class LLMConfig(Base):
     max_tokens: Mapped[int] = mapped_column(Integer, default=512, nullable=False)
     top_p: Mapped[float] = mapped_column(Float, default=0.9, nullable=False)
     is_default: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # 응답 캐시 TTL (초) - NULL: 기본값, 0: 캐시 안 함
+    cache_ttl_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # 시맨틱 캐시 유사도 임계값 - NULL: 기본값
+    semantic_cache_threshold: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, nullable=False
     )
@@ -49,6 +53,12 @@ class LLMConfig(Base):
 class Conversation(Base):
     """대화 세션"""
     __tablename__ = "conversations"
+    __table_args__ = (
+        # 대화 목록 keyset 페이지네이션 (updated_at DESC, id DESC)
+        Index("ix_conversations_updated_at", "updated_at"),
+        Index("ix_conversations_session_id_updated_at", "session_id", "updated_at"),
+        Index("ix_conversations_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     title: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -65,6 +75,9 @@ class Conversation(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # 아카이브 (메시지는 압축 JSONL 파일로 이동, 대화 행만 stub으로 유지)
+    archived_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archive_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
 
     # 관계
     llm_config: Mapped[Optional["LLMConfig"]] = relationship(
@@ -84,6 +97,10 @@ class Conversation(Base):
 class ChatMessage(Base):
     """개별 채팅 메시지"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # 메시지 목록 keyset 페이지네이션 (created_at, id)
+        Index("ix_chat_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     conversation_id: Mapped[int] = mapped_column(
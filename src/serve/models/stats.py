@@ -0,0 +1,74 @@
+"""
+Stats Models - 메시지 통계 롤업 ORM 모델
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, Integer, Float, DateTime, JSON, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.serve.database import Base
+
+
+class MessageStatsHourly(Base):
+    """시간 × 모델 × 역할별 메시지 통계 (chat_messages 증분 집계)"""
+    __tablename__ = "message_stats_hourly"
+    __table_args__ = (
+        UniqueConstraint("hour", "model", "role", name="uq_message_stats_hourly_bucket"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    hour: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # UTC, 정시 절삭
+    model: Mapped[str] = mapped_column(String(100), default="", nullable=False)  # 모델 없음: ""
+    role: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # 응답 지연 (ms)
+    latency_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    latency_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    latency_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    latency_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    latency_sketch: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+    # TTFT (ms)
+    ttft_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    ttft_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    ttft_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ttft_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ttft_sketch: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+    # 생성 속도 (completion tokens / 생성 시간 초, 어시스턴트 메시지)
+    tps_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    tps_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    tps_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    tps_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    tps_sketch: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+    # 토큰
+    tokens_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    tokens_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<MessageStatsHourly(hour={self.hour}, model={self.model}, role={self.role})>"
+
+
+class RollupWatermark(Base):
+    """롤업 작업별 마지막 처리 id (증분 집계 위치)"""
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # last_id 아래에서 아직 보이지 않은 id → 처음 발견 시각 (늦게 커밋되면 다음 실행에서 집계)
+    gaps: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<RollupWatermark(name={self.name}, last_id={self.last_id})>"
@@ -0,0 +1,177 @@
+"""
+Batch Router
+
+배치 완성 API 엔드포인트
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import FileResponse
+
+from src.serve.core.admission import AdmissionController
+from src.serve.core.batch import BatchJob, BatchManager
+from src.serve.core.llm_router import LLMRouter
+from src.serve.routers.dependency import (
+    get_admission_controller,
+    get_batch_manager,
+    get_llm_client,
+    verify_api_key,
+)
+from src.serve.schemas.batch import BatchListResponse, BatchResponse
+
+router = APIRouter(prefix="/v1", tags=["Batch"])
+
+
+def _to_response(job: BatchJob) -> BatchResponse:
+    """BatchJob → 응답 스키마 (진행률 포함)"""
+    return BatchResponse(
+        id=job.id,
+        status=job.status,
+        total=job.total,
+        completed=job.completed,
+        failed=job.failed,
+        progress=job.processed / job.total if job.total else 0.0,
+        model=job.model,
+        max_concurrency=job.max_concurrency,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+    )
+
+
+def _get_job_or_404(manager: BatchManager, batch_id: str) -> BatchJob:
+    job = manager.get(batch_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found",
+        )
+    return job
+
+
+# ============================================================
+# Batch CRUD
+# ============================================================
+
+@router.post(
+    "/batches",
+    response_model=BatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="배치 생성",
+    description="JSONL 업로드 (행마다 request_id, body) 후 백그라운드에서 제한 병렬로 실행",
+)
+async def create_batch(
+    file: UploadFile = File(..., description="입력 JSONL 파일"),
+    model: Optional[str] = Form(None, description="기본 모델 이름"),
+    max_concurrency: Optional[int] = Form(None, ge=1, le=1024, description="동시 upstream 요청 수"),
+    manager: BatchManager = Depends(get_batch_manager),
+    llm: LLMRouter = Depends(get_llm_client),
+    admission: AdmissionController = Depends(get_admission_controller),
+    _: bool = Depends(verify_api_key),
+):
+    """배치 생성"""
+    content = await file.read()
+    try:
+        job = await manager.create(
+            content, llm, admission, model=model, max_concurrency=max_concurrency
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return _to_response(job)
+
+
+@router.get(
+    "/batches",
+    response_model=BatchListResponse,
+    summary="배치 목록",
+)
+async def list_batches(
+    manager: BatchManager = Depends(get_batch_manager),
+    _: bool = Depends(verify_api_key),
+):
+    """배치 목록 조회"""
+    jobs = manager.list_jobs()
+    return BatchListResponse(batches=[_to_response(job) for job in jobs], total=len(jobs))
+
+
+@router.get(
+    "/batches/{batch_id}",
+    response_model=BatchResponse,
+    summary="배치 진행 상황",
+)
+async def get_batch(
+    batch_id: str,
+    manager: BatchManager = Depends(get_batch_manager),
+    _: bool = Depends(verify_api_key),
+):
+    """배치 상태/진행률 조회"""
+    return _to_response(_get_job_or_404(manager, batch_id))
+
+
+@router.get(
+    "/batches/{batch_id}/output",
+    summary="배치 결과 다운로드",
+    description="완료된 결과 JSONL (실행 중이면 지금까지 기록된 결과)",
+)
+async def get_batch_output(
+    batch_id: str,
+    manager: BatchManager = Depends(get_batch_manager),
+    _: bool = Depends(verify_api_key),
+):
+    """배치 결과 JSONL 다운로드"""
+    job = _get_job_or_404(manager, batch_id)
+    return FileResponse(
+        job.output_path,
+        media_type="application/x-ndjson",
+        filename=f"{job.id}.jsonl",
+    )
+
+
+@router.post(
+    "/batches/{batch_id}/cancel",
+    response_model=BatchResponse,
+    summary="배치 취소",
+)
+async def cancel_batch(
+    batch_id: str,
+    manager: BatchManager = Depends(get_batch_manager),
+    _: bool = Depends(verify_api_key),
+):
+    """배치 취소 (기록된 결과는 유지)"""
+    job = _get_job_or_404(manager, batch_id)
+    if job.status in ("completed", "cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Batch is already {job.status}",
+        )
+    await manager.cancel(job)
+    return _to_response(job)
+
+
+@router.post(
+    "/batches/{batch_id}/resume",
+    response_model=BatchResponse,
+    summary="배치 재개",
+    description="취소/실패한 배치를 이어서 실행 (이미 기록된 request_id는 건너뜀)",
+)
+async def resume_batch(
+    batch_id: str,
+    manager: BatchManager = Depends(get_batch_manager),
+    llm: LLMRouter = Depends(get_llm_client),
+    admission: AdmissionController = Depends(get_admission_controller),
+    _: bool = Depends(verify_api_key),
+):
+    """배치 재개"""
+    job = _get_job_or_404(manager, batch_id)
+    if job.status == "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch is already completed",
+        )
+    manager.resume(job, llm, admission)
+    return _to_response(job)
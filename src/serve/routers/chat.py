@@ -5,17 +5,40 @@ Chat Router
 """
 
 import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import AsyncGenerator, AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.serve.core.llm import LLMClient
+from src.serve.core.admission import AdmissionController, AdmissionTicket
+from src.serve.core.coalesce import joined_inflight
+from src.serve.core.config import settings
+from src.serve.core.context import build_context
+from src.serve.core.llm_router import LLMRouter
+from src.serve.core.logging import get_logger
+from src.serve.core.message_writer import message_writer
 from src.serve.core.metrics import record_llm_request
-from src.serve.routers.dependency import get_db, get_llm_client, verify_api_key
+from src.serve.core.pagination import NEXT_CURSOR_HEADER, Cursor, decode_cursor, encode_cursor
+from src.serve.core.preset_cache import Preset, preset_cache
+from src.serve.core.response_cache import CachedResponse, make_cache_key, replay_stream, response_cache
+from src.serve.core.semantic_cache import SemanticLookup, semantic_cache, semantic_namespace
+from src.serve.core.streaming import DONE_EVENT, StreamTap, sse_event
+from src.serve.core.tracing import span
+from src.serve.core.usage import ANONYMOUS_USER, NO_CONFIG, record_usage, user_labeler
+from src.serve.database import async_session_maker
+from src.serve.routers.dependency import (
+    admit_request,
+    client_key,
+    get_admission_controller,
+    get_db,
+    get_llm_client,
+    verify_api_key,
+)
 from src.serve.schemas.chat import (
     ChatCompletionRequest,
     ChatCompletionResponse,
@@ -31,6 +54,7 @@ from src.serve.schemas.chat import (
 from src.serve.cruds import chat as crud
 
 router = APIRouter(prefix="/v1", tags=["Chat"])
+logger = get_logger(__name__)
 
 
 # ============================================================
@@ -45,8 +69,10 @@ router = APIRouter(prefix="/v1", tags=["Chat"])
 )
 async def chat_completion(
     request: ChatCompletionRequest,
+    raw_request: Request,
     db: AsyncSession = Depends(get_db),
-    llm: LLMClient = Depends(get_llm_client),
+    llm: LLMRouter = Depends(get_llm_client),
+    admission: AdmissionController = Depends(get_admission_controller),
     _: bool = Depends(verify_api_key),
 ):
     """채팅 완성 요청 처리"""
@@ -54,39 +80,79 @@ async def chat_completion(
     
     # 메시지 변환
     messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
+    model = request.model
+    
+    # 서버 측 컨텍스트 조립 (저장된 이력 + 프리셋)
+    prompt_messages, preset = messages, None
+    if request.use_history:
+        with span("context"):
+            prompt_messages, model, preset = await _assemble_context(db, request, messages)
+    
+    # 응답 캐시 조회 (정확 일치 → 시맨틱)
+    with span("cache.lookup"):
+        plan = await _lookup_cache(db, request, messages, prompt_messages, model, preset)
+    cached = plan.hit
+    
+    # 토큰 사용량 라벨 (프리셋, 해시된 사용자)
+    llm_config, user = await _usage_labels(db, raw_request, request, preset)
+    
+    # 어드미션 제어 (캐시 미스만 upstream 슬롯 필요, 초과 시 429/503)
+    ticket = None if cached else await admit_request(raw_request, admission, model)
     
     # 스트리밍 모드
     if request.stream:
-        async def generate():
-            async for chunk in llm.chat_completion_stream(
-                messages=messages,
-                model=request.model,
+        if cached:
+            source = replay_stream(cached)
+        else:
+            source = llm.chat_completion_stream(
+                messages=prompt_messages,
+                model=model,
                 temperature=request.temperature,
                 max_tokens=request.max_tokens,
                 top_p=request.top_p,
-            ):
-                yield f"data: {chunk}\n\n"
-            yield "data: [DONE]\n\n"
-        
-        return StreamingResponse(generate(), media_type="text/event-stream")
+                backend=ticket.backend,
+            )
+        # 스트림 시작 전 연결이 끊겨도 슬롯이 반납되도록 background에서도 release
+        return StreamingResponse(
+            _stream_chat_completion(request, messages, source, model, plan, ticket, llm_config, user),
+            media_type="text/event-stream",
+            background=BackgroundTask(ticket.release) if ticket else None,
+        )
     
-    # 일반 모드
-    response = await llm.chat_completion(
-        messages=messages,
-        model=request.model,
-        temperature=request.temperature,
-        max_tokens=request.max_tokens,
-        top_p=request.top_p,
-    )
+    # 일반 모드 (캐시 히트 시 vLLM 호출 생략)
+    if cached:
+        response = cached.to_dict()
+    else:
+        try:
+            response = await llm.chat_completion(
+                messages=prompt_messages,
+                model=model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                top_p=request.top_p,
+                backend=ticket.backend,
+            )
+        finally:
+            ticket.release()
+    # 진행 중이던 동일 요청에 합류했으면 upstream 지표는 선행 요청이 기록
+    upstream = not cached and not joined_inflight()
     
     if "error" in response:
         # 에러 메트릭 기록
-        record_llm_request(
-            model=request.model or "unknown",
-            duration=time.time() - start_time,
-            tokens=0,
-            success=False
-        )
+        if upstream:
+            record_llm_request(
+                model=model or "unknown",
+                duration=time.time() - start_time,
+                tokens=0,
+                success=False
+            )
+        if "retry_after" in response:
+            # 서킷 open: upstream 호출 없이 즉시 실패
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=response["error"],
+                headers={"Retry-After": str(response["retry_after"])},
+            )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=response["error"],
@@ -95,42 +161,57 @@ async def chat_completion(
     latency_ms = int((time.time() - start_time) * 1000)
     conversation_id = request.conversation_id
     
-    # 성공 메트릭 기록
-    usage = response.get("usage", {})
-    record_llm_request(
-        model=response.get("model", request.model or "unknown"),
-        duration=latency_ms / 1000.0,
-        tokens=usage.get("total_tokens", 0),
-        success=True
-    )
+    if upstream:
+        # 성공 메트릭 기록
+        usage = response.get("usage", {})
+        record_llm_request(
+            model=response.get("model", model or "unknown"),
+            duration=latency_ms / 1000.0,
+            tokens=usage.get("total_tokens", 0),
+            success=True
+        )
+        record_usage(
+            response.get("model", model or "unknown"),
+            llm_config,
+            user,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            generation_seconds=latency_ms / 1000.0,
+        )
+        await plan.store(CachedResponse.from_dict(response))
     
-    # 대화 저장
+    # 대화 저장 (write-behind 큐, 응답은 저장 완료를 기다리지 않음)
     if request.save_conversation:
         # 새 대화 또는 기존 대화에 추가
         if not conversation_id:
             conversation = await crud.create_conversation(db)
             conversation_id = conversation.id
+        # 워커가 별도 세션에서 INSERT하므로 대화 행을 먼저 커밋하고 요청 트랜잭션 종료
+        with span("db.commit"):
+            await db.commit()
         
+        created_at = datetime.utcnow()
+        rows = []
         # 사용자 메시지 저장 (마지막 메시지가 user인 경우)
         if messages and messages[-1]["role"] == "user":
-            await crud.create_message(
-                db,
-                conversation_id=conversation_id,
-                role="user",
-                content=messages[-1]["content"],
-            )
+            rows.append(crud.message_row(
+                conversation_id, "user", messages[-1]["content"], created_at=created_at
+            ))
         
         # 어시스턴트 응답 저장
         usage = response.get("usage", {})
-        await crud.create_message(
-            db,
-            conversation_id=conversation_id,
-            role="assistant",
-            content=response["content"],
+        rows.append(crud.message_row(
+            conversation_id,
+            "assistant",
+            response["content"],
             model=response.get("model"),
             tokens_used=usage.get("total_tokens"),
             latency_ms=latency_ms,
-        )
+            extra_data={"completion_tokens": usage.get("completion_tokens")},
+            created_at=created_at,
+        ))
+        with span("persist.enqueue"):
+            await message_writer.enqueue(rows)
     
     return ChatCompletionResponse(
         content=response["content"],
@@ -146,6 +227,228 @@ async def chat_completion(
     )
 
 
+async def _stream_chat_completion(
+    request: ChatCompletionRequest,
+    messages: list[dict],
+    source: AsyncIterator[bytes],
+    model: Optional[str],
+    plan: "_CachePlan",
+    ticket: Optional[AdmissionTicket] = None,
+    llm_config: str = NO_CONFIG,
+    user: str = ANONYMOUS_USER,
+) -> AsyncGenerator[bytes, None]:
+    """
+    스트리밍 응답 생성
+    
+    upstream SSE 바이트를 재조립 없이 중계하면서 TTFT/토큰 수를 기록하고, 스트림이 끝나면
+    사용자/어시스턴트 메시지를 write-behind 큐에 넣습니다 (새 대화 행만 즉시 생성).
+    캐시 미스였던 요청은 정상 종료된 응답을 캐시에 저장합니다 (다른 요청의 스트림에 합류했으면 지표/캐시는 선행 요청 몫).
+    upstream 슬롯(ticket)은 upstream 스트림이 끝나는 즉시 반납합니다.
+    """
+    cached = plan.hit is not None
+    tap = StreamTap(
+        model=model or settings.default_model or "unknown",
+        record_metrics=not cached,
+        llm_config=llm_config,
+        user=user,
+    )
+    
+    try:
+        async for chunk in source:
+            if tap.record_metrics and joined_inflight():
+                tap.record_metrics = False  # 진행 중이던 동일 스트림에 합류 (지표는 선행 요청이 기록)
+            data = tap.feed(chunk)
+            if data:
+                yield data
+        yield tap.flush()
+    finally:
+        if ticket:
+            ticket.release()
+    
+    latency_ms = tap.finish()
+    
+    if tap.record_metrics and tap.error is None and tap.finish_reason:
+        await plan.store(CachedResponse(
+            content=tap.content,
+            model=tap.model,
+            usage=tap.usage,
+            finish_reason=tap.finish_reason,
+        ))
+    
+    if request.save_conversation and tap.error is None:
+        try:
+            conversation_id = request.conversation_id
+            if conversation_id is None:
+                async with async_session_maker() as session, session.begin():
+                    conversation_id = (await crud.create_conversation(session)).id
+            
+            rows = []
+            if messages and messages[-1]["role"] == "user":
+                rows.append(crud.message_row(
+                    conversation_id, "user", messages[-1]["content"], created_at=tap.started_at
+                ))
+            rows.append(crud.message_row(
+                conversation_id,
+                "assistant",
+                tap.content,
+                model=tap.model,
+                tokens_used=tap.total_tokens,
+                latency_ms=latency_ms,
+                extra_data={"completion_tokens": tap.output_tokens},
+                created_at=tap.started_at,
+                first_token_at=tap.first_token_at,
+            ))
+            with span("persist.enqueue"):
+                await message_writer.enqueue(rows)
+            yield sse_event("conversation", {"conversation_id": conversation_id})
+        except Exception as e:
+            logger.exception("stream_persist_failed", error=str(e))
+    
+    yield DONE_EVENT
+
+
+async def _usage_labels(
+    db: AsyncSession,
+    raw_request: Request,
+    request: ChatCompletionRequest,
+    preset: Optional[Preset],
+) -> tuple[str, str]:
+    """
+    토큰 사용량 라벨 (프리셋 이름, 해시된 사용자)
+    
+    컨텍스트 조립에서 적용한 프리셋(대화/기본 프리셋 포함)이 없으면 요청의 llm_config_id로 조회합니다.
+    """
+    if preset is None and request.llm_config_id:
+        preset = await preset_cache.get(db, request.llm_config_id)
+    return preset.name if preset else NO_CONFIG, user_labeler.label(client_key(raw_request))
+
+
+@dataclass
+class _CachePlan:
+    """요청별 캐시 조회 결과 및 미스 시 저장 대상"""
+    key: Optional[str] = None
+    ttl: int = 0
+    semantic: Optional[SemanticLookup] = None
+    hit: Optional[CachedResponse] = None
+    
+    async def store(self, response: CachedResponse) -> None:
+        """vLLM 응답을 조회했던 캐시 계층에 저장"""
+        if self.key:
+            await response_cache.set(self.key, response, self.ttl)
+        if self.semantic:
+            semantic_cache.store(self.semantic, response)
+
+
+async def _lookup_cache(
+    db: AsyncSession,
+    request: ChatCompletionRequest,
+    messages: list[dict],
+    prompt_messages: list[dict],
+    model: Optional[str],
+    preset: Optional[Preset],
+) -> _CachePlan:
+    """
+    응답 캐시 조회
+    
+    - 정확 일치: temperature=0 요청, 프리셋 TTL이 0이 아닌 경우
+    - 시맨틱: 단일 user 질문 요청 (저장된 대화 이력에 의존하지 않는 경우)
+    """
+    plan = _CachePlan()
+    exact = response_cache.enabled and request.temperature == 0
+    semantic = (
+        semantic_cache.enabled
+        and len(messages) == 1
+        and messages[0]["role"] == "user"
+        and not (request.use_history and request.conversation_id)
+    )
+    if not (exact or semantic):
+        return plan
+    
+    if preset is None:
+        preset = await preset_cache.get(db, request.llm_config_id)
+    
+    if exact:
+        plan.ttl = response_cache.ttl_for(preset)
+        if plan.ttl:
+            plan.key = make_cache_key(
+                model, prompt_messages, request.temperature, request.top_p, request.max_tokens
+            )
+            plan.hit = await response_cache.get(plan.key)
+    
+    if semantic and plan.hit is None:
+        threshold = settings.semantic_cache_threshold
+        if preset and preset.semantic_cache_threshold is not None:
+            threshold = preset.semantic_cache_threshold
+        lookup = await semantic_cache.lookup(
+            semantic_namespace(model, prompt_messages[:-1]),
+            messages[0]["content"],
+            threshold,
+        )
+        plan.hit = lookup.response
+        plan.semantic = lookup
+    
+    return plan
+
+
+async def _assemble_context(
+    db: AsyncSession,
+    request: ChatCompletionRequest,
+    messages: list[dict],
+) -> tuple[list[dict], Optional[str], Optional[Preset]]:
+    """
+    서버 측 컨텍스트 조립
+    
+    프리셋(system_prompt + few-shot) + 저장된 대화 이력 + 새 메시지를 조립하고
+    LLMModel.max_tokens_limit에서 응답용 max_tokens를 뺀 예산에 맞게 오래된 턴을 제거합니다.
+    
+    Returns:
+        (프롬프트 메시지, 사용할 모델 이름, 프리셋)
+    """
+    conversation = None
+    if request.conversation_id:
+        conversation = await crud.get_conversation(db, request.conversation_id)
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found",
+            )
+    
+    config_id = request.llm_config_id or (conversation.llm_config_id if conversation else None)
+    preset = await preset_cache.get(db, config_id)
+    if config_id and not preset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="LLM config not found",
+        )
+    
+    history = []
+    if conversation:
+        # 직전 턴이 아직 큐에 있으면 저장될 때까지 대기 (read-your-writes)
+        await message_writer.wait_flushed(conversation.id)
+        rows = await crud.get_recent_messages(
+            db,
+            conversation.id,
+            limit=settings.context_history_limit,
+            archive_path=conversation.archive_path,
+        )
+        history = [
+            {"role": m.role, "content": m.content}
+            for m in rows if m.role in ("user", "assistant")
+        ]
+    
+    limit = (preset.max_tokens_limit if preset else None) or settings.context_max_tokens
+    budget = limit - request.max_tokens if limit > request.max_tokens else limit
+    
+    prompt_messages = build_context(
+        messages,
+        history=history,
+        system_prompt=preset.system_prompt if preset else None,
+        fewshot=preset.fewshot_messages() if preset else [],
+        budget=budget,
+    )
+    return prompt_messages, request.model or (preset.model_name if preset else None), preset
+
+
 # ============================================================
 # Conversations
 # ============================================================
@@ -175,21 +478,42 @@ async def create_conversation(
     "/conversations",
     response_model=list[ConversationListResponse],
     summary="대화 목록",
+    description="최근 갱신 순. 다음 페이지가 있으면 X-Next-Cursor 헤더의 값을 cursor로 전달",
 )
 async def list_conversations(
-    skip: int = 0,
-    limit: int = 20,
+    response: Response,
+    skip: int = Query(0, ge=0, description="cursor가 없을 때만 사용 (OFFSET)"),
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor"),
     session_id: Optional[str] = None,
+    user_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
     _: bool = Depends(verify_api_key),
 ):
     """대화 목록 조회"""
     conversations = await crud.get_conversations(
-        db, skip=skip, limit=limit, session_id=session_id
+        db,
+        skip=skip,
+        limit=limit + 1,
+        session_id=session_id,
+        user_id=user_id,
+        cursor=_parse_cursor(cursor),
     )
+    if len(conversations) > limit:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.updated_at, last.id)
     return conversations
 
 
+def _parse_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """커서 디코딩 (잘못된 커서는 400)"""
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get(
     "/conversations/{conversation_id}",
     response_model=ConversationResponse,
@@ -238,13 +562,27 @@ async def delete_conversation(
 )
 async def get_messages(
     conversation_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0, description="cursor가 없을 때만 사용 (OFFSET)"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor"),
     db: AsyncSession = Depends(get_db),
     _: bool = Depends(verify_api_key),
 ):
-    """대화의 메시지 목록 조회"""
-    messages = await crud.get_messages(db, conversation_id, skip=skip, limit=limit)
+    """대화의 메시지 목록 조회 (오래된 순, 다음 페이지는 X-Next-Cursor)"""
+    conversation = await crud.get_conversation(db, conversation_id)
+    messages = await crud.get_messages(
+        db,
+        conversation_id,
+        skip=skip,
+        limit=limit + 1,
+        cursor=_parse_cursor(cursor),
+        archive_path=conversation.archive_path if conversation else None,
+    )
+    if len(messages) > limit:
+        messages = messages[:limit]
+        last = messages[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
     return messages
 
 
@@ -274,6 +612,8 @@ async def create_llm_config(
             max_tokens=request.max_tokens,
             top_p=request.top_p,
             is_default=request.is_default,
+            cache_ttl_seconds=request.cache_ttl_seconds,
+            semantic_cache_threshold=request.semantic_cache_threshold,
         )
         return config
     except IntegrityError:
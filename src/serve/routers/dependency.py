@@ -4,14 +4,17 @@ Dependencies
 FastAPI 의존성 주입
 """
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.serve.database import async_session_maker
+from src.serve.core.admission import AdmissionController, AdmissionTicket, AdmissionRejected
+from src.serve.core.batch import BatchManager, batch_manager
 from src.serve.core.config import settings
-from src.serve.core.llm import LLMClient
+from src.serve.core.llm_router import LLMRouter
+from src.serve.core.tracing import span
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -26,7 +29,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            with span("db.commit"):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -45,48 +49,108 @@ async def verify_api_key(
         async def chat(authenticated: bool = Depends(verify_api_key)):
             ...
     """
-    if not settings.enable_auth:
+    with span("auth"):
+        if not settings.enable_auth:
+            return True
+        
+        if not x_api_key:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="API key required",
+                headers={"WWW-Authenticate": "API-Key"},
+            )
+        
+        if x_api_key != settings.api_key:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+                headers={"WWW-Authenticate": "API-Key"},
+            )
+        
         return True
-    
-    if not x_api_key:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="API key required",
-            headers={"WWW-Authenticate": "API-Key"},
-        )
-    
-    if x_api_key != settings.api_key:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid API key",
-            headers={"WWW-Authenticate": "API-Key"},
-        )
-    
-    return True
 
 
-# LLM 클라이언트 싱글톤
-_llm_client: LLMClient | None = None
+# LLM 라우터 싱글톤 (LLMClient 인터페이스 호환)
+_llm_client: LLMRouter | None = None
 
 
-async def get_llm_client() -> LLMClient:
+async def get_llm_client() -> LLMRouter:
     """
     LLM 클라이언트 의존성
     
+    llm_models 테이블 기반 LLMRouter를 반환합니다.
+    
     Usage:
         @router.post("/chat")
-        async def chat(llm: LLMClient = Depends(get_llm_client)):
+        async def chat(llm: LLMRouter = Depends(get_llm_client)):
             response = await llm.chat_completion(messages)
     """
     global _llm_client
     if _llm_client is None:
-        _llm_client = LLMClient()
+        _llm_client = LLMRouter()
     return _llm_client
 
 
+# 어드미션 컨트롤러 싱글톤 (LLM 라우터 용량 기준)
+_admission: AdmissionController | None = None
+
+
+async def get_admission_controller() -> AdmissionController:
+    """어드미션 컨트롤러 의존성"""
+    global _admission
+    if _admission is None:
+        llm = await get_llm_client()
+        _admission = AdmissionController(capacity=lambda: llm.capacity, slots=llm)
+    return _admission
+
+
+def client_key(request: Request) -> str:
+    """요청자 식별 키 (X-API-Key, 없으면 클라이언트 IP) - 공정성/사용량 집계 기준"""
+    return request.headers.get("X-API-Key") or (request.client.host if request.client else "anonymous")
+
+
+async def admit_request(
+    request: Request,
+    admission: AdmissionController,
+    model: Optional[str] = None,
+) -> AdmissionTicket:
+    """
+    upstream 슬롯 획득 (model을 처리할 백엔드 중 상한 미만인 곳에 배정, ticket.backend)
+
+    X-API-Key(없으면 클라이언트 IP)를 공정성 키로 사용하고,
+    settings.admission_priorities에 등록된 키는 해당 우선순위로 대기합니다.
+    
+    Raises:
+        HTTPException: 429/503 + Retry-After (대기열 초과/데드라인 초과)
+    """
+    api_key = request.headers.get("X-API-Key")
+    priority = settings.admission_priorities.get(api_key) if api_key else None
+    try:
+        with span("llm.queue"):
+            return await admission.acquire(client_key(request), priority=priority, model=model)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def get_batch_manager() -> BatchManager:
+    """배치 관리자 의존성"""
+    return batch_manager
+
+
+async def start_llm_client() -> None:
+    """LLM 라우터 초기 로딩 및 백그라운드 refresh 시작 (앱 시작 시 호출)"""
+    llm = await get_llm_client()
+    await llm.start()
+
+
 async def close_llm_client() -> None:
     """LLM 클라이언트 종료 (앱 셧다운 시 호출)"""
-    global _llm_client
+    global _llm_client, _admission
     if _llm_client:
         await _llm_client.close()
         _llm_client = None
+    _admission = None
@@ -6,13 +6,15 @@ Router Aggregator
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from starlette.responses import Response
 
 from src.serve.core.config import settings
-from src.serve.core.llm import LLMClient
+from src.serve.core.llm_router import LLMRouter
 from src.serve.core.metrics import get_metrics
+from src.serve.core.usage import usage_window
 from src.serve.routers.dependency import get_llm_client
+from src.serve.routers.batch import router as batch_router
 from src.serve.routers.chat import router as chat_router
 from src.serve.schemas.chat import HealthResponse
 
@@ -21,6 +23,7 @@ router = APIRouter()
 
 # 서브 라우터 포함
 router.include_router(chat_router)
+router.include_router(batch_router)
 
 
 # ============================================================
@@ -40,6 +43,7 @@ async def root():
             "chat": "/v1/chat/completions",
             "conversations": "/v1/conversations",
             "llm_configs": "/v1/llm-configs",
+            "batches": "/v1/batches",
             "models": "/v1/models",
         },
     }
@@ -47,7 +51,7 @@ async def root():
 
 @router.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check(
-    llm: LLMClient = Depends(get_llm_client),
+    llm: LLMRouter = Depends(get_llm_client),
 ):
     """헬스 체크"""
     vllm_connected = await llm.health_check()
@@ -64,7 +68,7 @@ async def health_check(
 
 @router.get("/v1/models", tags=["Models"])
 async def list_models(
-    llm: LLMClient = Depends(get_llm_client),
+    llm: LLMRouter = Depends(get_llm_client),
 ):
     """사용 가능한 모델 목록 (OpenAI 호환)"""
     models = await llm.list_models()
@@ -82,3 +86,16 @@ async def metrics() -> Response:
     Prometheus 서버가 스크랩하는 엔드포인트입니다.
     """
     return get_metrics()
+
+
+@router.get("/metrics/usage", tags=["Monitoring"])
+async def usage_metrics(
+    minutes: int = Query(60, ge=1, description="최근 N분 (USAGE_WINDOW_MINUTES까지)"),
+):
+    """
+    토큰 사용량 롤링 집계 (용량 계획용)
+    
+    분별 prompt/completion 토큰과 생성 속도, 모델/프리셋/사용자별 합계를 반환합니다.
+    사용자는 API 키(없으면 IP)의 해시 라벨이며, 이 워커 프로세스의 집계만 포함합니다.
+    """
+    return usage_window.snapshot(minutes)
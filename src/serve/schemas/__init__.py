@@ -21,6 +21,10 @@ from src.serve.schemas.chat import (
     # Health
     HealthResponse,
 )
+from src.serve.schemas.batch import (
+    BatchResponse,
+    BatchListResponse,
+)
 from src.serve.schemas.user import (
     UserCreate,
     UserUpdate,
@@ -38,6 +42,9 @@ __all__ = [
     "LLMConfigCreate",
     "LLMConfigResponse",
     "HealthResponse",
+    # Batch
+    "BatchResponse",
+    "BatchListResponse",
     # User
     "UserCreate",
     "UserUpdate",
@@ -0,0 +1,36 @@
+"""
+Batch Schemas
+
+배치 완성 관련 Pydantic 스키마
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+# ============================================================
+# Batch Schemas
+# ============================================================
+
+class BatchResponse(BaseModel):
+    """배치 작업 상태"""
+    id: str
+    status: str = Field(..., description="queued/running/completed/failed/cancelled")
+    total: int = Field(..., description="전체 요청 수")
+    completed: int = Field(0, description="성공한 요청 수")
+    failed: int = Field(0, description="실패한 요청 수")
+    progress: float = Field(0.0, description="처리 비율 (0~1)")
+    model: Optional[str] = None
+    max_concurrency: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class BatchListResponse(BaseModel):
+    """배치 목록 응답"""
+    batches: list[BatchResponse]
+    total: int
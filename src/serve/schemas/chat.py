@@ -29,6 +29,7 @@ class MessageResponse(BaseModel):
     model: Optional[str] = None
     tokens_used: Optional[int] = None
     latency_ms: Optional[int] = None
+    ttft_ms: Optional[int] = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -86,6 +87,15 @@ class ChatCompletionRequest(BaseModel):
     # 대화 저장 옵션
     conversation_id: Optional[int] = Field(None, description="기존 대화 ID (연속 대화)")
     save_conversation: bool = Field(True, description="대화 저장 여부")
+    
+    # 서버 측 컨텍스트 조립 옵션
+    use_history: bool = Field(
+        False,
+        description="서버에 저장된 대화 이력과 프리셋으로 컨텍스트 조립 (messages에는 새 메시지만 전달)",
+    )
+    llm_config_id: Optional[int] = Field(
+        None, description="LLM 설정 프리셋 ID (없으면 대화의 프리셋 또는 기본 프리셋)"
+    )
 
 
 class UsageResponse(BaseModel):
@@ -118,6 +128,12 @@ class LLMConfigCreate(BaseModel):
     max_tokens: int = Field(512, ge=1, le=4096)
     top_p: float = Field(0.9, ge=0.0, le=1.0)
     is_default: bool = Field(False, description="기본값 여부")
+    cache_ttl_seconds: Optional[int] = Field(
+        None, ge=0, description="응답 캐시 TTL (초, 없으면 기본값, 0이면 캐시 안 함)"
+    )
+    semantic_cache_threshold: Optional[float] = Field(
+        None, ge=0.0, le=1.0, description="시맨틱 캐시 유사도 임계값 (없으면 기본값)"
+    )
 
 
 class LLMConfigUpdate(BaseModel):
@@ -129,6 +145,8 @@ class LLMConfigUpdate(BaseModel):
     max_tokens: Optional[int] = Field(None, ge=1, le=4096)
     top_p: Optional[float] = Field(None, ge=0.0, le=1.0)
     is_default: Optional[bool] = Field(None, description="기본값 여부")
+    cache_ttl_seconds: Optional[int] = Field(None, ge=0, description="응답 캐시 TTL (초)")
+    semantic_cache_threshold: Optional[float] = Field(None, ge=0.0, le=1.0, description="시맨틱 캐시 유사도 임계값")
 
 
 class LLMConfigResponse(BaseModel):
@@ -141,6 +159,8 @@ class LLMConfigResponse(BaseModel):
     max_tokens: int
     top_p: float
     is_default: bool
+    cache_ttl_seconds: Optional[int] = None
+    semantic_cache_threshold: Optional[float] = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
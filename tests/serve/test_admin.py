@@ -4,12 +4,16 @@ Admin Tests
 SQLAdmin 관리자 인터페이스 테스트
 """
 
+import asyncio
 import re
+import time
 
 import pytest
 from httpx import AsyncClient
 
+from src.serve.admin import views
 from src.serve.admin.auth import create_access_token, verify_token
+from src.serve.admin.views import DashboardCache
 
 
 # ============================================================
@@ -258,6 +262,60 @@ async def test_message_statistics_view_post(client: AsyncClient):
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_dashboard_cache_single_flight_and_ttl():
+    """동시 요청은 한 번만 계산하고, TTL이 지나면 다시 계산"""
+    cache = DashboardCache(ttl=0.05)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(5)))
+    assert results == [1] * 5
+
+    await asyncio.sleep(0.06)
+    assert await cache.get_or_compute("key", compute) == 2
+
+
+@pytest.mark.asyncio
+async def test_dashboards_do_not_block_event_loop(client: AsyncClient, monkeypatch):
+    """대시보드의 느린 psutil 호출은 스레드에서 실행되어 이벤트 루프를 막지 않음"""
+    login_page = await client.get("/admin/login")
+    csrf_token = extract_csrf_token(login_page.text)
+    data = {"username": "admin", "password": "changeme"}
+    if csrf_token:
+        data["csrf_token"] = csrf_token
+    await client.post("/admin/login", data=data, follow_redirects=True)
+
+    slow_collect = views._collect_system_status
+
+    def collect():
+        time.sleep(0.2)
+        return slow_collect()
+
+    monkeypatch.setattr(views, "_collect_system_status", collect)
+    views.dashboard_cache.clear()
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    response = await client.get("/admin/system-status", follow_redirects=True)
+    task.cancel()
+
+    assert response.status_code == 200
+    assert ticks >= 10
+
+
 @pytest.mark.asyncio
 async def test_vllm_status_redirect(client: AsyncClient):
     """vLLM 상태 리다이렉트 테스트"""
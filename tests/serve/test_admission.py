@@ -0,0 +1,165 @@
+"""
+Admission Control Tests
+
+vLLM 앞단 동시 요청 상한 / 우선순위 대기열 테스트
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from src.serve.core.admission import AdmissionController, AdmissionRejected
+from src.serve.main import app
+from src.serve.routers.dependency import get_admission_controller
+
+
+async def drain(controller: AdmissionController, waiters: list[asyncio.Task]) -> None:
+    """대기 중인 요청에 슬롯을 하나씩 배정"""
+    for _ in waiters:
+        await asyncio.sleep(0)
+        controller._release(0.0)
+    await asyncio.gather(*waiters)
+
+
+# ============================================================
+# 컨트롤러 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_admits_up_to_capacity_then_queues():
+    """capacity까지는 즉시 통과, 초과분은 슬롯 반납 시 배정"""
+    controller = AdmissionController(capacity=lambda: 2, max_queue=10, deadline=5.0)
+    first = await controller.acquire("a")
+    await controller.acquire("b")
+
+    waiter = asyncio.create_task(controller.acquire("c"))
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 1
+    assert not waiter.done()
+
+    first.release()
+    first.release()  # 중복 release는 무시
+    await waiter
+    assert controller.in_flight == 2
+    assert controller.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_and_fairness_order():
+    """우선순위가 먼저, 같은 우선순위 안에서는 클라이언트 키별 라운드로빈"""
+    controller = AdmissionController(capacity=lambda: 1, max_queue=10, deadline=5.0)
+    await controller.acquire("holder")
+    order: list[str] = []
+
+    async def request(key: str, priority: int):
+        await controller.acquire(key, priority=priority)
+        order.append(key)
+
+    waiters = []
+    for key, priority in [("heavy", 10), ("heavy", 10), ("heavy", 10), ("light", 10), ("vip", 1)]:
+        waiters.append(asyncio.create_task(request(key, priority)))
+        await asyncio.sleep(0)
+
+    await drain(controller, waiters)
+    assert order == ["vip", "heavy", "light", "heavy", "heavy"]
+
+
+@pytest.mark.asyncio
+async def test_rejects_early_when_deadline_exceeded():
+    """예상 대기 시간이 데드라인을 넘으면 대기하지 않고 429"""
+    controller = AdmissionController(capacity=lambda: 1, max_queue=10, deadline=1.5)
+    await controller.acquire("a")
+    waiter = asyncio.create_task(controller.acquire("b"))  # 예상 대기 1초
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire("c")  # 예상 대기 2초 > 1.5초
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after >= 2
+
+    waiter.cancel()
+
+
+@pytest.mark.asyncio
+async def test_wait_estimate_ignores_lower_priority_waiters():
+    """뒤로 밀릴 배치 대기 요청은 대화형 요청의 예상 대기 시간에 포함하지 않음"""
+    controller = AdmissionController(capacity=lambda: 1, max_queue=10, deadline=1.5)
+    await controller.acquire("holder")
+    batch = [
+        asyncio.create_task(controller.acquire(f"batch-{i}", priority=100, deadline=10.0)) for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 3
+
+    interactive = asyncio.create_task(controller.acquire("user"))  # 앞에 0개 → 예상 1초
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 4
+
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire("other", priority=100)  # 앞에 4개 → 예상 5초
+    assert exc.value.retry_after == 5
+
+    controller._release(0.0)
+    await interactive
+    for task in batch:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_virtual_time_entries_are_pruned():
+    """가상 시계가 지나간 클라이언트 기록은 제거되어 키 수만큼 쌓이지 않음"""
+    controller = AdmissionController(capacity=lambda: 1, max_queue=1000, deadline=1000.0)
+    holder = await controller.acquire("holder")
+    waiters = [asyncio.create_task(controller.acquire(f"client-{i}")) for i in range(200)]
+    await asyncio.sleep(0)
+
+    holder.release()
+    await drain(controller, waiters)
+    assert len(controller._last_virtual) <= 64
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_returns_503():
+    """데드라인 안에 슬롯을 못 받으면 503"""
+    controller = AdmissionController(capacity=lambda: 1, max_queue=10, deadline=0.05)
+    controller._service_time = 0.01
+    await controller.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as exc:
+        await controller.acquire("b")
+    assert exc.value.status_code == 503
+    assert controller.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_unlimited_capacity_bypasses_queue():
+    """capacity 0이면 제한 없음 (발급한 슬롯 수는 계속 셈)"""
+    controller = AdmissionController(capacity=lambda: 0)
+    tickets = [await controller.acquire("a") for _ in range(100)]
+    assert controller.queue_depth == 0
+    assert controller.in_flight == 100
+    for ticket in tickets:
+        ticket.release()
+    assert controller.in_flight == 0
+
+
+# ============================================================
+# API 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_chat_completion_rejected_with_retry_after(client: AsyncClient, mock_llm_client):
+    """포화 상태에서는 vLLM 호출 없이 Retry-After와 함께 거절"""
+    controller = AdmissionController(capacity=lambda: 1, max_queue=0, deadline=1.0)
+    await controller.acquire("busy")
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+
+    response = await client.post(
+        "/v1/chat/completions",
+        json={"messages": [{"role": "user", "content": "안녕"}], "save_conversation": False},
+    )
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    mock_llm_client.chat_completion.assert_not_called()
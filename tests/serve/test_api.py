@@ -4,9 +4,13 @@ API Tests
 FastAPI 엔드포인트 테스트
 """
 
+from datetime import datetime
+
 import pytest
 from httpx import AsyncClient
 
+from src.serve.cruds import chat as crud
+
 
 # ============================================================
 # 공통 엔드포인트 테스트
@@ -129,6 +133,52 @@ async def test_delete_conversation(client: AsyncClient):
     assert get_response.status_code == 404
 
 
+async def collect_pages(client: AsyncClient, url: str, limit: int) -> list[list[dict]]:
+    """X-Next-Cursor를 따라 모든 페이지 조회"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_list_conversations_keyset_pagination(client: AsyncClient):
+    """대화 목록 커서 페이지네이션 (중복/누락 없이 최신순)"""
+    for i in range(5):
+        await client.post("/v1/conversations", json={"title": f"페이지 {i}", "session_id": "keyset"})
+
+    pages = await collect_pages(client, "/v1/conversations?session_id=keyset", limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    titles = [c["title"] for page in pages for c in page]
+    assert titles == [f"페이지 {i}" for i in reversed(range(5))]
+
+
+@pytest.mark.asyncio
+async def test_get_messages_keyset_pagination(client: AsyncClient, test_db):
+    """같은 created_at을 가진 메시지도 id 순으로 이어서 조회"""
+    conversation_id = (await client.post("/v1/conversations", json={})).json()["id"]
+    created_at = datetime.utcnow()
+    await crud.create_messages(test_db, [
+        crud.message_row(conversation_id, "user", f"메시지 {i}", created_at=created_at)
+        for i in range(5)
+    ])
+    await test_db.commit()
+
+    pages = await collect_pages(client, f"/v1/conversations/{conversation_id}/messages", limit=2)
+
+    contents = [m["content"] for page in pages for m in page]
+    assert contents == [f"메시지 {i}" for i in range(5)]
+
+    response = await client.get(f"/v1/conversations/{conversation_id}/messages", params={"cursor": "broken"})
+    assert response.status_code == 400
+
+
 # ============================================================
 # LLM Config 테스트
 # ============================================================
@@ -214,3 +264,40 @@ async def test_chat_completion_without_save(client: AsyncClient):
 
     data = response.json()
     assert data["conversation_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_stream_persists_messages(client: AsyncClient, mock_llm_client):
+    """스트리밍 종료 후 메시지 저장 및 TTFT 기록 테스트"""
+    import json
+
+    def event(data: dict) -> bytes:
+        return f"data: {json.dumps(data)}\n\n".encode()
+
+    async def fake_stream(**kwargs):
+        for token in ["안녕", "하세요"]:
+            yield event({"model": "test-model", "choices": [{"delta": {"content": token}}]})
+        yield event({"model": "test-model", "choices": [], "usage": {"total_tokens": 12}})
+        yield b"data: [DONE]\n\n"
+
+    mock_llm_client.chat_completion_stream = fake_stream
+
+    response = await client.post(
+        "/v1/chat/completions",
+        json={
+            "messages": [{"role": "user", "content": "스트리밍 테스트"}],
+            "stream": True,
+        }
+    )
+    assert response.status_code == 200
+    assert response.text.endswith("data: [DONE]\n\n")
+    assert response.text.count("[DONE]") == 1
+
+    match = [line for line in response.text.splitlines() if "conversation_id" in line]
+    conversation_id = json.loads(match[0][len("data: "):])["conversation_id"]
+
+    messages = (await client.get(f"/v1/conversations/{conversation_id}/messages")).json()
+    assert [m["role"] for m in messages] == ["user", "assistant"]
+    assert messages[1]["content"] == "안녕하세요"
+    assert messages[1]["tokens_used"] == 12
+    assert messages[1]["ttft_ms"] is not None
@@ -0,0 +1,209 @@
+"""
+Archive Tests
+
+유휴 대화 아카이브 및 조회 시 복원 테스트
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from src.serve.core import archive as archive_module
+from src.serve.core.archive import ConversationArchiver
+from src.serve.core.config import settings
+from src.serve.cruds import chat as crud
+from src.serve.database import async_session_maker
+from src.serve.models.chat import ChatMessage, Conversation
+
+
+@pytest.fixture
+def archive_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path))
+    archive_module._read_archive.cache_clear()
+    return tmp_path
+
+
+async def create_idle_conversation(last_active: datetime, messages: int = 3) -> int:
+    """last_active 시점 이후 활동이 없는 대화 생성"""
+    async with async_session_maker() as session, session.begin():
+        conversation = Conversation(title="오래된 대화", session_id="archive-test")
+        session.add(conversation)
+        await session.flush()
+        for i in range(messages):
+            session.add(ChatMessage(
+                conversation_id=conversation.id,
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"메시지 {i}",
+                created_at=last_active - timedelta(minutes=messages - i),
+            ))
+        await session.flush()
+        await session.execute(
+            update(Conversation).where(Conversation.id == conversation.id).values(updated_at=last_active)
+        )
+        return conversation.id
+
+
+async def count_messages(conversation_id: int) -> int:
+    async with async_session_maker() as session:
+        return (await session.execute(
+            select(func.count()).where(ChatMessage.conversation_id == conversation_id)
+        )).scalar()
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_messages_and_hydrates_on_read(archive_root, client):
+    """유휴 대화는 파일로 이동하고 stub 행만 남으며, 조회 API는 아카이브에서 메시지를 복원"""
+    now = datetime.utcnow()
+    idle_id = await create_idle_conversation(now - timedelta(days=45))
+    active_id = await create_idle_conversation(now - timedelta(days=1))
+
+    archiver = ConversationArchiver(idle_days=30, batch_size=1)
+    assert await archiver.archive_idle(now) >= 1
+
+    async with async_session_maker() as session:
+        idle = await session.get(Conversation, idle_id)
+        active = await session.get(Conversation, active_id)
+    assert idle.archived_at is not None
+    assert idle.archive_path.startswith((now - timedelta(days=45)).strftime("%Y-%m-%d"))
+    assert (archive_root / idle.archive_path).exists()
+    assert active.archived_at is None
+    assert await count_messages(idle_id) == 0
+    assert await count_messages(active_id) == 3
+
+    response = await client.get(f"/v1/conversations/{idle_id}")
+    assert response.status_code == 200
+    assert [m["content"] for m in response.json()["messages"]] == ["메시지 0", "메시지 1", "메시지 2"]
+
+    page = await client.get(f"/v1/conversations/{idle_id}/messages", params={"limit": 2})
+    assert [m["content"] for m in page.json()] == ["메시지 0", "메시지 1"]
+    rest = await client.get(
+        f"/v1/conversations/{idle_id}/messages",
+        params={"limit": 2, "cursor": page.headers["X-Next-Cursor"]},
+    )
+    assert [m["content"] for m in rest.json()] == ["메시지 2"]
+
+    # 복원한 메시지가 다시 저장되지 않음
+    assert await count_messages(idle_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_archive_gzip_fallback(archive_root, monkeypatch):
+    """zstandard가 없으면 gzip JSONL로 기록하고 읽기"""
+    monkeypatch.setattr(archive_module, "zstandard", None)
+    now = datetime.utcnow()
+    conversation_id = await create_idle_conversation(now - timedelta(days=90), messages=2)
+
+    await ConversationArchiver(idle_days=30).archive_idle(now)
+
+    async with async_session_maker() as session:
+        conversation = await session.get(Conversation, conversation_id)
+    assert conversation.archive_path.endswith(".jsonl.gz")
+    messages = await archive_module.load_archived_messages(conversation.archive_path, conversation_id)
+    assert [m.content for m in messages] == ["메시지 0", "메시지 1"]
+
+
+@pytest.mark.asyncio
+async def test_delete_purges_archived_messages(archive_root, client, test_db):
+    """아카이브된 대화를 삭제하면 파일에서도 메시지가 제거되고, 같은 파일의 다른 대화는 유지"""
+    now = datetime.utcnow()
+    deleted_id = await create_idle_conversation(now - timedelta(days=60))
+    kept_id = await create_idle_conversation(now - timedelta(days=60), messages=2)
+    await ConversationArchiver(idle_days=30).archive_idle(now)
+
+    async with async_session_maker() as session:
+        deleted = await session.get(Conversation, deleted_id)
+        kept = await session.get(Conversation, kept_id)
+    assert deleted.archive_path == kept.archive_path
+    assert len(await archive_module.load_archived_messages(deleted.archive_path, deleted_id)) == 3
+
+    response = await client.delete(f"/v1/conversations/{deleted_id}")
+    assert response.status_code == 204
+    assert len(await archive_module.load_archived_messages(deleted.archive_path, deleted_id)) == 3  # 커밋 전
+    await test_db.commit()  # get_db가 요청 끝에 커밋 (테스트 override는 커밋하지 않음)
+    await archive_module.wait_purges()
+
+    assert await archive_module.load_archived_messages(deleted.archive_path, deleted_id) == []
+    assert archive_module._load_archive(str(archive_root / deleted.archive_path)).keys() == {kept_id}
+    messages = await archive_module.load_archived_messages(kept.archive_path, kept_id)
+    assert [m.content for m in messages] == ["메시지 0", "메시지 1"]
+
+
+@pytest.mark.asyncio
+async def test_rearchive_after_new_activity(archive_root):
+    """아카이브 후 새 메시지가 온 대화는 다시 유휴가 되면 이전 아카이브와 합쳐 새 파일로 이동"""
+    now = datetime.utcnow()
+    conversation_id = await create_idle_conversation(now - timedelta(days=120), messages=2)
+    archiver = ConversationArchiver(idle_days=30)
+    await archiver.archive_idle(now - timedelta(days=80))
+
+    async with async_session_maker() as session, session.begin():
+        first = await session.get(Conversation, conversation_id)
+        first_path = first.archive_path
+        session.add(ChatMessage(
+            conversation_id=conversation_id, role="user", content="복귀", created_at=now - timedelta(days=40),
+        ))
+        first.updated_at = now - timedelta(days=40)  # 아카이브(80일 전) 이후 활동
+
+    assert await archiver.archive_idle(now) >= 1
+
+    async with async_session_maker() as session:
+        conversation = await session.get(Conversation, conversation_id)
+    assert conversation.archive_path != first_path
+    assert await count_messages(conversation_id) == 0
+    messages = await archive_module.load_archived_messages(conversation.archive_path, conversation_id)
+    assert [m.content for m in messages] == ["메시지 0", "메시지 1", "복귀"]
+    assert not (archive_root / first_path).exists()  # 다른 대화가 없던 이전 파일은 삭제
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_delete_keeps_archive(archive_root):
+    """삭제가 커밋되지 않으면 아카이브 파일의 메시지도 그대로 유지"""
+    now = datetime.utcnow()
+    conversation_id = await create_idle_conversation(now - timedelta(days=60))
+    await ConversationArchiver(idle_days=30).archive_idle(now)
+
+    async with async_session_maker() as session:
+        assert await crud.delete_conversation(session, conversation_id)
+        await session.flush()
+        await session.rollback()
+    await archive_module.wait_purges()
+
+    async with async_session_maker() as session:
+        conversation = await session.get(Conversation, conversation_id)
+    assert conversation is not None
+    assert len(await archive_module.load_archived_messages(conversation.archive_path, conversation_id)) == 3
+
+
+@pytest.mark.asyncio
+async def test_delete_during_rearchive_leaves_no_copy(archive_root):
+    """재아카이브가 파일을 쓰는 동안 삭제된 대화는 새 파일에도 남지 않음"""
+    now = datetime.utcnow()
+    conversation_id = await create_idle_conversation(now - timedelta(days=120))
+    await ConversationArchiver(idle_days=30).archive_idle(now - timedelta(days=80))
+    async with async_session_maker() as session, session.begin():
+        conversation = await session.get(Conversation, conversation_id)
+        session.add(ChatMessage(
+            conversation_id=conversation_id, role="user", content="복귀", created_at=now - timedelta(days=40),
+        ))
+        conversation.updated_at = now - timedelta(days=40)
+
+    sessions = []
+
+    @asynccontextmanager
+    async def delete_before_stamp():
+        """두 번째 세션(새 파일 작성 후 UPDATE) 직전에 대화 삭제"""
+        sessions.append(True)
+        if len(sessions) == 2:
+            async with async_session_maker() as session, session.begin():
+                await crud.delete_conversation(session, conversation_id)
+            await archive_module.wait_purges()
+        async with async_session_maker() as session:
+            yield session
+
+    archived = await ConversationArchiver(idle_days=30, session_maker=delete_before_stamp).archive_idle(now)
+
+    assert archived == 0 and len(sessions) >= 2
+    for path in archive_root.rglob("conversations-*"):
+        assert conversation_id not in archive_module._load_archive(str(path))
@@ -0,0 +1,170 @@
+"""
+Batch Tests
+
+배치 완성 (/v1/batches) 테스트
+"""
+
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from src.serve.core.admission import AdmissionController
+from src.serve.core.batch import BatchJob, BatchManager, parse_batch_input
+from src.serve.core.tracing import current_trace
+from src.serve.main import app
+from src.serve.routers.dependency import get_batch_manager
+
+
+def make_jsonl(*rows: dict) -> bytes:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+async def wait_for_batch(manager: BatchManager, batch_id: str) -> None:
+    """배치 태스크 종료 대기"""
+    for _ in range(200):
+        if not manager.is_running(batch_id):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("batch did not finish")
+
+
+# ============================================================
+# 입력 파싱 테스트
+# ============================================================
+
+def test_parse_batch_input_shapes():
+    """문자열 body는 user 메시지로, 객체 body는 채팅 완성 요청으로 해석"""
+    requests = parse_batch_input(make_jsonl(
+        {"request_id": "a", "title": "제목", "body": "MLflow란?"},
+        {"request_id": "b", "body": {"messages": [{"role": "user", "content": "hi"}], "temperature": 0}},
+    ))
+
+    assert requests[0] == ("a", {"messages": [{"role": "user", "content": "MLflow란?"}]})
+    assert requests[1][1]["temperature"] == 0
+
+
+def test_parse_batch_input_reports_line_number():
+    """형식 오류/중복 request_id는 행 번호와 함께 거절"""
+    with pytest.raises(ValueError, match="line 2"):
+        parse_batch_input(make_jsonl({"request_id": "a", "body": "x"}, {"body": "y"}))
+    with pytest.raises(ValueError, match="duplicate"):
+        parse_batch_input(make_jsonl({"request_id": "a", "body": "x"}, {"request_id": "a", "body": "y"}))
+
+
+# ============================================================
+# 실행/재개 테스트
+# ============================================================
+
+class EchoClient:
+    """프롬프트를 그대로 돌려주는 LLM 스텁"""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    async def chat_completion(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        await asyncio.sleep(0)
+        return {"content": messages[-1]["content"], "model": "echo", "usage": {}, "finish_reason": "stop"}
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_recorded_requests(tmp_path):
+    """재시작 시 output.jsonl에 기록된 요청은 건너뛰고 잘린 마지막 행은 다시 실행"""
+    job = BatchJob(id="batch_resume", directory=tmp_path / "batch_resume", total=3, status="running")
+    job.directory.mkdir()
+    job.input_path.write_bytes(make_jsonl(
+        {"request_id": "1", "body": "one"},
+        {"request_id": "2", "body": "two"},
+        {"request_id": "3", "body": "three"},
+    ))
+    job.output_path.write_text(
+        json.dumps({"request_id": "1", "status": "completed", "response": {}}) + "\n"
+        + '{"request_id": "2", "sta',
+        encoding="utf-8",
+    )
+    job.save()
+
+    manager = BatchManager(root=str(tmp_path))
+    llm = EchoClient()
+    await manager.start(llm, AdmissionController(capacity=lambda: 0))
+    await wait_for_batch(manager, "batch_resume")
+
+    resumed = manager.get("batch_resume")
+    assert sorted(llm.prompts) == ["three", "two"]
+    assert resumed.status == "completed"
+    assert resumed.completed == 3
+    rows = [json.loads(line) for line in resumed.output_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["request_id"] for r in rows) == ["1", "2", "3"]
+
+
+# ============================================================
+# API 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_batch_api_lifecycle(client: AsyncClient, mock_llm_client, tmp_path):
+    """업로드 → 진행 상황 조회 → 결과 다운로드"""
+    manager = BatchManager(root=str(tmp_path))
+    app.dependency_overrides[get_batch_manager] = lambda: manager
+    content = make_jsonl(*({"request_id": f"r{i}", "body": f"질문 {i}"} for i in range(10)))
+
+    response = await client.post(
+        "/v1/batches",
+        files={"file": ("requests.jsonl", content, "application/x-ndjson")},
+        data={"max_concurrency": "4"},
+    )
+    assert response.status_code == 202
+    batch_id = response.json()["id"]
+    assert response.json()["total"] == 10
+
+    await wait_for_batch(manager, batch_id)
+    progress = (await client.get(f"/v1/batches/{batch_id}")).json()
+    assert progress["status"] == "completed"
+    assert progress["progress"] == 1.0
+    assert mock_llm_client.chat_completion.await_count == 10
+
+    output = await client.get(f"/v1/batches/{batch_id}/output")
+    rows = [json.loads(line) for line in output.text.splitlines()]
+    assert len(rows) == 10
+    assert all(r["response"]["content"] == "테스트 응답입니다." for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_batch_does_not_inherit_request_trace(client: AsyncClient, mock_llm_client, tmp_path):
+    """POST /v1/batches에서 시작한 배치 실행은 이미 끝난 요청 트레이스에 span을 붙이지 않음"""
+    manager = BatchManager(root=str(tmp_path))
+    app.dependency_overrides[get_batch_manager] = lambda: manager
+    traces = []
+    response = mock_llm_client.chat_completion.return_value
+
+    async def record_trace(**kwargs):
+        traces.append(current_trace())
+        return response
+
+    mock_llm_client.chat_completion.side_effect = record_trace
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    created = await client.post(
+        "/v1/batches",
+        files={"file": ("requests.jsonl", make_jsonl({"request_id": "a", "body": "질문"}), "application/x-ndjson")},
+        headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+    assert created.status_code == 202
+    await wait_for_batch(manager, created.json()["id"])
+
+    assert traces == [None]
+
+
+@pytest.mark.asyncio
+async def test_batch_api_rejects_invalid_jsonl(client: AsyncClient, tmp_path):
+    """잘못된 입력은 400"""
+    app.dependency_overrides[get_batch_manager] = lambda: BatchManager(root=str(tmp_path))
+
+    response = await client.post(
+        "/v1/batches",
+        files={"file": ("requests.jsonl", b'{"request_id": "a"}\n', "application/x-ndjson")},
+    )
+
+    assert response.status_code == 400
+    assert "line 1" in response.json()["detail"]
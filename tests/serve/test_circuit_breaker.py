@@ -0,0 +1,133 @@
+"""
+Circuit Breaker Tests
+
+백엔드별 서킷 브레이커 및 LLMClient 빠른 실패 테스트
+"""
+
+import httpx
+import pytest
+
+from src.serve.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from src.serve.core.llm import LLMClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock, **kwargs) -> CircuitBreaker:
+    options = dict(window=30.0, min_requests=4, error_rate=0.5, p99_latency=0.0, open_seconds=10.0, enabled=True)
+    options.update(kwargs)
+    return CircuitBreaker("test", clock=clock, **options)
+
+
+def make_client(handler) -> LLMClient:
+    """MockTransport로 upstream을 대체한 LLMClient"""
+    client = LLMClient(base_url="http://vllm.test/v1", name="test")
+    client.breaker = CircuitBreaker("test", min_requests=4, open_seconds=10.0, enabled=True)
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+# ============================================================
+# 상태 전이 테스트
+# ============================================================
+
+def test_opens_on_error_rate_and_recovers_via_probe():
+    """에러율 초과 시 open → open_seconds 후 probe 1건 → 성공하면 closed"""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(2):
+        breaker.record_success(0.1)
+        breaker.record_failure(0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    clock.now += 10.0
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False  # probe는 1건만
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    """half-open probe 실패 시 다시 open"""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_failure(fatal=True)
+    clock.now += 10.0
+    assert breaker.allow() is True
+
+    breaker.record_failure(0.1)
+    assert breaker.state == OPEN
+    assert breaker.retry_after == pytest.approx(10.0)
+
+
+def test_opens_on_p99_latency():
+    """p99 지연이 임계값을 넘으면 포화로 판단해 open"""
+    clock = FakeClock()
+    breaker = make_breaker(clock, p99_latency=5.0)
+    for _ in range(4):
+        breaker.record_success(8.0)
+
+    assert breaker.state == OPEN
+
+
+def test_old_samples_leave_window():
+    """window 밖의 실패는 에러율에서 제외"""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_failure(0.1)
+    breaker.record_failure(0.1)
+    clock.now += 31.0
+    for _ in range(4):
+        breaker.record_success(0.1)
+
+    assert breaker.state == CLOSED
+
+
+# ============================================================
+# LLMClient 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_connect_error_fails_fast():
+    """연결 실패 후에는 upstream 호출 없이 즉시 에러 반환"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = make_client(handler)
+    first = await client.chat_completion(messages=[{"role": "user", "content": "hi"}])
+    second = await client.chat_completion(messages=[{"role": "user", "content": "hi"}])
+
+    assert "error" in first
+    assert second["retry_after"] >= 1
+    assert len(calls) == 1
+    assert await client.health_check() is False
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_models_list_cached_for_health_check():
+    """health_check와 list_models는 /models 조회를 공유"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"data": [{"id": "test-model"}]})
+
+    client = make_client(handler)
+    assert await client.health_check() is True
+    assert await client.list_models() == ["test-model"]
+    assert len(calls) == 1
+    await client.close()
@@ -0,0 +1,142 @@
+"""
+Context Window Tests
+
+서버 측 대화 이력 조립 테스트
+"""
+
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from src.serve.core import tokenizer as tokenizer_module
+from src.serve.core.config import settings
+from src.serve.core.context import build_context
+from src.serve.core.tokenizer import count_message_tokens, count_tokens, load_tokenizer
+
+
+# ============================================================
+# build_context 유닛 테스트
+# ============================================================
+
+def test_build_context_order():
+    """system → few-shot → history → 새 메시지 순서로 조립"""
+    context = build_context(
+        [{"role": "user", "content": "new"}],
+        history=[{"role": "user", "content": "old"}, {"role": "assistant", "content": "old-answer"}],
+        system_prompt="system",
+        fewshot=[{"role": "user", "content": "shot"}, {"role": "assistant", "content": "shot-answer"}],
+    )
+    assert [m["content"] for m in context] == ["system", "shot", "shot-answer", "old", "old-answer", "new"]
+
+
+def test_build_context_trims_oldest_turns():
+    """예산 초과 시 가장 오래된 턴부터 제거"""
+    history = []
+    for i in range(10):
+        history.append({"role": "user", "content": f"question {i} " * 20})
+        history.append({"role": "assistant", "content": f"answer {i} " * 20})
+    new = [{"role": "user", "content": "latest"}]
+
+    context = build_context(new, history=history, system_prompt="system", budget=200)
+
+    assert count_message_tokens(context) <= 200
+    assert context[0]["content"] == "system"
+    assert context[-1]["content"] == "latest"
+    assert context[1]["role"] == "user"
+    assert context[-2]["content"] == history[-1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_tokenizer_loads_off_event_loop(monkeypatch):
+    """토크나이저는 워커 스레드에서 로딩하고, 로딩 전 count_tokens는 로딩 없이 근사치 사용"""
+    threads = []
+
+    class FakeTokenizer:
+        def encode(self, text, add_special_tokens=False):
+            return text.split()
+
+    class FakeAutoTokenizer:
+        @staticmethod
+        def from_pretrained(name, token=None):
+            threads.append(threading.current_thread())
+            return FakeTokenizer()
+
+    monkeypatch.setattr(tokenizer_module, "AutoTokenizer", FakeAutoTokenizer)
+    monkeypatch.setattr(tokenizer_module, "_tokenizer", None)
+    monkeypatch.setattr(settings, "tokenizer_name", "fake/tokenizer")
+    tokenizer_module.get_tokenizer.cache_clear()
+    try:
+        assert count_tokens("one two three four five") == 6  # 23바이트 근사
+        assert threads == []
+
+        await load_tokenizer()
+        assert threads and threads[0] is not threading.main_thread()
+        assert count_tokens("one two three four five") == 5
+    finally:
+        tokenizer_module.get_tokenizer.cache_clear()
+
+
+# ============================================================
+# API 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_chat_completion_use_history(client: AsyncClient, mock_llm_client):
+    """use_history=True 시 저장된 이력과 프리셋으로 컨텍스트 조립"""
+    config = (await client.post(
+        "/v1/llm-configs",
+        json={"name": "history-preset", "model_name": "preset-model", "system_prompt": "You are an MLOps expert."},
+    )).json()
+    conversation = (await client.post(
+        "/v1/conversations", json={"title": "이력 테스트", "llm_config_id": config["id"]}
+    )).json()
+
+    first = await client.post(
+        "/v1/chat/completions",
+        json={"messages": [{"role": "user", "content": "첫 질문"}], "conversation_id": conversation["id"]},
+    )
+    assert first.status_code == 200
+
+    second = await client.post(
+        "/v1/chat/completions",
+        json={
+            "messages": [{"role": "user", "content": "두 번째 질문"}],
+            "conversation_id": conversation["id"],
+            "use_history": True,
+        },
+    )
+    assert second.status_code == 200
+
+    kwargs = mock_llm_client.chat_completion.call_args.kwargs
+    assert kwargs["model"] == "preset-model"
+    assert [m["content"] for m in kwargs["messages"]] == [
+        "You are an MLOps expert.",
+        "첫 질문",
+        "테스트 응답입니다.",
+        "두 번째 질문",
+    ]
+
+
+# ============================================================
+# 프리셋 캐시 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_preset_cache_invalidated_on_update(client: AsyncClient, test_db):
+    """LLM 설정 수정 시 캐시된 프리셋 무효화"""
+    from src.serve.core.preset_cache import preset_cache
+
+    config = (await client.post(
+        "/v1/llm-configs",
+        json={"name": "cached-preset", "model_name": "model-a", "system_prompt": "v1"},
+    )).json()
+
+    cached = await preset_cache.get(test_db, config["id"])
+    assert cached.system_prompt == "v1"
+    assert await preset_cache.get(test_db, config["id"]) is cached
+
+    await client.put(f"/v1/llm-configs/{config['id']}", json={"system_prompt": "v2"})
+
+    refreshed = await preset_cache.get(test_db, config["id"])
+    assert refreshed.system_prompt == "v2"
@@ -0,0 +1,67 @@
+"""
+Database Tests
+
+엔진 프로필 (SQLite WAL, 쓰기 직렬화, 풀 메트릭) 테스트
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text
+
+from src.serve import database
+from src.serve.core.metrics import DB_CONNECTIONS_ACTIVE
+from src.serve.database import async_session_maker, sqlite_write_lock
+from src.serve.main import app  # noqa: F401  (풀 메트릭 계측)
+from src.serve.models.chat import Conversation
+
+
+@pytest.mark.asyncio
+async def test_sqlite_connection_pragmas():
+    """SQLite 연결은 WAL + synchronous=NORMAL"""
+    async with async_session_maker() as session:
+        assert (await session.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await session.execute(text("PRAGMA synchronous"))).scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_serialized():
+    """동시 쓰기 트랜잭션이 잠금 오류 없이 하나씩 커밋되고 락과 풀 게이지가 원상 복구"""
+    active = DB_CONNECTIONS_ACTIVE._value.get()
+    max_writers = 0
+    writers = 0
+
+    async def write(i: int) -> None:
+        nonlocal writers, max_writers
+        async with async_session_maker() as session:
+            session.add(Conversation(title=f"동시 쓰기 {i}", session_id="serialized"))
+            await session.flush()
+            writers += 1
+            max_writers = max(max_writers, writers)
+            await asyncio.sleep(0.001)  # 다른 세션이 끼어들 기회
+            writers -= 1
+            await session.commit()
+
+    await asyncio.gather(*(write(i) for i in range(20)))
+
+    async with async_session_maker() as session:
+        count = await session.scalar(
+            select(func.count(Conversation.id)).where(Conversation.session_id == "serialized")
+        )
+    assert count == 20
+    assert max_writers == 1
+    assert not sqlite_write_lock.locked()
+    assert DB_CONNECTIONS_ACTIVE._value.get() == active
+
+
+def test_postgres_engine_options(monkeypatch):
+    """PostgreSQL 프로필은 명시적 풀 설정과 statement 캐시 사용"""
+    monkeypatch.setattr(database, "IS_POSTGRES", True)
+
+    options = database.get_engine_options()
+
+    assert options["pool_size"] == database.DB_POOL_SIZE
+    assert options["max_overflow"] == database.DB_MAX_OVERFLOW
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["prepared_statement_cache_size"] == database.DB_STATEMENT_CACHE_SIZE
+    assert "connect_args" not in database.get_engine_options(sync=True)
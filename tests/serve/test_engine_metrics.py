@@ -0,0 +1,198 @@
+"""
+Engine Metrics Tests
+
+vLLM /metrics 파싱, 백엔드별 스크랩, 포화 기반 라우팅/어드미션 테스트
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.serve.core.admission import AdmissionController
+from src.serve.core.config import settings
+from src.serve.core.engine_metrics import EngineMetricsScraper, apply_engine_stats, parse_engine_metrics
+from src.serve.core.llm import metrics_url
+from src.serve.core.llm_router import LLMRouter
+from src.serve.core.metrics import LLM_BACKEND_KV_CACHE_USAGE, LLM_BACKEND_SCRAPE_ERRORS_TOTAL
+from src.serve.models.llm import LLMModel
+
+V0_METRICS = """\
+# HELP vllm:num_requests_running Number of requests currently running on GPU.
+# TYPE vllm:num_requests_running gauge
+vllm:num_requests_running{model_name="llama"} 3.0
+vllm:num_requests_waiting{model_name="llama"} 2.0
+vllm:gpu_cache_usage_perc{model_name="llama"} 0.42
+vllm:gpu_prefix_cache_hit_rate{model_name="llama"} 0.25
+vllm:time_to_first_token_seconds_bucket{le="0.1",model_name="llama"} 7.0
+"""
+
+
+def v1_metrics(running: int, waiting: int, kv: float, queries: int, hits: int) -> str:
+    return (
+        '# TYPE vllm:num_requests_running gauge\n'
+        f'vllm:num_requests_running{{engine="0",model_name="qwen"}} {running}.0\n'
+        f'vllm:num_requests_waiting{{engine="0",model_name="qwen"}} {waiting}.0\n'
+        f'vllm:kv_cache_usage_perc{{engine="0",model_name="qwen"}} {kv}\n'
+        f'vllm:prefix_cache_queries_total{{engine="0",model_name="qwen"}} {queries}.0\n'
+        f'vllm:prefix_cache_hits_total{{engine="0",model_name="qwen"}} {hits}.0\n'
+        f'vllm:prefix_cache_hits_created{{engine="0",model_name="qwen"}} 1.7e9\n'
+    )
+
+
+def make_model(id: int, name: str, api_url: str) -> LLMModel:
+    return LLMModel(id=id, name=name, api_url=api_url, max_tokens_limit=4096, is_active=True)
+
+
+def scraped(running: int, waiting: int, kv: float = 0.5):
+    """방금 스크랩한 엔진 지표"""
+    stats = parse_engine_metrics(v1_metrics(running, waiting, kv, 0, 0))
+    stats.scraped_at = time.monotonic()
+    return stats
+
+
+def test_parse_v0_and_v1_metric_names():
+    stats = parse_engine_metrics(V0_METRICS)
+    assert (stats.running, stats.waiting, stats.kv_cache_usage) == (3, 2, 0.42)
+    assert stats.prefix_cache_hit_rate == 0.25
+
+    stats = parse_engine_metrics(v1_metrics(5, 0, 0.8, 1000, 600))
+    assert (stats.running, stats.waiting, stats.kv_cache_usage) == (5, 0, 0.8)
+    assert stats.prefix_cache_hit_rate is None
+    assert (stats.prefix_cache_queries, stats.prefix_cache_hits) == (1000, 600)
+    assert metrics_url("http://gpu0:8000/v1/") == "http://gpu0:8000/metrics"
+
+
+def test_saturation_tolerates_normal_waiting():
+    """정상 배칭 수준의 대기 시퀀스는 포화가 아님 (실행 시퀀스 수에 비례한 기준)"""
+    assert not scraped(running=2, waiting=settings.engine_max_waiting).saturated
+    assert not scraped(running=40, waiting=15).saturated
+    assert scraped(running=40, waiting=25).saturated
+    assert scraped(running=2, waiting=0, kv=0.99).saturated
+
+
+@pytest.mark.asyncio
+async def test_scraper_updates_backends_and_admission(monkeypatch):
+    """스크랩 결과를 백엔드와 게이지에 반영하고, 실패한 백엔드는 에러만 기록"""
+    responses = {
+        "gpu0": [v1_metrics(4, 3, 0.97, 1000, 100), v1_metrics(4, 3, 0.97, 1400, 400)],
+        "gpu1": [v1_metrics(1, 0, 0.30, 0, 0), v1_metrics(1, 0, 0.30, 0, 0)],
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/metrics"
+        if request.url.host == "gpu2":
+            return httpx.Response(503)
+        return httpx.Response(200, text=responses[request.url.host].pop(0))
+
+    router = LLMRouter()
+    router.max_in_flight = 8
+    await router.apply([
+        make_model(1, "engine-a", "http://gpu0:8000/v1"),
+        make_model(2, "engine-b", "http://gpu1:8000/v1"),
+        make_model(3, "engine-c", "http://gpu2:8000/v1"),
+    ])
+    for backend in router.backends:
+        backend.client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    a, b, c = router.backends
+    a.in_flight = 2
+
+    admission = AdmissionController(capacity=lambda: router.capacity)
+    notified = []
+    admission.notify = lambda: notified.append(True)
+    errors = LLM_BACKEND_SCRAPE_ERRORS_TOTAL.labels(backend="engine-c")._value.get()
+
+    monkeypatch.setattr(settings, "engine_metrics_enabled", False)  # 주기 스크랩 없이 직접 호출
+    monkeypatch.setattr(settings, "engine_saturation_admission", True)
+    scraper = EngineMetricsScraper()
+    await scraper.start(router, admission)
+    await scraper.scrape()
+    await scraper.scrape()
+
+    assert a.saturated and not b.saturated and c.engine is None
+    assert a.engine.prefix_cache_hit_rate == 0.75  # (400-100) / (1400-1000)
+    assert LLM_BACKEND_KV_CACHE_USAGE.labels(backend="engine-a")._value.get() == 0.97
+    assert LLM_BACKEND_SCRAPE_ERRORS_TOTAL.labels(backend="engine-c")._value.get() == errors + 2
+    assert notified == [True, True]
+
+    # 포화 백엔드는 진행 중 요청 수만큼만 용량 인정, 선택 후순위
+    assert router.capacity == 2 + 8 + 8
+    assert router.pick() is not a
+
+    # 기본값(opt-in 꺼짐)이면 포화는 선택 순서에만 반영
+    monkeypatch.setattr(settings, "engine_saturation_admission", False)
+    apply_engine_stats(a, a.engine)
+    assert a.held is None and router.capacity == 8 * 3
+    assert router.pick() is not a
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_pick_uses_engine_load_and_unlimited_capacity(monkeypatch):
+    """엔진 부하(실행+대기, 스크랩 후 보낸 요청 보정) 기준 선택, 상한이 없으면 모두 포화일 때만 제한"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "engine-a", "http://gpu0:8000/v1"),
+        make_model(2, "engine-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+    monkeypatch.setattr(settings, "engine_saturation_admission", True)
+    apply_engine_stats(a, scraped(6, 0))
+    apply_engine_stats(b, scraped(2, 0))
+
+    assert router.pick() is b
+    b.in_flight = 5  # 스크랩 이후 b로 5개 전송 → 예상 부하 7
+    assert router.pick() is a
+    assert router.capacity == 0
+
+    apply_engine_stats(a, scraped(6, 5))
+    apply_engine_stats(b, scraped(2, 5))
+    assert router.capacity == 1 + 5
+    b.in_flight = 9  # 읽기만으로 고정 용량이 바뀌지 않음
+    assert router.capacity == 1 + 5 and b.held == 5
+    a.engine.scraped_at -= 3600  # 오래된 지표는 무시
+    assert not a.saturated and router.capacity == 0
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_saturation_during_unlimited_requests_throttles_admission(monkeypatch):
+    """무제한일 때 진행 중이던 요청이 있는 상태에서 포화되면 새 요청은 슬롯이 반납될 때까지 대기"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "engine-a", "http://gpu0:8000/v1"),
+        make_model(2, "engine-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+    admission = AdmissionController(capacity=lambda: router.capacity, deadline=60.0)
+    monkeypatch.setattr(settings, "engine_saturation_admission", True)
+
+    tickets = []
+    for backend in (a, a, b):
+        tickets.append(await admission.acquire("user"))
+        router._acquire(backend)
+    router._acquire(b)  # 헤지 요청 (어드미션 슬롯 없이 백엔드에만 집계)
+    assert router.capacity == 0 and admission.in_flight == 3
+
+    for backend in (a, b):
+        apply_engine_stats(backend, scraped(8, 3, kv=0.99))
+    assert router.capacity == 2 + 2
+
+    admitted = await admission.acquire("user")  # 헤지 요청 몫 1개까지는 통과
+    router._acquire(a)
+    waiter = asyncio.create_task(admission.acquire("user"))
+    await asyncio.sleep(0)
+    assert not waiter.done() and admission.queue_depth == 1
+    assert router.capacity == 4  # 새로 배정한 요청만큼 용량이 늘어나지 않음
+
+    tickets[0].release()
+    router._release(a)
+    await asyncio.wait_for(waiter, 1)
+    assert admission.in_flight == 4
+
+    for backend in (a, b):
+        apply_engine_stats(backend, scraped(8, 0))
+    assert router.capacity == 0 and a.held is None
+    admitted.release()
+    await router.close()
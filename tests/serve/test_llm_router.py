@@ -0,0 +1,351 @@
+"""
+LLM Router Tests
+
+llm_models 테이블 기반 멀티 엔드포인트 라우팅 테스트
+"""
+
+import asyncio
+
+import pytest
+
+from src.serve.core.admission import AdmissionController
+from src.serve.core.circuit_breaker import CircuitBreaker
+from src.serve.core.config import settings
+from src.serve.core.llm_router import LLMRouter
+from src.serve.core.metrics import LLM_COALESCED_REQUESTS_TOTAL, LLM_TIME_TO_FIRST_TOKEN_SECONDS, LLM_TOKENS_GENERATED
+from src.serve.main import app
+from src.serve.models.llm import LLMModel
+from src.serve.routers.dependency import get_llm_client
+
+
+def make_model(id: int, name: str, api_url: str, api_key: str | None = None) -> LLMModel:
+    """테스트용 LLMModel 행 생성"""
+    return LLMModel(id=id, name=name, api_url=api_url, api_key=api_key, max_tokens_limit=4096, is_active=True)
+
+
+# ============================================================
+# 백엔드 동기화 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_default_backend_when_table_empty():
+    """llm_models 행이 없으면 settings.vllm_base_url 기본 백엔드 사용"""
+    router = LLMRouter()
+    await router.apply([])
+
+    assert len(router.backends) == 1
+    assert router.backends[0].id is None
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_apply_reuses_unchanged_backend():
+    """URL/API 키가 같으면 기존 클라이언트 재사용, 바뀌면 교체"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "replica-a", "http://gpu0:8000/v1"),
+        make_model(2, "replica-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+
+    await router.apply([
+        make_model(1, "replica-a", "http://gpu0:8000/v1"),
+        make_model(2, "replica-b", "http://gpu1:8001/v1"),
+    ])
+    assert router.backends[0] is a
+    assert router.backends[1] is not b
+    assert b.retired is True
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_apply_removes_inactive_backend():
+    """테이블에서 사라진 백엔드는 라우팅 대상에서 제외"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "replica-a", "http://gpu0:8000/v1"),
+        make_model(2, "replica-b", "http://gpu1:8000/v1"),
+    ])
+    await router.apply([make_model(1, "replica-a", "http://gpu0:8000/v1")])
+
+    assert [b.name for b in router.backends] == ["replica-a"]
+    await router.close()
+
+
+# ============================================================
+# 백엔드 선택 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_pick_least_outstanding():
+    """진행 중 요청 수가 가장 적은 백엔드 선택"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "replica-a", "http://gpu0:8000/v1"),
+        make_model(2, "replica-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+    a.in_flight = 3
+    b.in_flight = 1
+
+    assert router.pick() is b
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_pick_by_model_name():
+    """model 이름이 LLMModel.name과 일치하면 해당 백엔드로 제한"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "replica-a", "http://gpu0:8000/v1"),
+        make_model(2, "replica-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+    a.in_flight = 5
+
+    assert router.pick("replica-a") is a
+    assert router.pick("unknown-model") is b
+    await router.close()
+
+
+# ============================================================
+# 요청 병합 테스트
+# ============================================================
+
+class SlowClient:
+    """호출 횟수를 세는 느린 LLM 클라이언트 스텁"""
+
+    def __init__(self):
+        self.calls = 0
+        self.breaker = CircuitBreaker(enabled=False)
+
+    async def chat_completion(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"content": "shared", "model": "m", "usage": {}}
+
+    async def chat_completion_stream(self, **kwargs):
+        self.calls += 1
+        for token in [b"a", b"b", b"c"]:
+            await asyncio.sleep(0.01)
+            yield token
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_coalesced():
+    """동시에 들어온 동일 요청은 upstream 호출 1회로 병합"""
+    router = LLMRouter()
+    stub = SlowClient()
+    router.backends[0].client = stub
+    messages = [{"role": "user", "content": "popular prompt"}]
+
+    results = await asyncio.gather(*(router.chat_completion(messages=messages) for _ in range(5)))
+
+    assert stub.calls == 1
+    assert all(r["content"] == "shared" for r in results)
+    assert router.backends[0].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_identical_streams_fanned_out():
+    """동일 스트리밍 요청은 하나의 upstream 스트림을 공유"""
+    router = LLMRouter()
+    stub = SlowClient()
+    router.backends[0].client = stub
+    messages = [{"role": "user", "content": "popular stream"}]
+
+    async def consume():
+        return [chunk async for chunk in router.chat_completion_stream(messages=messages)]
+
+    results = await asyncio.gather(*(consume() for _ in range(3)))
+
+    assert stub.calls == 1
+    assert results == [[b"a", b"b", b"c"]] * 3
+
+
+@pytest.mark.asyncio
+async def test_pick_skips_open_circuit():
+    """서킷이 열린 백엔드는 다른 후보가 있으면 선택하지 않음"""
+    router = LLMRouter()
+    await router.apply([
+        make_model(1, "replica-a", "http://gpu0:8000/v1"),
+        make_model(2, "replica-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+    b.in_flight = 5
+    a.client.breaker.record_failure(fatal=True)
+
+    assert router.pick() is b
+    await router.close()
+
+
+# ============================================================
+# 헤징 / 재시도 테스트
+# ============================================================
+
+class DelayedClient:
+    """지정한 지연 후 응답하는 LLM 클라이언트 스텁 (errors개 요청은 503으로 실패)"""
+
+    def __init__(self, name: str, delay: float, errors: int = 0):
+        self.name = name
+        self.delay = delay
+        self.errors = errors
+        self.calls = 0
+        self.breaker = CircuitBreaker(enabled=False)
+
+    async def chat_completion(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.errors:
+            return {"error": "HTTP 503: busy", "status_code": 503}
+        return {"content": self.name, "model": "m", "usage": {}}
+
+    async def chat_completion_stream(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        for token in [self.name.encode(), b"!"]:
+            yield token
+
+    async def close(self):
+        pass
+
+
+async def make_hedging_router(slow_delay: float = 1.0) -> tuple[LLMRouter, DelayedClient, DelayedClient]:
+    """느린 백엔드가 먼저 선택되는 2-백엔드 라우터 (충분한 지연 표본 포함)"""
+    router = LLMRouter()
+    router.coalesce = False
+    await router.apply([
+        make_model(1, "slow", "http://gpu0:8000/v1"),
+        make_model(2, "fast", "http://gpu1:8000/v1"),
+    ])
+    slow_backend, fast_backend = router.backends
+    slow, fast = DelayedClient("slow", slow_delay), DelayedClient("fast", 0.01)
+    slow_backend.client, fast_backend.client = slow, fast
+    fast_backend.in_flight = 1  # primary로 slow가 선택되도록
+    for _ in range(20):
+        router._latency["unary"].add(0.02)
+        router._latency["stream"].add(0.02)
+    return router, slow, fast
+
+
+@pytest.mark.asyncio
+async def test_unary_request_hedged_to_other_backend():
+    """지연 분위수를 넘으면 다른 백엔드로 헤지하고 먼저 온 응답 사용"""
+    router, slow, fast = await make_hedging_router()
+
+    started = asyncio.get_running_loop().time()
+    result = await router.chat_completion(messages=[{"role": "user", "content": "hi"}])
+
+    assert result["content"] == "fast"
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert slow.calls == fast.calls == 1
+    await asyncio.sleep(0)
+    assert router.backends[0].in_flight == 0  # 취소된 요청도 슬롯 반납
+
+
+@pytest.mark.asyncio
+async def test_stream_hedged_to_other_backend():
+    """첫 청크가 늦으면 다른 백엔드 스트림을 열고 승자만 중계"""
+    router, slow, fast = await make_hedging_router()
+
+    chunks = [chunk async for chunk in router.chat_completion_stream(messages=[{"role": "user", "content": "hi"}])]
+
+    assert chunks == [b"fast", b"!"]
+    assert router.backends[0].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_on_server_error(monkeypatch):
+    """5xx 응답은 backoff 후 재시도"""
+    monkeypatch.setattr(settings, "llm_retry_backoff", 0.001)
+    router = LLMRouter()
+    router.coalesce = False
+    flaky = DelayedClient("ok", 0.0, errors=2)
+    router.backends[0].client = flaky
+
+    result = await router.chat_completion(messages=[{"role": "user", "content": "hi"}])
+
+    assert result["content"] == "ok"
+    assert flaky.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesced_followers_do_not_record_upstream_metrics(client):
+    """병합된 요청은 upstream 지표를 한 번만 기록 (합류한 요청은 병합 카운터만 증가)"""
+    class UsageClient(SlowClient):
+        async def chat_completion(self, **kwargs):
+            result = await super().chat_completion(**kwargs)
+            return {**result, "model": "coalesce-m", "usage": {"total_tokens": 7}}
+
+        async def chat_completion_stream(self, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            yield b'data: {"model": "coalesce-s", "choices": [{"delta": {"content": "hi"}}]}\n\n'
+            yield b'data: {"choices": [{"delta": {}, "finish_reason": "stop"}], "usage": {"total_tokens": 5}}\n\n'
+
+    router = LLMRouter()
+    stub = UsageClient()
+    router.backends[0].client = stub
+    app.dependency_overrides[get_llm_client] = lambda: router
+
+    def value(metric, **labels) -> float:
+        return metric.labels(**labels)._value.get()
+
+    def ttft_count() -> float:
+        return sum(bucket.get() for bucket in LLM_TIME_TO_FIRST_TOKEN_SECONDS.labels(model="coalesce-s")._buckets)
+
+    joined = {mode: value(LLM_COALESCED_REQUESTS_TOTAL, mode=mode) for mode in ("unary", "stream")}
+    payload = {"messages": [{"role": "user", "content": "popular prompt"}], "save_conversation": False}
+
+    responses = await asyncio.gather(*(client.post("/v1/chat/completions", json=payload) for _ in range(3)))
+    assert [r.status_code for r in responses] == [200] * 3
+    assert value(LLM_TOKENS_GENERATED, model="coalesce-m") == 7
+    assert value(LLM_COALESCED_REQUESTS_TOTAL, mode="unary") == joined["unary"] + 2
+
+    stream_payload = {**payload, "stream": True}
+    responses = await asyncio.gather(*(client.post("/v1/chat/completions", json=stream_payload) for _ in range(3)))
+    assert all("hi" in r.text for r in responses)
+    assert stub.calls == 2
+    assert value(LLM_TOKENS_GENERATED, model="coalesce-s") == 5
+    assert ttft_count() == 1
+    assert value(LLM_COALESCED_REQUESTS_TOTAL, mode="stream") == joined["stream"] + 2
+
+
+@pytest.mark.asyncio
+async def test_admission_caps_each_backend_for_pinned_model():
+    """특정 모델로 몰린 요청은 전체 용량이 남아 있어도 그 백엔드의 상한에서 대기"""
+    router = LLMRouter()
+    router.coalesce = False
+    router.max_in_flight = 2
+    await router.apply([
+        make_model(1, "engine-a", "http://gpu0:8000/v1"),
+        make_model(2, "engine-b", "http://gpu1:8000/v1"),
+    ])
+    a, b = router.backends
+    a.client, b.client = DelayedClient("a", 0.0), DelayedClient("b", 0.0)
+    admission = AdmissionController(capacity=lambda: router.capacity, deadline=60.0, slots=router)
+
+    pinned = [await admission.acquire("user", model="engine-a") for _ in range(2)]
+    assert [ticket.backend for ticket in pinned] == [a, a]
+
+    waiter = asyncio.create_task(admission.acquire("user", model="engine-a"))
+    await asyncio.sleep(0)
+    assert not waiter.done() and admission.queue_depth == 1
+    assert router.capacity == 4 and admission.in_flight == 2
+
+    other = await admission.acquire("other")  # 모델 미지정 요청은 여유 있는 b로 바로 배정
+    assert other.backend is b
+
+    response = await router.chat_completion(messages=[{"role": "user", "content": "hi"}], backend=pinned[0].backend)
+    assert response["content"] == "a"
+
+    pinned[0].release()
+    ticket = await asyncio.wait_for(waiter, 1)
+    assert ticket.backend is a and a.admitted == 2 and b.admitted == 1
+    for ticket in (pinned[1], ticket, other):
+        ticket.release()
+    assert a.admitted == b.admitted == 0
+    await router.close()
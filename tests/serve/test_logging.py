@@ -0,0 +1,53 @@
+"""
+Logging Tests
+
+큐 로그 핸들러 및 요청 로그 샘플링 테스트
+"""
+
+import logging
+import queue
+
+import pytest
+
+from src.serve.core.config import settings
+from src.serve.core.logging import BoundedQueueHandler, RequestLoggingMiddleware
+from src.serve.core.metrics import LOG_RECORDS_DROPPED_TOTAL
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [("drop_newest", ["first", "second"]), ("drop_oldest", ["second", "third"])],
+)
+def test_bounded_queue_handler_drop_policy(policy, expected):
+    """큐가 가득 차면 정책에 따라 새/오래된 레코드를 버리고 드롭 수를 기록"""
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy)
+    dropped = LOG_RECORDS_DROPPED_TOTAL._value.get()
+
+    for message in ("first", "second", "third"):
+        handler.emit(make_record(message))
+
+    assert [log_queue.get_nowait().msg for _ in range(2)] == expected
+    assert LOG_RECORDS_DROPPED_TOTAL._value.get() == dropped + 1
+
+
+def test_bounded_queue_handler_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), "drop_everything")
+
+
+def test_request_sample_rate_by_prefix(monkeypatch):
+    """가장 긴 접두사의 비율을 사용하고, 없으면 기본 비율"""
+    monkeypatch.setattr(settings, "log_request_sample_rate", 0.5)
+    monkeypatch.setattr(
+        settings, "log_request_sample_rates", {"/v1": 1.0, "/v1/chat/completions": 0.01}
+    )
+    middleware = RequestLoggingMiddleware(app=None)
+
+    assert middleware.sample_rate("/v1/chat/completions") == 0.01
+    assert middleware.sample_rate("/v1/conversations/3") == 1.0
+    assert middleware.sample_rate("/admin/login") == 0.5
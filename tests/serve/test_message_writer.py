@@ -0,0 +1,132 @@
+"""
+Message Writer Tests
+
+메시지 write-behind 큐 테스트
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.serve.core import message_writer as writer_module
+from src.serve.core.message_writer import MessageWriter
+from src.serve.cruds.chat import message_row
+
+
+class FakeSession:
+    """session.begin()만 지원하는 세션 스텁"""
+
+    def begin(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+        return transaction()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """create_messages 호출(배치)을 기록"""
+    calls: list[list[dict]] = []
+
+    async def record(session, rows):
+        calls.append(list(rows))
+
+    monkeypatch.setattr(writer_module, "create_messages", record)
+    return calls
+
+
+def exchange(conversation_id: int) -> list[dict]:
+    return [
+        message_row(conversation_id, "user", "질문"),
+        message_row(conversation_id, "assistant", "답변"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_worker_batches_and_flushes_on_close(batches):
+    """쌓인 교환은 한 번의 INSERT로 저장되고 close 시 남은 항목까지 flush"""
+    writer = MessageWriter(session_maker=FakeSession, enabled=True)
+    await writer.start()
+
+    for conversation_id in (1, 2, 1):
+        await writer.enqueue(exchange(conversation_id))
+    await writer.close()
+
+    assert len(batches) == 1
+    assert [row["conversation_id"] for row in batches[0]] == [1, 1, 2, 2, 1, 1]
+    assert not writer.running
+
+
+@pytest.mark.asyncio
+async def test_enqueue_applies_backpressure(monkeypatch):
+    """큐가 가득 차면 enqueue는 워커가 비울 때까지 대기"""
+    release = asyncio.Event()
+
+    async def slow_write(session, rows):
+        await release.wait()
+
+    monkeypatch.setattr(writer_module, "create_messages", slow_write)
+    writer = MessageWriter(session_maker=FakeSession, max_queue=1, enabled=True)
+    await writer.start()
+
+    await writer.enqueue(exchange(1))
+    await asyncio.sleep(0)  # 워커가 첫 항목을 가져가 저장 중
+    await writer.enqueue(exchange(2))  # 큐 1칸 사용
+    blocked = asyncio.create_task(writer.enqueue(exchange(3)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.wait_for(blocked, 1)
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_wait_flushed_and_inline_fallback(batches):
+    """이력 조회 전 대기는 저장 후 해제, 워커가 없으면 직접 저장"""
+    writer = MessageWriter(session_maker=FakeSession, enabled=True)
+    await writer.start()
+    await writer.enqueue(exchange(7))
+
+    assert await writer.wait_flushed(7, timeout=1)
+    assert await writer.wait_flushed(8, timeout=0)
+    await writer.close()
+
+    await writer.enqueue(exchange(9))
+    assert batches[-1][0]["conversation_id"] == 9
+
+
+@pytest.mark.asyncio
+async def test_poison_row_is_dead_lettered_without_dropping_batch(monkeypatch, tmp_path):
+    """배치가 끝내 실패하면 교환 단위로 저장하고, 실패한 교환만 dead-letter 파일로"""
+    written: list[list[dict]] = []
+
+    async def insert(session, rows):
+        if any(row["conversation_id"] == 2 for row in rows):
+            raise RuntimeError("FOREIGN KEY constraint failed")
+        written.append(list(rows))
+
+    monkeypatch.setattr(writer_module, "create_messages", insert)
+    dead_letter = tmp_path / "dead.jsonl"
+    writer = MessageWriter(session_maker=FakeSession, retries=1, enabled=True, dead_letter_path=str(dead_letter))
+    await writer.start()
+    for conversation_id in (1, 2, 3):
+        await writer.enqueue(exchange(conversation_id))
+    await writer.close()
+
+    assert [[row["conversation_id"] for row in rows] for rows in written] == [[1, 1], [3, 3]]
+    records = [json.loads(line) for line in dead_letter.read_text().splitlines()]
+    assert len(records) == 1
+    assert [row["conversation_id"] for row in records[0]["rows"]] == [2, 2]
+    assert records[0]["rows"][1]["content"] == "답변"
+    assert "FOREIGN KEY" in records[0]["error"]
+    assert not await writer.wait_flushed(2, timeout=0)
+    assert await writer.wait_flushed(1, timeout=0)
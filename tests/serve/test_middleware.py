@@ -0,0 +1,67 @@
+"""
+Middleware Tests
+
+순수 ASGI 로깅/Prometheus 미들웨어 테스트
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from src.serve.core.asgi import UNMATCHED_ROUTE
+from src.serve.core.logging import RequestLoggingMiddleware
+from src.serve.core.metrics import HTTP_REQUEST_DURATION_SECONDS, HTTP_REQUESTS_TOTAL, PrometheusMiddleware
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/mw-test/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/mw-test/stream")
+    async def stream():
+        async def generate():
+            for _ in range(3):
+                await asyncio.sleep(0.05)
+                yield b"data: token\n\n"
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    app.add_middleware(RequestLoggingMiddleware)
+    app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+def sample(metric, suffix: str, **labels) -> float:
+    """라벨이 일치하는 샘플 값 (없으면 0)"""
+    for family in metric.collect():
+        for s in family.samples:
+            if s.name.endswith(suffix) and all(s.labels.get(k) == v for k, v in labels.items()):
+                return s.value
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_use_route_template_and_full_stream_duration():
+    """endpoint 라벨은 경로 템플릿이고, 스트리밍 지속시간은 본문 전송 완료까지"""
+    transport = ASGITransport(app=make_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for item_id in (1, 2, 3):
+            response = await client.get(f"/mw-test/items/{item_id}", headers={"X-Request-ID": f"req-{item_id}"})
+            assert response.headers["X-Request-ID"] == f"req-{item_id}"
+        missing = await client.get("/mw-test/nowhere/123")
+        streamed = await client.get("/mw-test/stream")
+
+    assert missing.status_code == 404
+    assert missing.headers["X-Request-ID"]
+    assert streamed.text.count("token") == 3
+    assert sample(
+        HTTP_REQUESTS_TOTAL, "_total", endpoint="/mw-test/items/{item_id}", status_code="200"
+    ) >= 3
+    assert sample(HTTP_REQUESTS_TOTAL, "_total", endpoint=UNMATCHED_ROUTE, status_code="404") >= 1
+    assert sample(HTTP_REQUESTS_TOTAL, "_total", endpoint="/mw-test/nowhere/123") == 0
+    assert sample(HTTP_REQUEST_DURATION_SECONDS, "_sum", endpoint="/mw-test/stream") >= 0.15
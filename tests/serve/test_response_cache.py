@@ -0,0 +1,212 @@
+"""
+Response Cache Tests
+
+결정적 채팅 완성 응답 캐시 테스트
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from src.serve.core.config import settings
+from src.serve.core.llm import LLMClient
+from src.serve.core.response_cache import CachedResponse, ResponseCache, make_cache_key, response_cache
+
+
+def test_cache_key_is_canonical():
+    """동일 요청은 같은 키, 샘플링 파라미터가 다르면 다른 키"""
+    messages = [{"role": "user", "content": "MLflow란?"}]
+    key = make_cache_key("model-a", messages, 0.0, 0.9, 512)
+
+    assert key == make_cache_key("model-a", [{"content": "MLflow란?", "role": "user"}], 0.0, 0.9, 512)
+    assert key != make_cache_key("model-a", messages, 0.0, 0.9, 256)
+    assert key != make_cache_key("model-b", messages, 0.0, 0.9, 512)
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_eviction():
+    """최대 항목 수 초과 시 가장 오래 사용되지 않은 항목 제거"""
+    cache = ResponseCache(maxsize=2, enabled=True)
+    for key in ("a", "b"):
+        await cache.set(key, CachedResponse(content=key, model="m"), ttl=60)
+    await cache.get("a")
+    await cache.set("c", CachedResponse(content="c", model="m"), ttl=60)
+
+    assert await cache.get("a") is not None
+    assert await cache.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_memory_clear(tmp_path):
+    """SQLite 디스크 계층에서 조회 후 메모리로 승격"""
+    cache = ResponseCache(path=str(tmp_path / "cache.db"), enabled=True)
+    await cache.set("key", CachedResponse(content="저장된 답변", model="m", usage={"total_tokens": 5}), ttl=60)
+    cache.clear()
+
+    cached = await cache.get("key")
+    assert cached.content == "저장된 답변"
+    assert cached.usage == {"total_tokens": 5}
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_zero_sampling_params_reach_upstream():
+    """temperature=0 등 falsy 값이 기본값으로 바뀌지 않고 그대로 전송 (캐시된 응답이 실제로 결정적)"""
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}, "text": "ok"}]})
+
+    llm = LLMClient(base_url="http://gpu0:8000/v1")
+    llm._client = httpx.AsyncClient(base_url=llm.base_url, transport=httpx.MockTransport(handler))
+    messages = [{"role": "user", "content": "결정적 질문"}]
+    await llm.chat_completion(messages, temperature=0, top_p=0, max_tokens=0)
+    async for _ in llm.chat_completion_stream(messages, temperature=0.0, top_p=0.0):
+        pass
+    await llm.completion("prompt", temperature=0)
+    await llm.chat_completion(messages)
+    await llm.close()
+
+    assert (payloads[0]["temperature"], payloads[0]["top_p"], payloads[0]["max_tokens"]) == (0, 0, 0)
+    assert (payloads[1]["temperature"], payloads[1]["top_p"]) == (0.0, 0.0)
+    assert payloads[2]["temperature"] == 0
+    assert payloads[3]["temperature"] == settings.default_temperature
+
+
+# ============================================================
+# API 테스트
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_chat_completion_cache_hit_skips_llm(client: AsyncClient, mock_llm_client):
+    """temperature=0 반복 요청은 캐시에서 응답하고 스트리밍 재생도 지원"""
+    response_cache.clear()
+    payload = {
+        "messages": [{"role": "user", "content": "캐시 테스트 질문"}],
+        "temperature": 0,
+        "save_conversation": False,
+    }
+
+    first = await client.post("/v1/chat/completions", json=payload)
+    second = await client.post("/v1/chat/completions", json=payload)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["content"] == first.json()["content"]
+    assert mock_llm_client.chat_completion.await_count == 1
+
+    streamed = await client.post("/v1/chat/completions", json={**payload, "stream": True})
+    chunks = [
+        json.loads(line[len("data: "):])
+        for line in streamed.text.splitlines()
+        if line.startswith("data: {")
+    ]
+    content = "".join(
+        choice["delta"].get("content", "") for chunk in chunks for choice in chunk["choices"]
+    )
+    assert content == "테스트 응답입니다."
+
+
+# ============================================================
+# 시맨틱 캐시 테스트
+# ============================================================
+
+def fake_encoder(text: str):
+    """단어 해시 기반 bag-of-words 정규화 벡터"""
+    np = pytest.importorskip("numpy")
+    vector = np.zeros(64, dtype=np.float32)
+    for word in text.lower().replace("?", "").split():
+        vector[sum(map(ord, word)) % 64] += 1.0
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_hit_above_threshold():
+    """유사도가 임계값 이상이면 저장된 답변 반환, 다른 네임스페이스는 공유하지 않음"""
+    pytest.importorskip("numpy")
+    from src.serve.core.semantic_cache import SemanticCache
+
+    cache = SemanticCache(capacity=8, enabled=True, encoder=fake_encoder)
+    miss = await cache.lookup("ns", "what is mlflow tracking", threshold=0.9)
+    assert miss.response is None
+    cache.store(miss, CachedResponse(content="MLflow tracking stores runs.", model="m"))
+
+    hit = await cache.lookup("ns", "What is MLflow tracking?", threshold=0.9)
+    assert hit.response.content == "MLflow tracking stores runs."
+    assert hit.score >= 0.9
+
+    other = await cache.lookup("other-ns", "what is mlflow tracking", threshold=0.9)
+    assert other.response is None
+
+    unrelated = await cache.lookup("ns", "how do i deploy vllm", threshold=0.9)
+    assert unrelated.response is None
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_eviction_fifo():
+    """용량 초과 시 fifo 정책이면 가장 먼저 저장된 항목 제거"""
+    pytest.importorskip("numpy")
+    from src.serve.core.semantic_cache import SemanticCache
+
+    cache = SemanticCache(capacity=2, eviction="fifo", enabled=True, encoder=fake_encoder)
+    for question in ("alpha question", "beta question", "gamma question"):
+        lookup = await cache.lookup("ns", question, threshold=0.99)
+        cache.store(lookup, CachedResponse(content=question, model="m"))
+
+    assert (await cache.lookup("ns", "alpha question", threshold=0.99)).response is None
+    assert (await cache.lookup("ns", "gamma question", threshold=0.99)).response.content == "gamma question"
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_prefers_expired_slots_and_drops_namespaces():
+    """가득 차면 만료 슬롯을 먼저 재사용하고, 슬롯이 모두 빠진 네임스페이스는 제거"""
+    pytest.importorskip("numpy")
+    from src.serve.core.semantic_cache import SemanticCache
+
+    cache = SemanticCache(capacity=2, eviction="lru", enabled=True, encoder=fake_encoder)
+    for namespace, question in (("conv-1", "alpha question"), ("conv-2", "beta question")):
+        lookup = await cache.lookup(namespace, question, threshold=0.99)
+        cache.store(lookup, CachedResponse(content=question, model="m"))
+
+    cache._expires_at[1] = time.time() - 1  # conv-2 항목만 만료
+    lookup = await cache.lookup("conv-3", "gamma question", threshold=0.99)
+    cache.store(lookup, CachedResponse(content="gamma question", model="m"))
+
+    assert (await cache.lookup("conv-1", "alpha question", threshold=0.99)).response.content == "alpha question"
+    assert set(cache._namespaces) == {"conv-1", "conv-3"}
+
+    for i in range(10):
+        lookup = await cache.lookup(f"conv-new-{i}", f"question {i}", threshold=0.99)
+        cache.store(lookup, CachedResponse(content=str(i), model="m"))
+    assert len(cache._namespaces) == 2
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_loads_model_once(monkeypatch):
+    """동시에 들어온 첫 조회들도 임베딩 모델은 스레드 풀에서 한 번만 생성"""
+    pytest.importorskip("numpy")
+    from src.serve.core import semantic_cache as semantic_module
+
+    created = []
+
+    class FakeSentenceTransformer:
+        def __init__(self, name, device=None):
+            created.append(threading.current_thread())
+            time.sleep(0.05)
+
+        def encode(self, text, normalize_embeddings=True):
+            return fake_encoder(text)
+
+    monkeypatch.setattr(semantic_module, "SentenceTransformer", FakeSentenceTransformer)
+    cache = semantic_module.SemanticCache(capacity=4, enabled=True)
+
+    lookups = await asyncio.gather(*(cache.lookup("ns", "what is mlflow", threshold=0.9) for _ in range(5)))
+
+    assert len(created) == 1
+    assert created[0] is not threading.main_thread()
+    assert all(lookup.embedding is not None for lookup in lookups)
@@ -0,0 +1,41 @@
+"""
+Serialization Tests
+
+JSON 백엔드 선택 및 응답 렌더링 테스트
+"""
+
+import json
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from src.serve.core.serialization import BACKENDS, FastJSONResponse, get_codec, select_backend
+
+
+@pytest.mark.parametrize("backend", [b for b in BACKENDS if select_backend(b) == b])
+def test_codec_round_trip(backend):
+    """모든 백엔드가 표준 json과 같은 값으로 왕복하고 디코딩 오류는 ValueError"""
+    dumps, loads = get_codec(backend)
+    payload = {"content": "안녕하세요 \"MLflow\"\n", "usage": {"total_tokens": 3}, "items": [1, 2.5, None, True]}
+
+    assert loads(dumps(payload)) == payload
+    assert json.loads(dumps(payload)) == payload
+    assert loads(json.dumps(payload).encode("utf-8")) == payload
+    with pytest.raises(ValueError):
+        loads(b'{"content": ')
+
+
+def test_select_backend_falls_back():
+    """알 수 없는 백엔드는 설치된 우선순위 백엔드로 대체"""
+    assert select_backend("json") == "json"
+    assert select_backend("simdjson") == select_backend("auto")
+
+
+def test_fast_json_response_matches_starlette():
+    """FastJSONResponse 본문은 기본 JSONResponse와 같은 JSON"""
+    content = {"detail": "대화를 찾을 수 없습니다", "ids": [1, 2]}
+
+    fast = FastJSONResponse(content)
+
+    assert fast.headers["content-type"] == "application/json"
+    assert json.loads(fast.body) == json.loads(JSONResponse(content).body)
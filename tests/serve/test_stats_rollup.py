@@ -0,0 +1,173 @@
+"""
+Stats Rollup Tests
+
+분위수 스케치 및 메시지 통계 증분 롤업 테스트
+"""
+
+import random
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, select
+
+from src.serve.core.sketch import QuantileSketch
+from src.serve.core.stats_rollup import (
+    WATERMARK_NAME,
+    MessageStatsRollup,
+    apply_messages,
+    rollup_query,
+    summarize_rollup,
+)
+from src.serve.database import async_session_maker
+from src.serve.models.chat import ChatMessage, Conversation
+from src.serve.models.stats import MessageStatsHourly, RollupWatermark
+
+
+def test_sketch_quantiles_and_merge():
+    """분위수는 상대 오차 이내이고, 나눠 담은 스케치 병합 결과는 한 번에 담은 것과 동일"""
+    values = [random.lognormvariate(5, 1) for _ in range(5000)]
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(whole.quantile(q) - exact) / exact <= 0.011
+    assert left.to_dict() == whole.to_dict()
+    assert QuantileSketch.from_dict(whole.to_dict()).quantile(0.5) == whole.quantile(0.5)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+@pytest_asyncio.fixture
+async def clean_stats():
+    """빈 롤업 테이블 + 다른 테스트가 만든 메시지 이후부터 집계"""
+    async with async_session_maker() as session, session.begin():
+        await session.execute(delete(MessageStatsHourly))
+        await session.execute(delete(RollupWatermark))
+        last_id = (await session.execute(select(func.max(ChatMessage.id)))).scalar() or 0
+        session.add(RollupWatermark(name=WATERMARK_NAME, last_id=last_id))
+
+
+async def add_messages(conversation_id: int, created_at: datetime, count: int, latency_ms: int) -> None:
+    async with async_session_maker() as session, session.begin():
+        for _ in range(count):
+            session.add(ChatMessage(
+                conversation_id=conversation_id,
+                role="assistant",
+                content="답변",
+                model="test-model",
+                tokens_used=10,
+                latency_ms=latency_ms,
+                created_at=created_at,
+                first_token_at=created_at + timedelta(milliseconds=100),
+                extra_data={"completion_tokens": 10},
+            ))
+
+
+@pytest.mark.asyncio
+async def test_rollup_is_incremental(clean_stats):
+    """워터마크 이후 메시지만 기존 버킷에 병합"""
+    now = datetime(2026, 10, 17, 12, 30)
+    async with async_session_maker() as session, session.begin():
+        conversation = Conversation(title="롤업", session_id="rollup-test")
+        session.add(conversation)
+    await add_messages(conversation.id, now - timedelta(hours=2), 3, latency_ms=200)
+
+    rollup = MessageStatsRollup(batch_size=2)
+    assert await rollup.run(now) == 3
+    assert await rollup.run(now) == 0
+
+    await add_messages(conversation.id, now - timedelta(hours=2), 1, latency_ms=1000)
+    assert await rollup.run(now) == 1
+
+    async with async_session_maker() as session:
+        buckets = (await session.execute(rollup_query(now.date(), now.date()))).scalars().all()
+    assert len(buckets) == 1
+    bucket = buckets[0]
+    assert bucket.hour == datetime(2026, 10, 17, 10)
+    assert (bucket.message_count, bucket.latency_min, bucket.latency_max) == (4, 200, 1000)
+    assert bucket.ttft_sum == pytest.approx(400)
+
+    summary = summarize_rollup(buckets)
+    assert summary["overall"]["count"] == 4
+    assert summary["overall"]["avg_latency"] == pytest.approx(400)
+    assert summary["overall"]["total_tokens"] == 40
+    assert summary["role_stats"][0]["role"] == "assistant"
+    # 생성 속도 = 10 tokens / (지연 - TTFT 100ms)
+    assert summary["model_stats"][0]["model"] == "test-model"
+    assert summary["model_stats"][0]["tps"]["p50"] == pytest.approx(100, rel=0.01)
+    assert summary["model_stats"][0]["latency"]["p50"] == pytest.approx(200, rel=0.01)
+    assert summary["daily_stats"][0]["date"] == now.date()
+
+    # 다른 시간대 메시지는 새 버킷으로 집계
+    await add_messages(conversation.id, now - timedelta(seconds=1), 1, latency_ms=50)
+    assert await rollup.run(now) == 1
+    async with async_session_maker() as session:
+        hours = (await session.execute(select(MessageStatsHourly.hour))).scalars().all()
+    assert sorted(hours) == [datetime(2026, 10, 17, 10), datetime(2026, 10, 17, 12)]
+
+
+@pytest.mark.asyncio
+async def test_rollup_picks_up_ids_committed_out_of_order(clean_stats):
+    """워터마크가 지나간 뒤 커밋된 작은 id도 gap 재조회로 집계, 끝내 없는 id는 timeout 후 폐기"""
+    now = datetime(2026, 10, 17, 12, 30)
+    async with async_session_maker() as session, session.begin():
+        conversation = Conversation(title="롤업 gap", session_id="rollup-gap-test")
+        session.add(conversation)
+        await session.flush()
+        base = (await session.execute(select(func.max(ChatMessage.id)))).scalar() or 0
+
+    async def add(message_id: int) -> None:
+        async with async_session_maker() as session, session.begin():
+            session.add(ChatMessage(
+                id=message_id, conversation_id=conversation.id, role="user", content="질문",
+                created_at=now - timedelta(hours=1),
+            ))
+
+    rollup = MessageStatsRollup(gap_timeout=60)
+    await add(base + 3)  # base+1, base+2는 아직 커밋 전
+    assert await rollup.run(now) == 1
+    async with async_session_maker() as session:
+        watermark = await session.get(RollupWatermark, WATERMARK_NAME)
+    assert watermark.last_id == base + 3
+    assert sorted(watermark.gaps) == [str(base + 1), str(base + 2)]
+
+    await add(base + 1)
+    assert await rollup.run(now) == 1
+    assert await rollup.run(now) == 0
+
+    # base+2는 롤백된 id로 보고 gap_timeout 후 제거
+    await rollup.run(now + timedelta(seconds=61))
+    async with async_session_maker() as session:
+        watermark = await session.get(RollupWatermark, WATERMARK_NAME)
+        count = (await session.execute(select(func.sum(MessageStatsHourly.message_count)))).scalar()
+    assert watermark.gaps is None
+    assert count == 2
+
+
+def test_summary_percentiles_merge_buckets():
+    """여러 시간 버킷의 스케치를 병합해 기간 전체 분위수를 계산"""
+    buckets: dict = {}
+    start = datetime(2026, 10, 1)
+    messages = [
+        SimpleNamespace(
+            created_at=start + timedelta(hours=i % 48),
+            model="m", role="assistant", latency_ms=i + 1, tokens_used=None,
+            first_token_at=None, extra_data=None,
+        )
+        for i in range(1000)
+    ]
+    apply_messages(buckets, messages)
+
+    summary = summarize_rollup(list(buckets.values()))
+    latency = summary["model_stats"][0]["latency"]
+    assert len(buckets) == 48
+    assert latency["p50"] == pytest.approx(500, rel=0.02)
+    assert latency["p90"] == pytest.approx(900, rel=0.02)
+    assert latency["p99"] == pytest.approx(990, rel=0.02)
+    assert summary["overall"]["tps"]["p50"] is None
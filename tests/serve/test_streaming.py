@@ -0,0 +1,67 @@
+"""
+Streaming Tap Tests
+
+SSE 바이트 passthrough 중계 테스트
+"""
+
+import json
+
+from src.serve.core.streaming import StreamTap
+
+
+def event(data: dict) -> bytes:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def token(content: str) -> bytes:
+    return event({"model": "m", "choices": [{"index": 0, "delta": {"content": content}}]})
+
+
+def test_whole_events_forwarded_unchanged():
+    """이벤트 경계에 맞춘 청크는 같은 객체 그대로 전달"""
+    tap = StreamTap(model="m", record_metrics=False)
+    chunk = token("안녕")
+
+    assert tap.feed(chunk) is chunk
+    assert tap.completion_tokens == 1
+    assert tap.first_token_at is not None
+
+
+def test_split_events_reassembled_at_boundary():
+    """이벤트 중간에서 잘린 청크는 경계가 올 때까지 보류"""
+    tap = StreamTap(model="m", record_metrics=False)
+    raw = event({"choices": [{"delta": {"role": "assistant", "content": ""}}]}) + token("하세") + token("요")
+    head, rest = raw[:30], raw[30:]
+
+    forwarded = tap.feed(head) + tap.feed(rest)
+
+    assert forwarded == raw
+    assert tap.completion_tokens == 2  # role 이벤트(빈 content)는 토큰이 아님
+
+
+def test_done_event_dropped_and_body_parsed_once():
+    """upstream [DONE]은 걸러내고, 본문/usage는 finish()에서 복원"""
+    tap = StreamTap(model="m", record_metrics=False)
+    stream = [
+        token("MLflow는 "),
+        token("도구입니다"),
+        event({"choices": [{"delta": {}, "finish_reason": "stop"}]}),
+        event({"choices": [], "usage": {"total_tokens": 9}}),
+        b"data: [DONE]\n\n",
+    ]
+    forwarded = b"".join(tap.feed(chunk) for chunk in stream) + tap.flush()
+    tap.finish()
+
+    assert b"[DONE]" not in forwarded
+    assert tap.content == "MLflow는 도구입니다"
+    assert tap.finish_reason == "stop"
+    assert tap.total_tokens == 9
+
+
+def test_error_event_detected():
+    """에러 이벤트는 finish() 후 error로 노출"""
+    tap = StreamTap(model="m", record_metrics=False)
+    tap.feed(event({"error": 'connection "refused"'}))
+    tap.finish()
+
+    assert tap.error == 'connection "refused"'
@@ -0,0 +1,188 @@
+"""
+Tracing Tests
+
+요청 트레이스 span 기록, Server-Timing 헤더, OTLP/JSON 내보내기 테스트
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.serve.core.coalesce import SingleFlight
+from src.serve.core.tracing import (
+    SPAN_KIND_SERVER,
+    Span,
+    Trace,
+    TraceExporter,
+    TracingMiddleware,
+    _current_span,
+    current_trace,
+    otlp_payload,
+    span,
+    start_span,
+    trace_engine,
+)
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.traces: list[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+
+def make_app(exporter: RecordingExporter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/trace-test/items/{item_id}")
+    async def get_item(item_id: int):
+        with span("auth"):
+            pass
+        with span("llm.request") as outer:
+            with span("db.insert"):
+                await asyncio.sleep(0.01)
+            outer.set(**{"llm.model": "test-model"})
+        return {"id": item_id, "trace_id": current_trace().trace_id}
+
+    @app.get("/trace-test/stream")
+    async def stream():
+        async def generate():
+            decode = start_span("llm.decode")
+            for _ in range(2):
+                await asyncio.sleep(0.01)
+                yield b"data: token\n\n"
+            decode.end()
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    app.add_middleware(TracingMiddleware, exporter=exporter)
+    return app
+
+
+def test_span_is_noop_outside_request():
+    """트레이스가 없으면 span()/start_span()은 아무것도 기록하지 않음"""
+    with span("auth") as current:
+        assert current is None
+    assert start_span("llm.decode") is None
+    assert current_trace() is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_nested_spans_and_server_timing():
+    """하위 span은 부모를 가리키고, Server-Timing에는 응답 전까지 끝난 구간만 포함"""
+    exporter = RecordingExporter()
+    transport = ASGITransport(app=make_app(exporter))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/trace-test/items/7")
+        streamed = await client.get("/trace-test/stream")
+
+    timing = response.headers["Server-Timing"]
+    assert [metric.split(";")[0] for metric in timing.split(", ")] == ["auth", "db.insert", "llm.request", "total"]
+    assert float(timing.split("db.insert;dur=")[1].split(",")[0]) >= 10
+
+    trace = exporter.traces[0]
+    assert response.json()["trace_id"] == trace.trace_id
+    spans = {s.name: s for s in trace.spans}
+    root = spans["GET /trace-test/items/{item_id}"]
+    assert root.kind == SPAN_KIND_SERVER and root.parent_id is None
+    assert root.attributes["http.response.status_code"] == 200
+    assert spans["auth"].parent_id == root.span_id
+    assert spans["llm.request"].parent_id == root.span_id
+    assert spans["db.insert"].parent_id == spans["llm.request"].span_id
+    assert spans["llm.request"].attributes == {"llm.model": "test-model"}
+
+    # 본문 전송 중 끝난 구간은 헤더에는 없고 트레이스에만 있음
+    assert "llm.decode" not in streamed.headers["Server-Timing"]
+    assert "llm.decode" in exporter.traces[1].breakdown()
+
+
+@pytest.mark.asyncio
+async def test_traceparent_continues_caller_trace():
+    exporter = RecordingExporter()
+    transport = ASGITransport(app=make_app(exporter))
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/trace-test/items/1", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+
+    trace = exporter.traces[0]
+    assert trace.trace_id == trace_id
+    assert trace.root.parent_id == parent_id
+    assert Trace.from_traceparent("00-" + "0" * 32 + "-" + parent_id + "-01").trace_id != "0" * 32
+
+
+@pytest.mark.asyncio
+async def test_engine_queries_are_recorded_as_spans():
+    """AsyncSession 동기 실행 구간의 SQL도 요청 트레이스에 기록"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    trace_engine(engine.sync_engine)
+    trace = Trace()
+    trace.root = Span(trace, "GET /")
+    token = _current_span.set(trace.root)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        _current_span.reset(token)
+        await engine.dispose()
+
+    query = next(s for s in trace.spans if s.name == "db.query")
+    assert query.attributes == {"db.system": "sqlite", "db.operation": "SELECT"}
+    assert query.parent_id == trace.root.span_id
+
+
+@pytest.mark.asyncio
+async def test_exporter_writes_otlp_json_lines(tmp_path):
+    """jsonl 내보내기는 배치마다 OTLP/JSON ExportTraceServiceRequest 한 줄"""
+    path = tmp_path / "traces.jsonl"
+    exporter = TraceExporter(exporter="jsonl", path=str(path), interval=60)
+    await exporter.start()
+
+    trace = Trace()
+    trace.root = Span(trace, "POST /v1/chat/completions", kind=SPAN_KIND_SERVER)
+    child = Span(trace, "llm.request", trace.root.span_id, attributes={"llm.prompt_tokens": 12})
+    child.end(RuntimeError("upstream timeout"))
+    trace.root.end()
+    exporter.export(trace)
+    await exporter.close()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    payload = json.loads(lines[0])
+    assert payload == otlp_payload([trace])
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["llm.request", "POST /v1/chat/completions"]
+    assert spans[0]["traceId"] == trace.trace_id and len(trace.trace_id) == 32
+    assert spans[0]["parentSpanId"] == trace.root.span_id
+    assert spans[0]["attributes"] == [{"key": "llm.prompt_tokens", "value": {"intValue": "12"}}]
+    assert spans[0]["status"] == {"code": 2, "message": "RuntimeError: upstream timeout"}
+    assert int(spans[0]["endTimeUnixNano"]) >= int(spans[0]["startTimeUnixNano"])
+    assert "parentSpanId" not in spans[1]
+
+
+def test_exporter_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        TraceExporter(exporter="zipkin")
+
+
+@pytest.mark.asyncio
+async def test_coalesced_leader_runs_outside_request_trace():
+    """병합 leader 태스크는 요청보다 오래 살 수 있으므로 요청 트레이스를 물려받지 않음"""
+    async def leader() -> dict:
+        return {"trace": current_trace()}
+
+    trace = Trace()
+    trace.root = Span(trace, "POST /v1/chat/completions")
+    token = _current_span.set(trace.root)
+    try:
+        seen = await SingleFlight().do("key", leader)
+    finally:
+        _current_span.reset(token)
+
+    assert seen["trace"] is None
+    assert current_trace() is None
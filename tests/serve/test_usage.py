@@ -0,0 +1,82 @@
+"""
+Usage Tests
+
+토큰 사용량 라벨 / 분 단위 롤링 집계 / /metrics/usage 테스트
+"""
+
+import pytest
+from httpx import AsyncClient
+
+from src.serve.core.metrics import LLM_COMPLETION_TOKENS_TOTAL, LLM_PROMPT_TOKENS_TOTAL
+from src.serve.core.usage import (
+    ANONYMOUS_USER,
+    NO_CONFIG,
+    OTHER_USERS,
+    UsageCounts,
+    UsageWindow,
+    UserLabeler,
+    user_labeler,
+)
+
+
+def test_user_labels_are_hashed_and_bounded():
+    """원본 키는 노출되지 않고, 상한을 넘은 새 사용자는 other로 합산"""
+    labeler = UserLabeler(max_users=2, salt="test-salt")
+
+    first = labeler.label("sk-secret-key-1")
+    assert first != "sk-secret-key-1" and len(first) == 12
+    assert labeler.label("sk-secret-key-1") == first
+    assert labeler.label("sk-secret-key-2") not in (first, OTHER_USERS)
+    assert labeler.label("sk-secret-key-3") == OTHER_USERS
+    assert labeler.label("sk-secret-key-1") == first  # 이미 관측된 라벨은 유지
+    assert labeler.label(None) == ANONYMOUS_USER
+    assert UserLabeler(salt="other-salt").label("sk-secret-key-1") != first
+
+
+def test_usage_window_rolls_per_minute():
+    window = UsageWindow(window_minutes=3)
+    start = 1_800_000_000 // 60 * 60  # 분 경계
+    window.record(("m1", "support", "u1"), UsageCounts(1, 100, 40, 2.0), now=start)
+    window.record(("m1", "coding", "u2"), UsageCounts(1, 10, 200, 4.0), now=start + 30)
+    window.record(("m2", "coding", "u1"), UsageCounts(1, 5, 10, 1.0), now=start + 120)
+
+    snapshot = window.snapshot(now=start + 150)
+    assert [m["completion_tokens"] for m in snapshot["minutes"]] == [240, 0, 10]
+    assert snapshot["minutes"][0]["tokens_per_second"] == 40.0
+    assert snapshot["minutes"][1]["tokens_per_second"] is None
+    assert [row["llm_config"] for row in snapshot["by_llm_config"]] == ["coding", "support"]
+    assert snapshot["by_llm_config"][0] == {
+        "llm_config": "coding", "requests": 2, "prompt_tokens": 15, "completion_tokens": 210,
+        "total_tokens": 225, "tokens_per_second": 42.0,
+    }
+    assert snapshot["by_user"][0]["user"] == "u2"
+
+    # 보관 기간이 지난 분은 새 분을 기록할 때 버려짐
+    window.record(("m2", "coding", "u1"), UsageCounts(1, 5, 10, 1.0), now=start + 180)
+    snapshot = window.snapshot(minutes=10, now=start + 180)
+    assert snapshot["window_minutes"] == 3
+    assert sum(m["requests"] for m in snapshot["minutes"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_records_usage(client: AsyncClient):
+    """upstream 응답의 prompt/completion 토큰을 프리셋/사용자 라벨로 기록"""
+    user = user_labeler.label("usage-test-key")
+    labels = {"model": "test-model", "llm_config": NO_CONFIG, "user": user}
+    prompt_before = LLM_PROMPT_TOKENS_TOTAL.labels(**labels)._value.get()
+    completion_before = LLM_COMPLETION_TOKENS_TOTAL.labels(**labels)._value.get()
+
+    response = await client.post(
+        "/v1/chat/completions",
+        json={"messages": [{"role": "user", "content": "사용량"}], "save_conversation": False},
+        headers={"X-API-Key": "usage-test-key"},
+    )
+    assert response.status_code == 200
+    assert LLM_PROMPT_TOKENS_TOTAL.labels(**labels)._value.get() == prompt_before + 10
+    assert LLM_COMPLETION_TOKENS_TOTAL.labels(**labels)._value.get() == completion_before + 20
+
+    usage = (await client.get("/metrics/usage", params={"minutes": 5})).json()
+    assert len(usage["minutes"]) == 5
+    row = next(r for r in usage["by_user"] if r["user"] == user)
+    assert row["prompt_tokens"] >= 10 and row["completion_tokens"] >= 20
+    assert "usage-test-key" not in str(usage)